@@ -0,0 +1,52 @@
+# app/controllers/distributed_controller.py
+from fastapi import APIRouter, UploadFile, File, Depends, Query, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+import uuid
+
+from app.models.response_models import DistributedJobStatus
+from app.core.config import settings
+from app.core.dependencies import get_distributed_coordinator
+from app.services.distributed_pipeline_service import DistributedCoordinator
+from app.services.extraction_pipeline_service import OUTPUT_FORMATS
+from app.handlers.file_handler import FileHandler
+from app.handlers.pdf_handler import PDFHandler
+from app.utils.page_range import parse_page_range
+
+router = APIRouter(prefix="/api/v1/distributed", tags=["distributed"])
+
+@router.post("/jobs", response_model=DistributedJobStatus, status_code=202)
+async def submit_job(
+    file: UploadFile = File(...),
+    pages: Optional[str] = Query(None, description="1-based page selection, e.g. '1-5,8,10-'"),
+    output_format: Optional[str] = Query(None, description="csv, parquet, arrow or xlsx"),
+    coordinator: DistributedCoordinator = Depends(get_distributed_coordinator)
+):
+    """
+    Queue a PDF as page tasks for the worker pool (python -m app.tools.page_worker)
+    and return immediately; poll GET /jobs/{file_id} for progress and the result
+    """
+    output_format = (output_format or settings.OUTPUT_FORMAT).lower()
+    if output_format not in OUTPUT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported output format '{output_format}'")
+    
+    file_id = str(uuid.uuid4())
+    pdf_path = FileHandler.shard_dir(settings.UPLOAD_DIR, file_id) / f"{file_id}.pdf"
+    FileHandler.save_uploaded_file(await file.read(), str(pdf_path))
+    
+    try:
+        page_numbers = parse_page_range(pages, PDFHandler.get_page_count(str(pdf_path)))
+    except ValueError as e:
+        FileHandler.delete_file(str(pdf_path))
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    status = await run_in_threadpool(coordinator.submit, str(pdf_path), file_id, page_numbers, output_format)
+    return DistributedJobStatus(**status)
+
+@router.get("/jobs/{file_id}", response_model=DistributedJobStatus)
+async def job_status(file_id: str, coordinator: DistributedCoordinator = Depends(get_distributed_coordinator)):
+    """Per-stage task counts; the merged result once every page has finished"""
+    status = await run_in_threadpool(coordinator.status, file_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{file_id}'")
+    return DistributedJobStatus(**status)
@@ -0,0 +1,96 @@
+# app/controllers/download_controller.py
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from app.models.response_models import JobFilesResponse
+from app.core.dependencies import get_download_service
+from app.services.download_service import DownloadService, MEDIA_TYPES
+
+router = APIRouter(prefix="/api/v1/extraction", tags=["downloads"])
+
+def _list_or_400(download_service: DownloadService, file_id: str, stage: str):
+    try:
+        return download_service.list_job_files(file_id, stage)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/{file_id}/files", response_model=JobFilesResponse)
+async def list_files(file_id: str, download_service: DownloadService = Depends(get_download_service)):
+    """List a job's extracted and translated table files"""
+    extracted = _list_or_400(download_service, file_id, "extracted")
+    translated = _list_or_400(download_service, file_id, "translated")
+    if not extracted and not translated:
+        raise HTTPException(status_code=404, detail=f"No files for job '{file_id}'")
+    
+    return JobFilesResponse(
+        file_id=file_id,
+        extracted_files=[p.name for p in extracted],
+        translated_files=[p.name for p in translated]
+    )
+
+@router.get("/{file_id}/files/{stage}/{filename}")
+async def download_file(
+    file_id: str,
+    stage: str,
+    filename: str,
+    request: Request,
+    download_service: DownloadService = Depends(get_download_service)
+):
+    """Stream one table file (gzip/zstd per Accept-Encoding, 304 on matching validators)"""
+    _list_or_400(download_service, file_id, stage)
+    path = download_service.get_job_file(file_id, stage, filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"File '{filename}' not found")
+    
+    encoding = download_service.negotiate_encoding(request.headers.get("accept-encoding"), path)
+    etag = download_service.file_etag(path, encoding)
+    mtime = download_service.last_modified([path])
+    headers = {
+        "ETag": etag,
+        "Last-Modified": download_service.http_date(mtime),
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    
+    if download_service.is_not_modified(request.headers, etag, mtime):
+        return Response(status_code=304, headers=headers)
+    
+    media_type = MEDIA_TYPES.get(path.suffix.lower(), "application/octet-stream")
+    if encoding is None:
+        # FileResponse streams from disk and sets Content-Length
+        return FileResponse(path, media_type=media_type, filename=path.name, headers=headers)
+    
+    headers["Content-Encoding"] = encoding
+    headers["Content-Disposition"] = f'attachment; filename="{path.name}"'
+    return StreamingResponse(download_service.iter_file(path, encoding), media_type=media_type, headers=headers)
+
+@router.get("/{file_id}/bundle")
+async def download_bundle(
+    file_id: str,
+    request: Request,
+    stage: str = Query("all", description="extracted, translated or all"),
+    download_service: DownloadService = Depends(get_download_service)
+):
+    """Stream a zip with the job's table files"""
+    stages = ["extracted", "translated"] if stage == "all" else [stage]
+    members = {}
+    for st in stages:
+        for path in _list_or_400(download_service, file_id, st):
+            members[f"{st}/{path.name}"] = path
+    if not members:
+        raise HTTPException(status_code=404, detail=f"No files for job '{file_id}'")
+    
+    paths = list(members.values())
+    etag = download_service.bundle_etag(paths)
+    mtime = download_service.last_modified(paths)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": download_service.http_date(mtime),
+        "Cache-Control": "no-cache",
+    }
+    
+    if download_service.is_not_modified(request.headers, etag, mtime):
+        return Response(status_code=304, headers=headers)
+    
+    headers["Content-Disposition"] = f'attachment; filename="{file_id}_{stage}.zip"'
+    return StreamingResponse(download_service.iter_zip_bundle(members), media_type=MEDIA_TYPES[".zip"], headers=headers)
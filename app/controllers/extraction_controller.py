@@ -1,65 +1,92 @@
 # app/controllers/extraction_controller.py
-from fastapi import APIRouter, UploadFile, File, Depends
-from pathlib import Path
+from fastapi import APIRouter, UploadFile, File, Depends, Query, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+import asyncio
+import time
 import uuid
 
-from app.models.response_models import ExtractionResponse
+from app.models.response_models import CancellationStats, ExtractionResponse
 from app.core.config import settings
-from app.core.dependencies import (
-    get_detection_service,
-    get_extraction_service,
-    get_translation_service
-)
-from app.services.table_detection_service import TableDetectionService
-from app.services.pdf_extraction_service import PDFExtractionService
-from app.services.translation_service import TranslationService
+from app.core.dependencies import get_cancellation_metrics, get_pipeline_service
+from app.services.extraction_pipeline_service import ExtractionPipelineService, OUTPUT_FORMATS
 from app.handlers.file_handler import FileHandler
+from app.handlers.pdf_handler import PDFHandler
+from app.utils.cancellation import (
+    CancellationMetrics, CancellationToken, OperationCancelled, CLIENT_DISCONNECTED, DEADLINE_EXCEEDED
+)
+from app.utils.page_range import parse_page_range
 
 router = APIRouter(prefix="/api/v1/extraction", tags=["extraction"])
 
 @router.post("/extract-and-translate", response_model=ExtractionResponse)
 async def extract_and_translate(
+    request: Request,
     file: UploadFile = File(...),
-    detection_service: TableDetectionService = Depends(get_detection_service),
-    extraction_service: PDFExtractionService = Depends(get_extraction_service),
-    translation_service: TranslationService = Depends(get_translation_service)
+    pages: Optional[str] = Query(None, description="1-based page selection, e.g. '1-5,8,10-'"),
+    output_format: Optional[str] = Query(None, description="csv (one file per table), parquet, arrow or xlsx (one file per document)"),
+    timeout: Optional[float] = Query(None, gt=0, description="Give up after this many seconds (capped by the server deadline, if one is set)"),
+    pipeline_service: ExtractionPipelineService = Depends(get_pipeline_service),
+    cancellation_metrics: CancellationMetrics = Depends(get_cancellation_metrics)
 ):
     """
     Single endpoint - extracts and translates tables from PDF
     Controller is thin - delegates to services [web:41][web:42]
     """
+    output_format = (output_format or settings.OUTPUT_FORMAT).lower()
+    if output_format not in OUTPUT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported output format '{output_format}'")
+    
     # Generate file ID
     file_id = str(uuid.uuid4())
-    pdf_path = settings.UPLOAD_DIR / f"{file_id}.pdf"
+    pdf_path = FileHandler.shard_dir(settings.UPLOAD_DIR, file_id) / f"{file_id}.pdf"
     
     # Save uploaded file
     file_content = await file.read()
     FileHandler.save_uploaded_file(file_content, str(pdf_path))
     
-    # Step 1: Detect tables (service handles logic)
-    table_configs = detection_service.detect_all_tables(str(pdf_path))
+    # Resolve requested page range
+    try:
+        page_numbers = parse_page_range(pages, PDFHandler.get_page_count(str(pdf_path)))
+    except ValueError as e:
+        FileHandler.delete_file(str(pdf_path))
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Step 2: Extract tables
-    extracted_files = extraction_service.extract_tables(
-        str(pdf_path),
-        table_configs,
-        str(settings.EXTRACTED_DIR),
-        file_id
-    )
+    # Detect, extract and translate (service handles logic) on a worker thread, so this
+    # coroutine can notice the client going away and cancel the remaining pages/batches
+    deadlines = [t for t in (timeout, settings.REQUEST_DEADLINE_SECONDS) if t]
+    cancel_token = CancellationToken(min(deadlines) if deadlines else None)
+    start = time.perf_counter()
+    work = asyncio.ensure_future(run_in_threadpool(
+        pipeline_service.run, str(pdf_path), file_id, page_numbers, output_format, cancel_token
+    ))
+    try:
+        while not work.done():
+            await asyncio.wait({work}, timeout=settings.DISCONNECT_POLL_SECONDS)
+            if not work.done() and await request.is_disconnected():
+                cancel_token.cancel(CLIENT_DISCONNECTED)
+    except asyncio.CancelledError:
+        # Server dropped the request (shutdown / disconnect): stop the worker thread too
+        cancel_token.cancel(CLIENT_DISCONNECTED)
+        raise
     
-    # Step 3: Translate tables
-    translated_files = translation_service.translate_tables(
-        extracted_files,
-        str(settings.TRANSLATED_DIR)
-    )
-    
-    # Return response
-    return ExtractionResponse(
-        status="success",
-        file_id=file_id,
-        tables_detected=len(table_configs),
-        tables_extracted=len(extracted_files),
-        tables_translated=len(translated_files),
-        extracted_files=[Path(f).name for f in extracted_files],
-        translated_files=[Path(f).name for f in translated_files]
-    )
+    try:
+        return work.result()
+    except OperationCancelled as e:
+        cancellation_metrics.record(e, time.perf_counter() - start)
+        _discard_job(file_id, pdf_path)
+        # 499 (client closed request) is only seen in logs; the client is gone
+        raise HTTPException(status_code=504 if e.reason == DEADLINE_EXCEEDED else 499, detail=str(e))
+
+@router.get("/cancellations", response_model=CancellationStats)
+async def cancellation_stats(cancellation_metrics: CancellationMetrics = Depends(get_cancellation_metrics)):
+    """Requests cancelled (client gone / deadline) and the work they skipped, since startup"""
+    return CancellationStats(**cancellation_metrics.get_stats())
+
+def _discard_job(file_id: str, pdf_path):
+    """Remove the upload and any partial outputs of an abandoned job"""
+    FileHandler.delete_file(str(pdf_path))
+    for base_dir in (settings.EXTRACTED_DIR, settings.TRANSLATED_DIR):
+        shard = FileHandler.shard_dir(base_dir, file_id, create=False)
+        for path in FileHandler.get_files_by_pattern(str(shard), f"{file_id}*"):
+            FileHandler.delete_file(str(path))
@@ -0,0 +1,19 @@
+# app/controllers/glossary_controller.py
+from fastapi import APIRouter, Depends
+
+from app.models.response_models import GlossaryStats
+from app.core.dependencies import get_glossary_service
+from app.services.glossary_service import GlossaryService
+
+router = APIRouter(prefix="/api/v1/glossary", tags=["glossary"])
+
+@router.get("/stats", response_model=GlossaryStats)
+async def glossary_stats(glossary: GlossaryService = Depends(get_glossary_service)):
+    """Glossary size and hit rate since startup"""
+    return GlossaryStats(**glossary.get_stats())
+
+@router.post("/reload", response_model=GlossaryStats)
+async def reload_glossary(glossary: GlossaryService = Depends(get_glossary_service)):
+    """Reload the glossary file without restarting the server"""
+    glossary.reload()
+    return GlossaryStats(**glossary.get_stats())
@@ -0,0 +1,19 @@
+# app/controllers/layout_cache_controller.py
+from fastapi import APIRouter, Depends
+
+from app.models.response_models import LayoutCacheStats
+from app.core.dependencies import get_layout_cache_service
+from app.services.layout_cache_service import LayoutCacheService
+
+router = APIRouter(prefix="/api/v1/layout-cache", tags=["layout-cache"])
+
+@router.get("/stats", response_model=LayoutCacheStats)
+async def layout_cache_stats(layout_cache: LayoutCacheService = Depends(get_layout_cache_service)):
+    """Cached layouts and hit rate since startup"""
+    return LayoutCacheStats(**layout_cache.get_stats())
+
+@router.post("/clear", response_model=LayoutCacheStats)
+async def clear_layout_cache(layout_cache: LayoutCacheService = Depends(get_layout_cache_service)):
+    """Forget all cached layouts (e.g. after changing detection heuristics)"""
+    layout_cache.clear()
+    return LayoutCacheStats(**layout_cache.get_stats())
@@ -0,0 +1,66 @@
+# app/controllers/preview_controller.py
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response
+
+from app.models.response_models import PreviewCacheStats
+from app.core.config import settings
+from app.core.dependencies import get_preview_service
+from app.services.download_service import DownloadService
+from app.services.preview_service import PagePreviewService
+
+router = APIRouter(prefix="/api/v1/extraction", tags=["previews"])
+
+@router.get("/previews/stats", response_model=PreviewCacheStats)
+async def preview_cache_stats(preview_service: PagePreviewService = Depends(get_preview_service)):
+    """Preview cache size, open documents and hit rate since startup"""
+    return PreviewCacheStats(**preview_service.get_stats())
+
+@router.get("/{file_id}/pages/{page}/preview")
+async def page_preview(
+    file_id: str,
+    request: Request,
+    page: int = Path(..., ge=1, description="1-based page number"),
+    dpi: int = Query(120, ge=36, le=settings.PREVIEW_MAX_DPI),
+    table: Optional[int] = Query(None, ge=1, description="Crop to the N-th table detected on this page (1-based, page-local)"),
+    overlay: bool = Query(True, description="With table: draw its outline and column boundaries"),
+    preview_service: PagePreviewService = Depends(get_preview_service)
+):
+    """PNG of a page of an uploaded PDF (cached), optionally cropped to one detected table"""
+    try:
+        pdf_path = preview_service.source_pdf(file_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if pdf_path is None:
+        raise HTTPException(status_code=404, detail=f"No uploaded PDF for job '{file_id}'")
+    
+    try:
+        page_count = await run_in_threadpool(preview_service.page_count, pdf_path)
+        if page > page_count:
+            raise HTTPException(status_code=400, detail=f"Page {page} out of range (document has {page_count} pages)")
+        
+        clip, columns = None, None
+        if table is not None:
+            config = await run_in_threadpool(preview_service.page_table, pdf_path, page - 1, table)
+            if config is None:
+                raise HTTPException(status_code=404, detail=f"No table {table} detected on page {page}")
+            clip = (config.bbox.x0, config.bbox.y0, config.bbox.x1, config.bbox.y1)
+            columns = config.columns if overlay else None
+        
+        path, key = await run_in_threadpool(preview_service.preview, pdf_path, page - 1, dpi, clip, columns)
+    except FileNotFoundError:
+        # Upload evicted/discarded while we were working
+        raise HTTPException(status_code=404, detail=f"No uploaded PDF for job '{file_id}'")
+    
+    # Same upload + parameters = same image, so the cache key is a strong validator
+    etag = f'"{key[:32]}"'
+    mtime = pdf_path.stat().st_mtime
+    headers = {
+        "ETag": etag,
+        "Last-Modified": DownloadService.http_date(mtime),
+        "Cache-Control": "private, max-age=3600",
+    }
+    if DownloadService.is_not_modified(request.headers, etag, mtime):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type="image/png", headers=headers)
@@ -0,0 +1,19 @@
+# app/controllers/storage_controller.py
+from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
+
+from app.models.response_models import StorageStats, StorageSweepReport
+from app.core.dependencies import get_storage_service
+from app.services.storage_service import StorageLifecycleService
+
+router = APIRouter(prefix="/api/v1/storage", tags=["storage"])
+
+@router.get("/stats", response_model=StorageStats)
+async def storage_stats(storage_service: StorageLifecycleService = Depends(get_storage_service)):
+    """Disk usage of the data directories and reclaimed space so far"""
+    return StorageStats(**await run_in_threadpool(storage_service.get_stats))
+
+@router.post("/sweep", response_model=StorageSweepReport)
+async def sweep_storage(storage_service: StorageLifecycleService = Depends(get_storage_service)):
+    """Run an eviction sweep now instead of waiting for the background task"""
+    return StorageSweepReport(**await run_in_threadpool(storage_service.sweep))
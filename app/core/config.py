@@ -1,6 +1,7 @@
 # app/core/config.py
 from pydantic_settings import BaseSettings
 from pathlib import Path
+from typing import Optional
 
 class Settings(BaseSettings):
     """Application settings"""
@@ -16,8 +17,93 @@ class Settings(BaseSettings):
     EXTRACTED_DIR: Path = BASE_DIR / "data" / "tables" / "extracted"
     TRANSLATED_DIR: Path = BASE_DIR / "data" / "tables" / "translated"
     
+    # Requests are cancelled when the client disconnects, past the per-request ?timeout=,
+    # or past this server-wide cap (None = no cap; set it to bound every request)
+    REQUEST_DEADLINE_SECONDS: Optional[float] = None
+    DISCONNECT_POLL_SECONDS: float = 1.0
+    
+    # Storage lifecycle: evict job artifacts past the TTL, then oldest over the quota
+    # (opt-in; only sharded job files are managed, running distributed jobs are skipped)
+    STORAGE_LIFECYCLE_ENABLED: bool = False
+    STORAGE_TTL_HOURS: Optional[float] = 24 * 7
+    STORAGE_QUOTA_MB: Optional[float] = 10 * 1024
+    STORAGE_SWEEP_INTERVAL_SECONDS: int = 3600
+    STORAGE_MIN_AGE_SECONDS: int = 600
+    
+    # Page previews for the review UI: rendered PNGs in an LRU disk cache (None = unbounded)
+    PREVIEW_CACHE_DIR: Path = BASE_DIR / "data" / "previews"
+    PREVIEW_CACHE_MB: Optional[float] = 512
+    PREVIEW_MAX_DPI: int = 300
+    PREVIEW_OPEN_DOCUMENTS: int = 16
+    
+    # Output: "csv" (one file per table) or "parquet"/"arrow"/"xlsx" (one file per document)
+    OUTPUT_FORMAT: str = "csv"
+    
+    # PDF word extraction backend: "pdfplumber" (reference) or "pymupdf" (faster)
+    WORD_BACKEND: str = "pdfplumber"
+    
+    # Table detection: "heuristic" (word density only) or "ruling" (opt-in: bbox/columns
+    # from vector grid lines, word heuristics on pages without a grid)
+    DETECTION_MODE: str = "heuristic"
+    
+    # Page triage: skip text-only/empty pages (opt-in; FORCE_ALL runs every page, for auditing)
+    PAGE_TRIAGE_ENABLED: bool = False
+    PAGE_TRIAGE_FORCE_ALL: bool = False
+    
+    # Reuse TableConfigs across pages sharing a layout (fingerprint tolerances in points).
+    # Opt-in: the cache is process-wide, so layouts are shared across all uploaded documents
+    LAYOUT_CACHE_ENABLED: bool = False
+    LAYOUT_CACHE_SIZE: int = 256
+    LAYOUT_CACHE_Y_TOLERANCE: float = 3.0
+    LAYOUT_CACHE_X_TOLERANCE: float = 20.0
+    
+    # Overlap stages: translate page N while page N+1 is detected/extracted (queue bound in pages).
+    # EXTRACT_WORKERS > 1 detects/extracts batches of BATCH_PAGES pages in that many worker processes
+    PIPELINE_OVERLAP_ENABLED: bool = False
+    PIPELINE_QUEUE_PAGES: int = 4
+    PIPELINE_EXTRACT_WORKERS: int = 1
+    PIPELINE_BATCH_PAGES: int = 4
+    
+    # Content-addressed stage artifacts (words, configs, tables, translations) for incremental reruns;
+    # least recently used evicted above the size limit (None = unbounded). Job manifests and
+    # extractions are pinned (retranslate needs them) and do not count against the limit.
+    # Overlapped stages are not used while the store is enabled
+    ARTIFACT_STORE_ENABLED: bool = False
+    ARTIFACT_STORE_DIR: Path = BASE_DIR / "data" / "artifacts"
+    ARTIFACT_STORE_MAX_MB: Optional[float] = 2048
+    
+    # Distributed page tasks: queue shared by the coordinator and workers on any node
+    QUEUE_BACKEND: str = "sqlite"
+    QUEUE_PATH: Path = BASE_DIR / "data" / "queue" / "tasks.sqlite3"
+    QUEUE_LEASE_SECONDS: int = 600
+    QUEUE_MAX_ATTEMPTS: int = 3
+    
     # ML Model
     TRANSLATION_MODEL: str = "Helsinki-NLP/opus-mt-ar-en"
+    # Cells longer than this (model tokens) are translated sentence/clause by sentence/clause
+    TRANSLATION_MAX_SEGMENT_TOKENS: int = 100
+    # "marian" (real model) or "stub" (no weights, for load tests; optional fake latency)
+    TRANSLATOR_BACKEND: str = "marian"
+    TRANSLATOR_STUB_LATENCY_PER_BATCH_MS: float = 0.0
+    TRANSLATOR_STUB_LATENCY_PER_STRING_MS: float = 0.0
+    # >1: that many model replicas in separate processes, each pinned to its own cores;
+    # a document's strings are sharded across them by token budget
+    TRANSLATOR_REPLICAS: int = 1
+    TRANSLATOR_THREADS_PER_REPLICA: Optional[int] = None  # None = cores / replicas
+    TRANSLATOR_SHARD_TOKENS: int = 2048
+    # Parent-side cache of whole strings (LRU); replicas keep their own segment caches
+    TRANSLATOR_POOL_CACHE_SIZE: int = 50000
+    
+    # Gather unique strings from every table of a document and translate them in one pass
+    TRANSLATION_DOCUMENT_LEVEL: bool = True
+    
+    # Translate CSVs above this size in row chunks (bounded memory); None disables
+    TRANSLATION_STREAM_THRESHOLD_MB: Optional[float] = 16
+    TRANSLATION_CHUNK_ROWS: int = 5000
+    
+    # Glossary / translation memory (.csv/.tsv/.json); known terms skip the model
+    GLOSSARY_PATH: Optional[Path] = BASE_DIR / "data" / "glossary" / "accounting_ar_en.csv"
+    GLOSSARY_PHRASE_MATCH: bool = True
     
     class Config:
         env_file = ".env"
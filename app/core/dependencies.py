@@ -1,24 +1,184 @@
 # app/core/dependencies.py
 from functools import lru_cache
+from app.core.config import settings
 from app.ml_models.translator_model import TranslatorModel
+from app.ml_models.stub_translator import StubTranslatorModel
+from app.ml_models.translator_pool import TranslatorPool
 from app.services.table_detection_service import TableDetectionService
 from app.services.pdf_extraction_service import PDFExtractionService
 from app.services.translation_service import TranslationService
+from app.services.glossary_service import GlossaryService
+from app.services.extraction_pipeline_service import ExtractionPipelineService
+from app.services.extraction_pool_service import PageExtractionPool
+from app.services.download_service import DownloadService
+from app.services.preview_service import PagePreviewService
+from app.services.storage_service import StorageLifecycleService
+from app.services.layout_cache_service import LayoutCacheService
+from app.services.artifact_store_service import ArtifactStore, CachedWordSource
+from app.services.page_triage_service import PageTriageService
+from app.services.work_queue_service import WorkQueue, get_work_queue
+from app.services.distributed_pipeline_service import DistributedCoordinator, PageWorker
+from app.utils.cancellation import CancellationMetrics
 
 @lru_cache()
 def get_translator_model() -> TranslatorModel:
     """Singleton translator model - loaded once [web:42]"""
-    return TranslatorModel()
+    if settings.TRANSLATOR_REPLICAS > 1:
+        stub_options = {
+            "latency_per_batch_ms": settings.TRANSLATOR_STUB_LATENCY_PER_BATCH_MS,
+            "latency_per_string_ms": settings.TRANSLATOR_STUB_LATENCY_PER_STRING_MS,
+        }
+        return TranslatorPool(
+            settings.TRANSLATION_MODEL,
+            replicas=settings.TRANSLATOR_REPLICAS,
+            threads_per_replica=settings.TRANSLATOR_THREADS_PER_REPLICA,
+            shard_tokens=settings.TRANSLATOR_SHARD_TOKENS,
+            max_segment_tokens=settings.TRANSLATION_MAX_SEGMENT_TOKENS,
+            backend=settings.TRANSLATOR_BACKEND,
+            replica_options=stub_options if settings.TRANSLATOR_BACKEND == "stub" else None,
+            cache_size=settings.TRANSLATOR_POOL_CACHE_SIZE
+        )
+    if settings.TRANSLATOR_BACKEND == "stub":
+        return StubTranslatorModel(
+            latency_per_batch_ms=settings.TRANSLATOR_STUB_LATENCY_PER_BATCH_MS,
+            latency_per_string_ms=settings.TRANSLATOR_STUB_LATENCY_PER_STRING_MS
+        )
+    return TranslatorModel(settings.TRANSLATION_MODEL, max_segment_tokens=settings.TRANSLATION_MAX_SEGMENT_TOKENS)
+
+@lru_cache()
+def get_glossary_service() -> GlossaryService:
+    """Singleton glossary - reloadable at runtime"""
+    return GlossaryService(settings.GLOSSARY_PATH, phrase_match=settings.GLOSSARY_PHRASE_MATCH)
+
+@lru_cache()
+def get_layout_cache_service() -> LayoutCacheService:
+    """Singleton layout-fingerprint cache shared by all requests"""
+    return LayoutCacheService(
+        max_entries=settings.LAYOUT_CACHE_SIZE,
+        y_tolerance=settings.LAYOUT_CACHE_Y_TOLERANCE,
+        x_tolerance=settings.LAYOUT_CACHE_X_TOLERANCE
+    )
+
+@lru_cache()
+def get_cancellation_metrics() -> CancellationMetrics:
+    """Singleton counters of cancelled requests"""
+    return CancellationMetrics()
+
+@lru_cache()
+def get_artifact_store() -> ArtifactStore:
+    """Singleton stage artifact store"""
+    return ArtifactStore(str(settings.ARTIFACT_STORE_DIR), max_size_mb=settings.ARTIFACT_STORE_MAX_MB)
 
 def get_detection_service() -> TableDetectionService:
     """Get table detection service"""
-    return TableDetectionService()
+    layout_cache = get_layout_cache_service() if settings.LAYOUT_CACHE_ENABLED else None
+    page_triage = PageTriageService() if settings.PAGE_TRIAGE_ENABLED else None
+    detection_service = TableDetectionService(
+        word_backend=settings.WORD_BACKEND,
+        layout_cache=layout_cache,
+        page_triage=page_triage,
+        triage_force_all=settings.PAGE_TRIAGE_FORCE_ALL,
+        detection_mode=settings.DETECTION_MODE
+    )
+    if settings.ARTIFACT_STORE_ENABLED:
+        detection_service.word_source = CachedWordSource(detection_service.word_source, get_artifact_store())
+    return detection_service
 
 def get_extraction_service() -> PDFExtractionService:
     """Get PDF extraction service"""
-    return PDFExtractionService()
+    extraction_service = PDFExtractionService(word_backend=settings.WORD_BACKEND)
+    if settings.ARTIFACT_STORE_ENABLED:
+        extraction_service.word_source = CachedWordSource(extraction_service.word_source, get_artifact_store())
+    return extraction_service
 
 def get_translation_service() -> TranslationService:
     """Get translation service"""
     translator = get_translator_model()
-    return TranslationService(translator)
+    threshold_mb = settings.TRANSLATION_STREAM_THRESHOLD_MB
+    return TranslationService(
+        translator,
+        glossary=get_glossary_service(),
+        stream_threshold_bytes=int(threshold_mb * 1024 * 1024) if threshold_mb is not None else None,
+        chunk_rows=settings.TRANSLATION_CHUNK_ROWS,
+        document_level=settings.TRANSLATION_DOCUMENT_LEVEL
+    )
+
+@lru_cache()
+def get_extraction_pool() -> PageExtractionPool:
+    """Singleton page detect/extract worker processes for the overlapped pipeline"""
+    return PageExtractionPool(settings.PIPELINE_EXTRACT_WORKERS, batch_pages=settings.PIPELINE_BATCH_PAGES)
+
+def get_pipeline_service() -> ExtractionPipelineService:
+    """Get end-to-end extraction pipeline"""
+    return ExtractionPipelineService(
+        get_detection_service(),
+        get_extraction_service(),
+        get_translation_service(),
+        extracted_dir=str(settings.EXTRACTED_DIR),
+        translated_dir=str(settings.TRANSLATED_DIR),
+        artifact_store=get_artifact_store() if settings.ARTIFACT_STORE_ENABLED else None,
+        overlap_stages=settings.PIPELINE_OVERLAP_ENABLED,
+        overlap_queue_pages=settings.PIPELINE_QUEUE_PAGES,
+        extraction_pool=(
+            get_extraction_pool() if settings.PIPELINE_OVERLAP_ENABLED and settings.PIPELINE_EXTRACT_WORKERS > 1 else None
+        )
+    )
+
+def get_download_service() -> DownloadService:
+    """Get result download service"""
+    return DownloadService(str(settings.EXTRACTED_DIR), str(settings.TRANSLATED_DIR))
+
+@lru_cache()
+def get_preview_service() -> PagePreviewService:
+    """Singleton page-preview renderer (open documents + disk cache shared by all requests)"""
+    # Own detector without triage: crops must find tables on every page, and must not
+    # overwrite a pipeline's triage report
+    detection_service = TableDetectionService(word_backend=settings.WORD_BACKEND, detection_mode=settings.DETECTION_MODE)
+    if settings.ARTIFACT_STORE_ENABLED:
+        detection_service.word_source = CachedWordSource(detection_service.word_source, get_artifact_store())
+    return PagePreviewService(
+        str(settings.UPLOAD_DIR),
+        str(settings.PREVIEW_CACHE_DIR),
+        max_cache_mb=settings.PREVIEW_CACHE_MB,
+        max_open_documents=settings.PREVIEW_OPEN_DOCUMENTS,
+        detection_service=detection_service
+    )
+
+@lru_cache()
+def get_storage_service() -> StorageLifecycleService:
+    """Singleton storage lifecycle manager (keeps last sweep report)"""
+    return StorageLifecycleService(
+        [settings.UPLOAD_DIR, settings.EXTRACTED_DIR, settings.TRANSLATED_DIR],
+        ttl_hours=settings.STORAGE_TTL_HOURS,
+        quota_mb=settings.STORAGE_QUOTA_MB,
+        min_age_seconds=settings.STORAGE_MIN_AGE_SECONDS,
+        work_queue=get_work_queue_service()
+    )
+
+@lru_cache()
+def get_work_queue_service() -> WorkQueue:
+    """Singleton page-task queue (one connection per thread)"""
+    return get_work_queue(
+        settings.QUEUE_BACKEND,
+        str(settings.QUEUE_PATH),
+        lease_seconds=settings.QUEUE_LEASE_SECONDS,
+        max_attempts=settings.QUEUE_MAX_ATTEMPTS
+    )
+
+def get_distributed_coordinator() -> DistributedCoordinator:
+    """Get coordinator for page-sharded jobs"""
+    return DistributedCoordinator(
+        get_work_queue_service(),
+        extracted_dir=str(settings.EXTRACTED_DIR),
+        translated_dir=str(settings.TRANSLATED_DIR)
+    )
+
+def get_page_worker(stages=None) -> PageWorker:
+    """Get a page-task worker wired to the configured services"""
+    return PageWorker(
+        get_work_queue_service(),
+        get_detection_service(),
+        get_extraction_service(),
+        get_translation_service(),
+        stages=stages
+    )
@@ -11,6 +11,14 @@ class FileHandler:
         """Create directory if it doesn't exist"""
         Path(directory).mkdir(parents=True, exist_ok=True)
     
+    @staticmethod
+    def shard_dir(base_dir: str, file_id: str, create: bool = True) -> Path:
+        """Per-job shard directory (base/ab/ for id 'ab...') - keeps directories small"""
+        directory = Path(base_dir) / file_id[:2]
+        if create:
+            directory.mkdir(parents=True, exist_ok=True)
+        return directory
+    
     @staticmethod
     def save_uploaded_file(file_content: bytes, output_path: str) -> str:
         """Save uploaded file to disk"""
@@ -1,7 +1,7 @@
 # app/handlers/pdf_handler.py
 import fitz
 import pdfplumber
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
 from pathlib import Path
 
 class PDFHandler:
@@ -15,12 +15,42 @@ class PDFHandler:
         doc.close()
         return count
     
+    @staticmethod
+    def iter_pages(pdf_path: str, page_numbers: Optional[Iterable[int]] = None) -> Iterator[Tuple[int, "pdfplumber.page.Page"]]:
+        """
+        Stream pages from ONE open pdfplumber handle (0-based page numbers).
+        Each page's layout objects are released as soon as the caller moves on,
+        so memory stays flat no matter how many pages the document has.
+        """
+        # pdfplumber takes 1-based numbers and only builds Page objects for these
+        pages_to_parse = None
+        if page_numbers is not None:
+            pages_to_parse = sorted(set(n + 1 for n in page_numbers))
+            if not pages_to_parse:
+                return
+        
+        with pdfplumber.open(pdf_path, pages=pages_to_parse) as pdf:
+            for page in pdf.pages:
+                try:
+                    yield page.page_number - 1, page
+                finally:
+                    PDFHandler.release_page(page)
+    
+    @staticmethod
+    def release_page(page):
+        """Drop cached pdfminer layout objects held by a pdfplumber page"""
+        close = getattr(page, "close", None)  # pdfplumber >= 0.11
+        if callable(close):
+            close()
+        else:
+            page.flush_cache()
+    
     @staticmethod
     def extract_words_from_page(pdf_path: str, page_num: int) -> List[Dict]:
         """Extract all words from a PDF page"""
-        with pdfplumber.open(pdf_path) as pdf:
-            page = pdf.pages[page_num]
+        for _, page in PDFHandler.iter_pages(pdf_path, [page_num]):
             return page.extract_words()
+        raise IndexError(f"Page {page_num} out of range")
     
     @staticmethod
     def get_page_dimensions(pdf_path: str, page_num: int) -> tuple:
@@ -30,12 +60,43 @@ class PDFHandler:
             return page.width, page.height
     
     @staticmethod
-    def render_page_to_image(pdf_path: str, page_num: int, output_path: str, dpi: int = 120):
-        """Render page to PNG image"""
-        doc = fitz.open(pdf_path)
-        page = doc[page_num]
-        pix = page.get_pixmap(dpi=dpi)
-        pix.save(output_path)
-        doc.close()
+    def render_page_to_image(
+        pdf_path: str,
+        page_num: int,
+        output_path: str,
+        dpi: int = 120,
+        clip: Optional[Tuple[float, float, float, float]] = None,
+        overlay_columns: Optional[List[float]] = None,
+        doc: Optional["fitz.Document"] = None
+    ):
+        """
+        Render page to PNG image - optionally only the `clip` rectangle (PDF points),
+        with the clip outline and `overlay_columns` boundaries drawn on top.
+        Pass an open `doc` to reuse it (it is not closed).
+        """
+        own_doc = doc is None
+        if own_doc:
+            doc = fitz.open(pdf_path)
+        try:
+            page = doc[page_num]
+            rect = fitz.Rect(clip) & page.rect if clip else page.rect
+            pix = page.get_pixmap(dpi=dpi, clip=rect, alpha=False)
+            
+            if clip and overlay_columns is not None:
+                # Drawn on the pixmap, so the (shared) document itself is never modified
+                scale = dpi / 72
+                t = max(1, round(scale))
+                # A clipped pixmap's coordinates start at its irect origin, not at 0
+                ox, oy, w, h = pix.x, pix.y, pix.width, pix.height
+                for x0, y0, x1, y1 in [(0, 0, w, t), (0, h - t, w, h), (0, 0, t, h), (w - t, 0, w, h)]:
+                    pix.set_rect(fitz.IRect(ox + x0, oy + y0, ox + x1, oy + y1), (30, 90, 220))
+                for x in overlay_columns:
+                    px = round((x - rect.x0) * scale)
+                    if t < px < w - t:
+                        pix.set_rect(fitz.IRect(ox + px - t // 2, oy, ox + px - t // 2 + t, oy + h), (220, 30, 30))
+            
+            pix.save(output_path, output="png")
+        finally:
+            if own_doc:
+                doc.close()
         return output_path
-
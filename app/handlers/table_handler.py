@@ -1,7 +1,8 @@
 # app/handlers/table_handler.py
-from typing import List, Dict
+from pathlib import Path
+from typing import List, Dict, Optional
 import pandas as pd
-from app.models.table_models import BoundingBox
+from app.models.table_models import BoundingBox, TableData
 from app.utils.arabic_utils import fix_rtl_token, has_arabic_letter
 
 class TableHandler:
@@ -67,3 +68,108 @@ class TableHandler:
         df = pd.DataFrame(table_rows)
         df.to_csv(output_path, index=False, encoding='utf-8-sig')
         return output_path
+    
+    @staticmethod
+    def save_stage_tables(
+        tables: List[TableData],
+        output_dir: str,
+        file_id: str,
+        output_format: str,
+        suffix: str = ""
+    ) -> List[str]:
+        """Write one stage's tables: a CSV per table, or one parquet/arrow/xlsx file per document"""
+        output_dir = Path(output_dir)
+        if output_format == "csv":
+            paths = [
+                TableHandler.save_table_to_csv(t.rows, str(output_dir / f"{file_id}_{t.table_id}{suffix}.csv"))
+                for t in tables
+            ]
+        else:
+            paths = [TableHandler.save_tables(
+                tables, str(output_dir / f"{file_id}_tables{suffix}.{output_format}"), output_format, file_id
+            )]
+        return [p for p in paths if p]
+    
+    @staticmethod
+    def save_tables(tables: List[TableData], output_path: str, output_format: str, document_id: str) -> Optional[str]:
+        """Save ALL tables of a document into one parquet/arrow/xlsx file"""
+        if output_format in ("parquet", "arrow"):
+            return TableHandler.save_tables_to_arrow(tables, output_path, document_id, output_format)
+        if output_format == "xlsx":
+            return TableHandler.save_tables_to_xlsx(tables, output_path)
+        raise ValueError(f"Unsupported output format '{output_format}'")
+    
+    @staticmethod
+    def save_tables_to_arrow(tables: List[TableData], output_path: str, document_id: str, output_format: str = "parquet") -> Optional[str]:
+        """
+        Write tables as one long Parquet/Arrow file: document_id, page (1-based, like
+        the API and the xlsx sheet names), table_id, row_index, col_0..col_N (padded
+        with nulls). Each table becomes one row group/record batch, built straight
+        from the row lists - no DataFrames.
+        """
+        if not tables:
+            return None
+        
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("pyarrow is required for parquet/arrow output (pip install pyarrow)")
+        
+        n_cols = max(max((len(r) for r in t.rows), default=0) for t in tables)
+        schema = pa.schema(
+            [("document_id", pa.string()), ("page", pa.int32()), ("table_id", pa.string()), ("row_index", pa.int32())]
+            + [(f"col_{i}", pa.string()) for i in range(n_cols)]
+        )
+        
+        if output_format == "parquet":
+            writer = pq.ParquetWriter(output_path, schema, compression="zstd")
+            write = writer.write_table
+        else:
+            writer = pa.ipc.new_file(output_path, schema)
+            write = writer.write_batch
+        
+        try:
+            for table in tables:
+                n_rows = len(table.rows)
+                columns = [
+                    pa.array([document_id] * n_rows, pa.string()),
+                    pa.array([table.page + 1] * n_rows, pa.int32()),
+                    pa.array([table.table_id] * n_rows, pa.string()),
+                    pa.array(range(n_rows), pa.int32()),
+                ]
+                
+                # Transpose rows into columns in one pass (short rows stay null)
+                cells = [[None] * n_rows for _ in range(n_cols)]
+                for r, row in enumerate(table.rows):
+                    for i, value in enumerate(row):
+                        cells[i][r] = value
+                columns += [pa.array(col, pa.string()) for col in cells]
+                
+                batch = pa.RecordBatch.from_arrays(columns, schema=schema)
+                write(pa.Table.from_batches([batch]) if output_format == "parquet" else batch)
+        finally:
+            writer.close()
+        
+        return output_path
+    
+    @staticmethod
+    def save_tables_to_xlsx(tables: List[TableData], output_path: str) -> Optional[str]:
+        """Write tables into one workbook, one sheet per table named p<page>_<table_id> (1-based page; streamed, write-only mode)"""
+        if not tables:
+            return None
+        
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise RuntimeError("openpyxl is required for xlsx output (pip install openpyxl)")
+        
+        workbook = Workbook(write_only=True)
+        for table in tables:
+            # Sheet names are limited to 31 chars
+            sheet = workbook.create_sheet(title=f"p{table.page + 1}_{table.table_id}"[:31])
+            for row in table.rows:
+                sheet.append(row)
+        workbook.save(output_path)
+        
+        return output_path
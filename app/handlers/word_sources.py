@@ -0,0 +1,110 @@
+# app/handlers/word_sources.py
+import unicodedata
+import fitz
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
+from app.handlers.pdf_handler import PDFHandler
+
+# (page_num, words, page_width, page_height) - words use pdfplumber's dict shape
+PageWords = Tuple[int, List[Dict], float, float]
+
+class PdfplumberWordSource:
+    """Words from pdfplumber/pdfminer (reference backend)"""
+    
+    name = "pdfplumber"
+    
+    def iter_pages(self, pdf_path: str, page_numbers: Optional[Iterable[int]] = None) -> Iterator[PageWords]:
+        """Yield each page's words, releasing its layout objects afterwards"""
+        for page_num, page in PDFHandler.iter_pages(pdf_path, page_numbers):
+            yield page_num, page.extract_words(), page.width, page.height
+
+class PyMuPDFWordSource:
+    """
+    Words from MuPDF's text extraction - several times faster than pdfminer.
+    Rebuilds words the way pdfplumber does (line clustering on `top`, x-gap
+    splitting, visual left-to-right character order, presentation forms kept)
+    so downstream RTL handling sees identical tokens.
+    """
+    
+    name = "pymupdf"
+    
+    def __init__(self, x_tolerance: float = 3, y_tolerance: float = 3):
+        self.x_tolerance = x_tolerance
+        self.y_tolerance = y_tolerance
+    
+    def iter_pages(self, pdf_path: str, page_numbers: Optional[Iterable[int]] = None) -> Iterator[PageWords]:
+        """Yield each page's words from one open fitz document"""
+        doc = fitz.open(pdf_path)
+        try:
+            numbers = range(doc.page_count) if page_numbers is None else sorted(set(page_numbers))
+            for page_num in numbers:
+                if not 0 <= page_num < doc.page_count:
+                    continue
+                page = doc[page_num]
+                words = self.extract_words(page)
+                yield page_num, words, page.rect.width, page.rect.height
+        finally:
+            doc.close()
+    
+    def extract_words(self, page) -> List[Dict]:
+        """Extract words from a fitz page in pdfplumber's dict shape"""
+        flags = fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_PRESERVE_WHITESPACE
+        raw = page.get_text("rawdict", flags=flags)
+        
+        # Collect chars with pdfminer-style boxes (fontsize tall, sitting on the descent)
+        chars = []
+        for block in raw["blocks"]:
+            for line in block.get("lines", []):
+                for span in line["spans"]:
+                    size = span["size"]
+                    base = None
+                    for c in span["chars"]:
+                        bottom = c["origin"][1] - size * span["descender"]
+                        x0, x1 = c["bbox"][0], c["bbox"][2]
+                        if base is not None and x0 == x1 and unicodedata.combining(c["c"]):
+                            # Zero-width mark: MuPDF puts it at the pen origin, pdfminer over
+                            # its base glyph (the previous char in logical order)
+                            x0 = x1 = (base[0] + base[2]) / 2
+                        else:
+                            base = c["bbox"]
+                        chars.append((c["c"], x0, x1, bottom - size, bottom))
+        
+        # Cluster into lines by top (same rule as pdfplumber's cluster_objects)
+        chars.sort(key=lambda c: c[3])
+        lines, last_top = [], None
+        for ch in chars:
+            if last_top is None or ch[3] > last_top + self.y_tolerance:
+                lines.append([])
+            lines[-1].append(ch)
+            last_top = ch[3]
+        
+        # Split each line into words on whitespace and x gaps
+        words = []
+        for line in lines:
+            line.sort(key=lambda c: c[1])
+            current = None
+            for text, x0, x1, top, bottom in line:
+                if text.isspace():
+                    current = None
+                    continue
+                if current is not None and x0 <= current["x1"] + self.x_tolerance:
+                    current["text"] += text
+                    current["x1"] = max(current["x1"], x1)
+                    current["top"] = min(current["top"], top)
+                    current["bottom"] = max(current["bottom"], bottom)
+                else:
+                    current = {"text": text, "x0": x0, "x1": x1, "top": top, "bottom": bottom}
+                    words.append(current)
+        
+        return words
+
+WORD_SOURCES = {
+    PdfplumberWordSource.name: PdfplumberWordSource,
+    PyMuPDFWordSource.name: PyMuPDFWordSource,
+}
+
+def get_word_source(backend: str = "pdfplumber"):
+    """Create the word-source backend registered under `backend`"""
+    try:
+        return WORD_SOURCES[backend.lower()]()
+    except KeyError:
+        raise ValueError(f"Unknown word backend '{backend}' (expected one of: {', '.join(WORD_SOURCES)})")
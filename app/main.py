@@ -1,15 +1,53 @@
 # app/main.py
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.controllers import extraction_controller
+from app.controllers import (
+    extraction_controller,
+    download_controller,
+    distributed_controller,
+    glossary_controller,
+    layout_cache_controller,
+    preview_controller,
+    storage_controller
+)
 from app.core.config import settings
+from app.core.dependencies import (
+    get_extraction_pool,
+    get_preview_service,
+    get_storage_service,
+    get_translator_model
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start/stop background tasks"""
+    sweeper = None
+    if settings.STORAGE_LIFECYCLE_ENABLED:
+        sweeper = asyncio.create_task(
+            get_storage_service().run_forever(settings.STORAGE_SWEEP_INTERVAL_SECONDS)
+        )
+    
+    yield
+    
+    if sweeper:
+        sweeper.cancel()
+    # Only if a request actually loaded it
+    if get_translator_model.cache_info().currsize and hasattr(get_translator_model(), "close"):
+        get_translator_model().close()
+    if get_preview_service.cache_info().currsize:
+        get_preview_service().close()
+    if get_extraction_pool.cache_info().currsize:
+        get_extraction_pool().close()
 
 def create_app() -> FastAPI:
     """Create FastAPI application"""
     app = FastAPI(
         title=settings.APP_NAME,
         version=settings.APP_VERSION,
-        debug=settings.DEBUG
+        debug=settings.DEBUG,
+        lifespan=lifespan
     )
     
     # CORS
@@ -23,6 +61,12 @@ def create_app() -> FastAPI:
     
     # Register routers
     app.include_router(extraction_controller.router)
+    app.include_router(download_controller.router)
+    app.include_router(distributed_controller.router)
+    app.include_router(glossary_controller.router)
+    app.include_router(layout_cache_controller.router)
+    app.include_router(preview_controller.router)
+    app.include_router(storage_controller.router)
     
     return app
 
@@ -0,0 +1,39 @@
+# app/ml_models/stub_translator.py
+import time
+from typing import List, Optional
+import logging
+from app.utils.cancellation import CancellationToken
+
+logger = logging.getLogger(__name__)
+
+class StubTranslatorModel:
+    """
+    Drop-in stand-in for TranslatorModel that needs no weights.
+    Returns "[en] <text>" and can sleep to mimic model latency (load tests, CI).
+    """
+    
+    def __init__(self, latency_per_batch_ms: float = 0.0, latency_per_string_ms: float = 0.0):
+        self.model_name = "stub"
+        self.latency_per_batch_ms = latency_per_batch_ms
+        self.latency_per_string_ms = latency_per_string_ms
+        logger.info("Using stub translator (no model loaded)")
+    
+    def translate_batch(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[str]:
+        if not texts:
+            return []
+        
+        # Sleep batch by batch so cancellation behaves like the real model
+        for i in range(0, len(texts), batch_size):
+            if cancel_token:
+                cancel_token.check("translate", batches=(len(texts) - i - 1) // batch_size + 1)
+            batch = texts[i : i + batch_size]
+            delay_ms = self.latency_per_batch_ms + len(batch) * self.latency_per_string_ms
+            if delay_ms:
+                time.sleep(delay_ms / 1000)
+        
+        return [f"[en] {t}" if t and t.strip() else t for t in texts]
@@ -1,9 +1,11 @@
 # app/ml_models/translator_model.py
 from transformers import MarianMTModel, MarianTokenizer
 import torch
-from typing import List, Dict
+from typing import List, Dict, Optional
 import re
 import logging
+from app.utils.cancellation import CancellationToken
+from app.utils.segmenter import segment_text
 
 logger = logging.getLogger(__name__)
 
@@ -12,13 +14,13 @@ class TranslatorModel:
     
     _instance = None  # Singleton pattern
     
-    def __new__(cls):
+    def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance._initialized = False
         return cls._instance
     
-    def __init__(self, model_name: str = "Helsinki-NLP/opus-mt-ar-en"):
+    def __init__(self, model_name: str = "Helsinki-NLP/opus-mt-ar-en", max_segment_tokens: int = 100):
         if self._initialized:
             return
         
@@ -27,7 +29,10 @@ class TranslatorModel:
         
         self.tokenizer = MarianTokenizer.from_pretrained(model_name)
         self.model = MarianMTModel.from_pretrained(model_name).to(self.device)
+        self.model_name = model_name
         self.cache: Dict[str, str] = {}
+        # Longer cells are split into sentences/clauses (model input is cut at 128 tokens)
+        self.max_segment_tokens = max_segment_tokens
         
         self._initialized = True
         logger.info("✅ Model loaded!")
@@ -38,10 +43,16 @@ class TranslatorModel:
             return False
         return bool(re.search(r"[\u0600-\u06FF]", text))
     
-    def translate_batch(self, texts: List[str], batch_size: int = 32) -> List[str]:
+    def translate_batch(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[str]:
         """
         Translate a list of strings in batches (FAST!)
         Uses caching to avoid re-translating identical strings
+        Stops between batches once cancel_token is cancelled
         """
         if not texts:
             return []
@@ -66,11 +77,53 @@ class TranslatorModel:
             logger.info("All strings found in cache!")
             return results
         
-        logger.info(f"Translating {len(uncached_texts)} new strings (cached: {len(texts) - len(uncached_texts)})...")
+        # Step 1: Split long cells into segments; short cells are their own single segment
+        segments_per_text = [self._segment(text) for text in uncached_texts]
+        new_segments = list(dict.fromkeys(
+            seg for segments in segments_per_text for seg in segments if seg not in self.cache
+        ))
+        split_count = sum(1 for segments in segments_per_text if len(segments) > 1)
+        
+        logger.info(f"Translating {len(new_segments)} new segments from {len(uncached_texts)} strings "
+                    f"({split_count} split, cached: {len(texts) - len(uncached_texts)})...")
+        
+        # Step 2: Translate unique segments, similar lengths batched together (less padding)
+        new_segments.sort(key=len)
+        self.cache.update(zip(new_segments, self._translate_segments(new_segments, batch_size, cancel_token)))
+        
+        # Step 3: Rejoin segments per cell, cache the whole cell too
+        for idx, original, segments in zip(uncached_indices, uncached_texts, segments_per_text):
+            translated = " ".join(self.cache[seg] for seg in segments)
+            self.cache[original] = translated
+            results[idx] = translated
+        
+        return results
+    
+    def _segment(self, text: str) -> List[str]:
+        """Sentence/clause segments of at most max_segment_tokens tokens"""
+        # Every token covers at least one character, so short strings need no tokenizing
+        if len(text) <= self.max_segment_tokens:
+            return [text]
+        return segment_text(text, self.max_segment_tokens, self._count_tokens)
+    
+    def _count_tokens(self, text: str) -> int:
+        return len(self.tokenizer([text], add_special_tokens=False)["input_ids"][0])
+    
+    def _translate_segments(
+        self,
+        uncached_texts: List[str],
+        batch_size: int,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[str]:
+        """Batch translate, then retry outputs that still contain Arabic with more beams"""
+        if not uncached_texts:
+            return []
         
         # Batch translate uncached strings
         translated_segments = []
         for i in range(0, len(uncached_texts), batch_size):
+            if cancel_token:
+                cancel_token.check("translate", batches=(len(uncached_texts) - i - 1) // batch_size + 1)
             batch = uncached_texts[i : i + batch_size]
             
             # Tokenize
@@ -114,6 +167,8 @@ class TranslatorModel:
             logger.info(f"Retrying {len(retry_texts)} poor translations with better settings...")
             
             for i in range(0, len(retry_texts), batch_size):
+                if cancel_token:
+                    cancel_token.check("translate", batches=(len(retry_texts) - i - 1) // batch_size + 1)
                 batch = retry_texts[i : i + batch_size]
                 encoded = self.tokenizer(
                     batch, 
@@ -141,9 +196,4 @@ class TranslatorModel:
                 for j, decoded in enumerate(decoded_batch):
                     translated_segments[retry_indices[i + j]] = decoded
         
-        # Update cache and results
-        for idx, original, translated in zip(uncached_indices, uncached_texts, translated_segments):
-            self.cache[original] = translated
-            results[idx] = translated
-        
-        return results
+        return translated_segments
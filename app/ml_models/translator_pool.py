@@ -0,0 +1,326 @@
+# app/ml_models/translator_pool.py
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import traceback
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import logging
+from app.utils.cancellation import CancellationToken
+
+logger = logging.getLogger(__name__)
+
+def _build_replica(backend: str, options: Dict):
+    """Load one translator inside a replica process"""
+    if backend == "stub":
+        from app.ml_models.stub_translator import StubTranslatorModel
+        return StubTranslatorModel(**options)
+    
+    from app.ml_models.translator_model import TranslatorModel
+    return TranslatorModel(**options)
+
+def _replica_main(index: int, cores: List[int], backend: str, options: Dict, tasks, results):
+    """Replica process: pin to its cores, load the model once, translate shards until told to stop"""
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    if backend != "stub":
+        # Intra-op threads = our core slice, so replicas do not oversubscribe each other
+        import torch
+        torch.set_num_threads(max(1, len(cores)))
+    
+    try:
+        translator = _build_replica(backend, options)
+        results.put(("ready", index, None))
+    except Exception:
+        results.put(("failed", index, traceback.format_exc()))
+        return
+    
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        call_id, shard_id, texts, batch_size = task
+        try:
+            results.put((call_id, shard_id, translator.translate_batch(texts, batch_size=batch_size)))
+        except Exception:
+            results.put((call_id, shard_id, RuntimeError(f"Replica {index} failed:\n{traceback.format_exc()}")))
+
+class _Replica:
+    """One replica process with its own task/result queues and the shards handed to it"""
+    
+    def __init__(self, context, index: int, cores: List[int], backend: str, options: Dict):
+        self.index = index
+        self.tasks = context.Queue()
+        self.results = context.Queue()
+        # (call_id, shard_id) -> task, until its result comes back; re-queued if the process dies
+        self.assigned: Dict[Tuple[int, int], Tuple] = {}
+        self.process = context.Process(
+            target=_replica_main,
+            args=(index, cores, backend, options, self.tasks, self.results),
+            name=f"translator-replica-{index}",
+            daemon=True
+        )
+        self.process.start()
+    
+    def stop(self, timeout: float = 10):
+        if self.process.is_alive():
+            self.tasks.put(None)
+            self.process.join(timeout=timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+        # Nobody reads these queues any more; do not block interpreter exit flushing them
+        self.tasks.cancel_join_thread()
+        self.results.cancel_join_thread()
+
+class TranslatorPool:
+    """
+    K translator replicas in separate processes, each pinned to its own slice of cores.
+    translate_batch splits the uncached strings into length-sorted shards of about
+    `shard_tokens` tokens, hands them to the least busy replica and merges the
+    results back in input order. A replica that dies is restarted (up to
+    `max_restarts` times) and the shards it held are re-queued. Drop-in for TranslatorModel.
+    """
+    
+    def __init__(
+        self,
+        model_name: str = "Helsinki-NLP/opus-mt-ar-en",
+        replicas: int = 2,
+        threads_per_replica: Optional[int] = None,
+        shard_tokens: int = 2048,
+        max_segment_tokens: int = 100,
+        backend: str = "marian",
+        replica_options: Optional[Dict] = None,
+        cache_size: int = 50000,
+        max_restarts: int = 3
+    ):
+        self.model_name = model_name if backend != "stub" else "stub"
+        self.max_segment_tokens = max_segment_tokens
+        self.replicas = replicas
+        self.shard_tokens = shard_tokens
+        self.backend = backend
+        # Replicas keep their own segment caches; this one only saves the round trip for repeats
+        self.cache: "OrderedDict[str, str]" = OrderedDict()
+        self.cache_size = cache_size
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        
+        if backend == "stub":
+            self._options = dict(replica_options or {})
+            self._tokenizer = None
+        else:
+            self._options = {"model_name": model_name, "max_segment_tokens": max_segment_tokens, **(replica_options or {})}
+            from transformers import MarianTokenizer
+            self._tokenizer = MarianTokenizer.from_pretrained(model_name)
+        
+        # Disjoint core slices, one per replica
+        cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+        per_replica = threads_per_replica or max(1, len(cores) // replicas)
+        self.core_slices = [cores[i * per_replica : (i + 1) * per_replica] or cores for i in range(replicas)]
+        
+        # spawn: no inherited threads/locks from the web server, CUDA-safe.
+        # Queues are per replica, so a process dying mid-read/write cannot wedge the others
+        self._context = multiprocessing.get_context("spawn")
+        self._replicas = [self._start_replica(i) for i in range(replicas)]
+        self._restart_counts = [0] * replicas
+        self._closed = False
+        
+        self._call_ids = itertools.count()
+        self._pending: Dict[int, "queue.Queue"] = {}
+        self._lock = threading.Lock()
+        self._wait_ready()
+        
+        for replica in self._replicas:
+            self._start_dispatcher(replica)
+        logger.info(f"✅ Translator pool: {replicas} replicas x {per_replica} cores")
+    
+    def _start_replica(self, index: int) -> _Replica:
+        return _Replica(self._context, index, self.core_slices[index], self.backend, self._options)
+    
+    def _start_dispatcher(self, replica: _Replica):
+        threading.Thread(
+            target=self._dispatch, args=(replica,), name=f"translator-pool-results-{replica.index}", daemon=True
+        ).start()
+    
+    def _wait_ready(self):
+        for replica in self._replicas:
+            while True:
+                try:
+                    status, index, error = replica.results.get(timeout=1.0)
+                except queue.Empty:
+                    if not replica.process.is_alive():
+                        self.close()
+                        raise RuntimeError(f"Translator replica exited while loading: {replica.process.name}")
+                    continue
+                if status == "failed":
+                    self.close()
+                    raise RuntimeError(f"Translator replica {index} failed to load:\n{error}")
+                break
+    
+    def _dispatch(self, replica: _Replica):
+        """Route one replica's shard results to the translate_batch call waiting for them"""
+        while True:
+            try:
+                message = replica.results.get(timeout=1.0)
+            except queue.Empty:
+                # Exit once the replica is gone (restarted or closed) and its queue is drained
+                if self._closed or not replica.process.is_alive():
+                    break
+                continue
+            except (EOFError, OSError):
+                # The replica died mid-write; its shards are re-queued on restart
+                break
+            if message[0] == "ready":
+                logger.info(f"✅ Translator replica {replica.index} ready")
+                continue
+            if message[0] == "failed":
+                logger.error(f"❌ Translator replica {replica.index} failed to load:\n{message[2]}")
+                continue
+            call_id, shard_id = message[0], message[1]
+            with self._lock:
+                replica.assigned.pop((call_id, shard_id), None)
+                waiting = self._pending.get(call_id)
+            # Results of cancelled calls have nobody waiting and are dropped
+            if waiting is not None:
+                waiting.put(message[1:])
+    
+    def _check_replicas(self):
+        """Restart dead replicas and hand them the shards their predecessor was holding"""
+        with self._lock:
+            for index, replica in enumerate(self._replicas):
+                if self._closed or replica.process.is_alive():
+                    continue
+                if self._restart_counts[index] >= self.max_restarts:
+                    raise RuntimeError(
+                        f"Translator replica {index} exited {self._restart_counts[index] + 1} times, giving up"
+                    )
+                self._restart_counts[index] += 1
+                self.restarts += 1
+                logger.warning(f"Translator replica {index} exited (code {replica.process.exitcode}), restarting "
+                               f"with {len(replica.assigned)} shards re-queued")
+                replica.stop(timeout=0)
+                
+                fresh = self._start_replica(index)
+                # A late result from the old replica may still arrive; callers drop the duplicate
+                fresh.assigned = dict(replica.assigned)
+                for task in fresh.assigned.values():
+                    fresh.tasks.put(task)
+                self._replicas[index] = fresh
+                self._start_dispatcher(fresh)
+    
+    def _submit(self, task: Tuple):
+        """Queue a shard on the replica with the fewest shards outstanding"""
+        with self._lock:
+            replica = min(self._replicas, key=lambda r: (not r.process.is_alive(), len(r.assigned)))
+            replica.assigned[(task[0], task[1])] = task
+            replica.tasks.put(task)
+    
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        if self._tokenizer is None:
+            # ~4 characters per subword token for Arabic text
+            return [len(t) // 4 + 1 for t in texts]
+        return [len(ids) for ids in self._tokenizer(texts, add_special_tokens=False)["input_ids"]]
+    
+    def _shards(self, texts: List[str]) -> List[List[int]]:
+        """Indices of texts, sorted by length and cut into shards of about shard_tokens tokens"""
+        tokens = self.count_tokens(texts)
+        order = sorted(range(len(texts)), key=lambda i: tokens[i])
+        
+        shards, current, budget = [], [], 0
+        for i in order:
+            if current and budget + tokens[i] > self.shard_tokens:
+                shards.append(current)
+                current, budget = [], 0
+            current.append(i)
+            budget += tokens[i]
+        if current:
+            shards.append(current)
+        return shards
+    
+    def translate_batch(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[str]:
+        """Translate across all replicas; same contract as TranslatorModel.translate_batch"""
+        if not texts:
+            return []
+        
+        results = list(texts)
+        found: Dict[str, str] = {}
+        uncached = []
+        # Shared by concurrent requests: a lookup must not interleave with another call's eviction
+        with self._lock:
+            for text in dict.fromkeys(t for t in texts if t and t.strip()):
+                if text in self.cache:
+                    self.cache.move_to_end(text)
+                    found[text] = self.cache[text]
+                else:
+                    uncached.append(text)
+        if uncached:
+            translated = self._translate_sharded(uncached, batch_size, cancel_token)
+            found.update(zip(uncached, translated))
+            with self._lock:
+                self.cache.update(zip(uncached, translated))
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        
+        for i, text in enumerate(texts):
+            if text and text.strip():
+                results[i] = found[text]
+        return results
+    
+    def _translate_sharded(self, texts: List[str], batch_size: int, cancel_token: Optional[CancellationToken]) -> List[str]:
+        self._check_replicas()
+        shards = self._shards(texts)
+        call_id = next(self._call_ids)
+        inbox = queue.Queue()
+        with self._lock:
+            self._pending[call_id] = inbox
+        
+        logger.info(f"Translating {len(texts)} strings in {len(shards)} shards on {self.replicas} replicas...")
+        translated: List[Optional[str]] = [None] * len(texts)
+        # Two shards per replica in flight: nobody idles between shards, and a cancel
+        # leaves at most that much work behind
+        next_shard, in_flight, received = 0, 0, set()
+        try:
+            while len(received) < len(shards):
+                if cancel_token:
+                    cancel_token.check("translate", batches=len(shards) - len(received))
+                while next_shard < len(shards) and in_flight < 2 * self.replicas:
+                    shard_texts = [texts[i] for i in shards[next_shard]]
+                    self._submit((call_id, next_shard, shard_texts, batch_size))
+                    next_shard += 1
+                    in_flight += 1
+                
+                shard_id, shard_result = self._next_result(inbox)
+                if shard_id in received:
+                    # Re-queued after a restart and answered twice
+                    continue
+                if isinstance(shard_result, Exception):
+                    raise shard_result
+                for i, text in zip(shards[shard_id], shard_result):
+                    translated[i] = text
+                received.add(shard_id)
+                in_flight -= 1
+        finally:
+            with self._lock:
+                del self._pending[call_id]
+        return translated
+    
+    def _next_result(self, inbox: "queue.Queue") -> Tuple[int, object]:
+        while True:
+            try:
+                return inbox.get(timeout=1.0)
+            except queue.Empty:
+                self._check_replicas()
+    
+    def close(self):
+        """Stop the replica processes"""
+        self._closed = True
+        for replica in self._replicas:
+            replica.tasks.put(None)
+        for replica in self._replicas:
+            replica.stop()
@@ -1,13 +1,123 @@
 # app/models/response_models.py
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, ConfigDict
+from typing import Dict, List, Optional
+
+class TriageReport(BaseModel):
+    """Page triage decisions for one document"""
+    pages_total: int
+    likely_table: int
+    text_only: int
+    empty: int
+    pages_skipped: int
+    forced: bool
+    triage_seconds: float
+    estimated_seconds_saved: float
+    audit_misses: List[int] = []
+
+class TranslationStats(BaseModel):
+    """Document-level translation pass: cell counts vs unique strings actually translated"""
+    # model_strings = strings sent to the translation model, not a pydantic attribute
+    model_config = ConfigDict(protected_namespaces=())
+    
+    tables: int
+    cells_total: int
+    cells_translatable: int
+    unique_strings: int
+    glossary_resolved: int
+    model_strings: int
+    dedupe_ratio: float
 
 class ExtractionResponse(BaseModel):
     """API response for extraction endpoint"""
     status: str
     file_id: str
+    pages_processed: Optional[int] = None
+    output_format: str = "csv"
     tables_detected: int
     tables_extracted: int
     tables_translated: int
     extracted_files: List[str]
     translated_files: List[str]
+    triage: Optional[TriageReport] = None
+    translation: Optional[TranslationStats] = None
+    # Wall time per pipeline stage (detect/extract/translate/total), seconds
+    timings: Optional[Dict[str, float]] = None
+
+class CancellationStats(BaseModel):
+    """Requests cancelled since startup and the work they skipped"""
+    cancelled: int
+    by_reason: Dict[str, int]
+    by_stage: Dict[str, int]
+    abandoned: Dict[str, int]
+    seconds_run: float
+
+class JobFilesResponse(BaseModel):
+    """Table files written for one job"""
+    file_id: str
+    extracted_files: List[str]
+    translated_files: List[str]
+
+class GlossaryStats(BaseModel):
+    """Glossary size and hit-rate counters"""
+    path: Optional[str] = None
+    entries: int
+    lookups: int
+    exact_hits: int
+    phrase_hits: int
+    hit_rate: float
+
+class StorageSweepReport(BaseModel):
+    """Outcome of one storage lifecycle sweep"""
+    jobs_evicted: int
+    files_deleted: int
+    bytes_reclaimed: int
+    bytes_remaining: int
+    jobs_remaining: int
+    queue_jobs_purged: int = 0
+    duration_seconds: float
+    swept_at: float
+
+class StorageStats(BaseModel):
+    """Data directory usage and lifecycle counters"""
+    jobs: int
+    bytes_used: int
+    quota_bytes: Optional[int] = None
+    ttl_seconds: Optional[float] = None
+    total_bytes_reclaimed: int
+    last_sweep: Optional[StorageSweepReport] = None
+
+class PreviewCacheStats(BaseModel):
+    """Page-preview disk cache usage and hit rate"""
+    previews: int
+    bytes_used: int
+    max_bytes: Optional[int] = None
+    open_documents: int
+    hits: int
+    misses: int
+    evictions: int
+    hit_rate: float
+
+class LayoutCacheStats(BaseModel):
+    """Layout-fingerprint cache size and hit rate"""
+    layouts: int
+    lookups: int
+    hits: int
+    rejected: int
+    hit_rate: float
+
+class FailedTask(BaseModel):
+    """Page task that ran out of retries"""
+    kind: str
+    page: int
+    attempts: int
+    error: Optional[str] = None
+
+class DistributedJobStatus(BaseModel):
+    """Progress of a page-sharded job (result is set once every page is merged)"""
+    file_id: str
+    status: str
+    pages_total: int
+    pages_detected: int
+    tasks: Dict[str, Dict[str, int]]
+    failed_tasks: List[FailedTask] = []
+    result: Optional[ExtractionResponse] = None
@@ -0,0 +1,229 @@
+# app/services/artifact_store_service.py
+import gzip
+import hashlib
+import inspect
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+from app.handlers.pdf_handler import PDFHandler
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=None)
+def source_version(*objects) -> str:
+    """Short hash of the source code of modules/classes - changes whenever their code does"""
+    digest = hashlib.sha256()
+    for obj in objects:
+        digest.update(inspect.getsource(obj).encode())
+    return digest.hexdigest()[:16]
+
+class ArtifactStore:
+    """
+    Content-addressed store for pipeline stage outputs (page words, TableConfigs,
+    extracted and translated tables). Keys hash a stage's inputs together with its
+    code/config version, so a stage only recomputes when either changes.
+    Artifacts are gzipped JSON under <root>/<stage>/<key[:2]>/<key>.json.gz; above
+    `max_size_mb` the least recently used ones are evicted and recomputed from the PDF
+    on the next run. Pinned stages (job manifests and the extractions they point to)
+    are never evicted: retranslate() has no PDF to recompute them from.
+    """
+    
+    def __init__(
+        self,
+        root_dir: str,
+        max_size_mb: Optional[float] = None,
+        pinned_stages: Iterable[str] = ("jobs", "extract")
+    ):
+        self.root_dir = Path(root_dir)
+        self.max_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb else None
+        self.pinned_stages = frozenset(pinned_stages)
+        self._lock = threading.Lock()
+        # (stage, key) -> bytes, least recently used first (evictable stages only)
+        self._entries: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self._bytes = 0
+        # (stage, key) -> bytes of pinned artifacts, not counted against max_bytes
+        self._pinned: Dict[Tuple[str, str], int] = {}
+        # (path, mtime_ns, size) -> sha256, so a file is hashed once per version
+        self._file_hashes: Dict[Tuple[str, int, int], str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._load_index()
+    
+    def _load_index(self):
+        """Pick up artifacts written before a restart (file mtime = last use)"""
+        if not self.root_dir.exists():
+            return
+        entries = []
+        for path in self.root_dir.glob("*/*/*.json.gz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, path.parent.parent.name, path.name[: -len(".json.gz")], stat.st_size))
+        for _, stage, key, size in sorted(entries):
+            if stage in self.pinned_stages:
+                self._pinned[(stage, key)] = size
+                continue
+            self._entries[(stage, key)] = size
+            self._bytes += size
+    
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Stable key for any JSON-serializable parts"""
+        payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def file_hash(self, path: str) -> str:
+        """sha256 of a file's bytes (memoized on path + mtime + size)"""
+        stat = os.stat(path)
+        memo_key = (str(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._file_hashes.get(memo_key)
+        if cached:
+            return cached
+        
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                digest.update(chunk)
+        with self._lock:
+            self._file_hashes[memo_key] = digest.hexdigest()
+        return digest.hexdigest()
+    
+    def _path(self, stage: str, key: str) -> Path:
+        return self.root_dir / stage / key[:2] / f"{key}.json.gz"
+    
+    def has(self, stage: str, key: str) -> bool:
+        return self._path(stage, key).exists()
+    
+    def get(self, stage: str, key: str) -> Optional[Any]:
+        """Stored value or None"""
+        path = self._path(stage, key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                value = json.load(f)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            # Truncated/corrupt artifact: treat as missing, it gets rewritten
+            logger.warning(f"Ignoring unreadable artifact {path}: {e}")
+            with self._lock:
+                self.misses += 1
+            return None
+        
+        with self._lock:
+            self.hits += 1
+            if (stage, key) in self._entries:
+                self._entries.move_to_end((stage, key))
+        try:
+            # mtime tracks recency across restarts
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+    
+    def put(self, stage: str, key: str, value: Any):
+        """Store a JSON-serializable value (atomic: readers never see partial files)"""
+        path = self._path(stage, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=5) as f:
+            json.dump(value, f, ensure_ascii=False)
+        tmp_path.replace(path)
+        size = path.stat().st_size
+        with self._lock:
+            self.writes += 1
+            if stage in self.pinned_stages:
+                self._pinned[(stage, key)] = size
+                return
+            self._bytes += size - self._entries.pop((stage, key), 0)
+            self._entries[(stage, key)] = size
+            evicted = self._evict()
+        for old_stage, old_key in evicted:
+            try:
+                self._path(old_stage, old_key).unlink()
+            except FileNotFoundError:
+                pass
+    
+    def _evict(self) -> List[Tuple[str, str]]:
+        """Least recently used unpinned artifacts to drop to get under the size limit (call with the lock held)"""
+        evicted = []
+        while self.max_bytes is not None and self._bytes > self.max_bytes and len(self._entries) > 1:
+            entry, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            evicted.append(entry)
+        return evicted
+    
+    def iter_keys(self, stage: str) -> Iterator[str]:
+        """All keys stored for a stage"""
+        stage_dir = self.root_dir / stage
+        if stage_dir.exists():
+            for path in stage_dir.glob("*/*.json.gz"):
+                yield path.name[: -len(".json.gz")]
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "artifacts": len(self._entries),
+                "bytes_used": self._bytes,
+                "pinned_artifacts": len(self._pinned),
+                "pinned_bytes": sum(self._pinned.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+class CachedWordSource:
+    """
+    Word-source wrapper that serves page words from the artifact store and only
+    reads pages it has not seen (for this PDF content and word-source version).
+    """
+    
+    STAGE = "words"
+    
+    def __init__(self, inner, store: ArtifactStore):
+        self.inner = inner
+        self.store = store
+        self.version = source_version(sys.modules[type(inner).__module__])
+    
+    def iter_pages(self, pdf_path: str, page_numbers: Optional[Iterable[int]] = None) -> Iterator[Tuple[int, List[Dict], float, float]]:
+        if page_numbers is None:
+            page_numbers = range(PDFHandler.get_page_count(pdf_path))
+        pages = sorted(set(page_numbers))
+        pdf_hash = self.store.file_hash(pdf_path)
+        
+        keys = {p: self.store.make_key(self.STAGE, self.version, pdf_hash, p) for p in pages}
+        missing = [p for p in pages if not self.store.has(self.STAGE, keys[p])]
+        
+        # Both streams are in page order, so they interleave one page at a time
+        fresh = self.inner.iter_pages(pdf_path, missing) if missing else iter(())
+        missing = set(missing)
+        for page_num in pages:
+            cached = None if page_num in missing else self.store.get(self.STAGE, keys[page_num])
+            if cached is not None:
+                words, pdf_w, pdf_h = cached
+                yield page_num, words, pdf_w, pdf_h
+                continue
+            
+            if page_num in missing:
+                page_num, words, pdf_w, pdf_h = next(fresh)
+            else:
+                # Artifact vanished since the existence check
+                page_num, words, pdf_w, pdf_h = next(iter(self.inner.iter_pages(pdf_path, [page_num])))
+            self.store.put(self.STAGE, keys[page_num], [words, pdf_w, pdf_h])
+            yield page_num, words, pdf_w, pdf_h
@@ -0,0 +1,238 @@
+# app/services/distributed_pipeline_service.py
+import os
+import socket
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+from app.handlers.file_handler import FileHandler
+from app.handlers.pdf_handler import PDFHandler
+from app.handlers.table_handler import TableHandler
+from app.models.response_models import ExtractionResponse
+from app.models.table_models import TableConfig, TableData
+from app.services.extraction_pipeline_service import OUTPUT_FORMATS
+from app.services.table_detection_service import TableDetectionService
+from app.services.pdf_extraction_service import PDFExtractionService
+from app.services.translation_service import TranslationService
+from app.services.work_queue_service import WorkQueue, PENDING, RUNNING, DONE, FAILED, MERGING
+
+logger = logging.getLogger(__name__)
+
+# Page task stages: detect -> extract -> translate (each enqueues the next)
+DETECT = "detect"
+EXTRACT = "extract"
+TRANSLATE = "translate"
+STAGES = [DETECT, EXTRACT, TRANSLATE]
+
+class PageWorker:
+    """
+    Pulls page tasks from the shared queue and runs one pipeline stage per task.
+    Any number of workers on any node can share a queue (and the upload directory).
+    """
+    
+    def __init__(
+        self,
+        queue: WorkQueue,
+        detection_service: TableDetectionService,
+        extraction_service: PDFExtractionService,
+        translation_service: TranslationService,
+        worker_id: Optional[str] = None,
+        stages: Optional[List[str]] = None
+    ):
+        self.queue = queue
+        self.detection_service = detection_service
+        self.extraction_service = extraction_service
+        self.translation_service = translation_service
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        # e.g. only "translate" on GPU nodes
+        self.stages = stages or STAGES
+        self.tasks_done = 0
+        self.tasks_failed = 0
+    
+    def run_once(self) -> bool:
+        """Claim and run one task; False if the queue had nothing for us"""
+        task = self.queue.claim(self.worker_id, self.stages)
+        if task is None:
+            return False
+        
+        start = time.perf_counter()
+        try:
+            result, next_tasks = self._handle(task)
+        except Exception as e:
+            self.tasks_failed += 1
+            self.queue.fail(task, f"{type(e).__name__}: {e}")
+            return True
+        
+        if self.queue.complete(task, result, next_tasks):
+            self.tasks_done += 1
+            logger.info(f"✅ {task['kind']} page {task['page']} of {task['job_id']} "
+                        f"in {time.perf_counter() - start:.2f}s")
+        return True
+    
+    def run(self, poll_interval: float = 1.0, stop_when_idle: bool = False, max_tasks: Optional[int] = None) -> int:
+        """Work until stopped (or idle / max_tasks reached); returns tasks handled"""
+        handled = 0
+        while max_tasks is None or handled < max_tasks:
+            if self.run_once():
+                handled += 1
+                continue
+            if stop_when_idle:
+                break
+            time.sleep(poll_interval)
+        return handled
+    
+    def _handle(self, task: Dict) -> Tuple[Dict, List[Dict]]:
+        """Run one stage for one page; returns (result, follow-up tasks)"""
+        payload, page = task["payload"], task["page"]
+        pdf_path = payload["pdf_path"]
+        
+        def follow_up(kind: str, extra: Dict) -> List[Dict]:
+            return [{"job_id": task["job_id"], "kind": kind, "page": page, "payload": {"pdf_path": pdf_path, **extra}}]
+        
+        if task["kind"] == DETECT:
+            configs = self.detection_service.detect_all_tables(pdf_path, [page])
+            config_dicts = [c.model_dump() for c in configs]
+            return {"configs": config_dicts}, follow_up(EXTRACT, {"configs": config_dicts}) if configs else []
+        
+        if task["kind"] == EXTRACT:
+            configs = [TableConfig(**c) for c in payload["configs"]]
+            # table_id is page-local here; the coordinator renumbers document-wide
+            tables = [t.model_dump() for t in self.extraction_service.iter_table_data(pdf_path, configs)]
+            return {"tables": tables}, follow_up(TRANSLATE, {"tables": tables}) if tables else []
+        
+        if task["kind"] == TRANSLATE:
+            tables = [TableData(**t) for t in payload["tables"]]
+            translated = self.translation_service.translate_table_data(tables)
+            return {"tables": [t.model_dump() for t in translated]}, []
+        
+        raise ValueError(f"Unknown task kind '{task['kind']}'")
+
+class DistributedCoordinator:
+    """Splits a document into page tasks and merges finished pages into one result"""
+    
+    def __init__(self, queue: WorkQueue, extracted_dir: str, translated_dir: str):
+        self.queue = queue
+        self.table_handler = TableHandler()
+        self.extracted_dir = Path(extracted_dir)
+        self.translated_dir = Path(translated_dir)
+    
+    def submit(
+        self,
+        pdf_path: str,
+        file_id: str,
+        pages: Optional[List[int]] = None,
+        output_format: str = "csv"
+    ) -> Dict:
+        """Enqueue a detect task per page (0-based); the PDF must be readable by all workers"""
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format '{output_format}' (expected one of: {', '.join(OUTPUT_FORMATS)})")
+        
+        if pages is None:
+            pages = list(range(PDFHandler.get_page_count(pdf_path)))
+        
+        tasks = [{"job_id": file_id, "kind": DETECT, "page": page, "payload": {"pdf_path": pdf_path}} for page in pages]
+        self.queue.create_job(file_id, pdf_path, {"pages": pages, "output_format": output_format}, tasks)
+        
+        logger.info(f"📖 Queued {len(pages)} page tasks for {file_id}")
+        return self.status(file_id)
+    
+    def status(self, file_id: str) -> Optional[Dict]:
+        """Progress per stage; merges the document once every task has finished"""
+        job = self.queue.get_job(file_id)
+        if job is None:
+            return None
+        
+        tasks = self.queue.list_tasks(file_id)
+        counts = {stage: defaultdict(int) for stage in STAGES}
+        for task in tasks:
+            counts[task["kind"]][task["status"]] += 1
+        
+        failed = [
+            {"kind": t["kind"], "page": t["page"], "attempts": t["attempts"], "error": t["error"]}
+            for t in tasks if t["status"] == FAILED
+        ]
+        active = any(t["status"] in (PENDING, RUNNING) for t in tasks)
+        
+        # Follow-up tasks are enqueued atomically with completion, so nothing more can appear.
+        # Concurrent pollers race for the merge; only the one whose claim flips the row does it
+        if job["status"] == RUNNING and not active and self.queue.claim_merge(file_id):
+            self._finish(file_id, job, tasks, failed)
+            job = self.queue.get_job(file_id)
+        
+        return {
+            "file_id": file_id,
+            "status": job["status"],
+            "pages_total": len(job["options"]["pages"]),
+            "pages_detected": counts[DETECT].get(DONE, 0),
+            "tasks": {stage: dict(counts[stage]) for stage in STAGES},
+            "failed_tasks": failed,
+            "result": job["result"],
+        }
+    
+    def _finish(self, file_id: str, job: Dict, tasks: List[Dict], failed: List[Dict]):
+        """Merge a job whose tasks have all finished (caller holds the merge claim)"""
+        if failed:
+            self.queue.finish_job(file_id, FAILED)
+            return
+        try:
+            response = self._merge(file_id, job, tasks)
+        except Exception as e:
+            logger.error(f"❌ Merging {file_id} failed: {e}")
+            self.queue.finish_job(file_id, FAILED)
+            return
+        self.queue.finish_job(file_id, DONE, response.model_dump())
+    
+    def wait(self, file_id: str, timeout: Optional[float] = None, poll_interval: float = 1.0) -> Dict:
+        """Block until the job is done or failed (or the timeout passes)"""
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            status = self.status(file_id)
+            if status is None or status["status"] not in (RUNNING, MERGING):
+                return status
+            if deadline and time.monotonic() > deadline:
+                return status
+            time.sleep(poll_interval)
+    
+    def _merge(self, file_id: str, job: Dict, tasks: List[Dict]) -> ExtractionResponse:
+        """Stitch per-page results together in page order and write the document outputs"""
+        results = defaultdict(dict)
+        for task in tasks:
+            results[task["kind"]][task["page"]] = task["result"]
+        
+        # Document-wide numbering follows the detect order: page by page, tables in page order
+        configs, offsets = [], {}
+        for page in sorted(results[DETECT]):
+            offsets[page] = len(configs)
+            configs.extend(results[DETECT][page]["configs"])
+        
+        def renumber(stage: str) -> List[TableData]:
+            tables = []
+            for page in sorted(results[stage]):
+                for t in results[stage][page]["tables"]:
+                    local_idx = int(t["table_id"].rsplit("_", 1)[1])
+                    tables.append(TableData(**{**t, "table_id": f"table_{offsets[page] + local_idx}"}))
+            return tables
+        
+        tables, translated_tables = renumber(EXTRACT), renumber(TRANSLATE)
+        output_format = job["options"]["output_format"]
+        extracted_dir = FileHandler.shard_dir(self.extracted_dir, file_id)
+        translated_dir = FileHandler.shard_dir(self.translated_dir, file_id)
+        
+        extracted_files = self.table_handler.save_stage_tables(tables, str(extracted_dir), file_id, output_format)
+        translated_files = self.table_handler.save_stage_tables(
+            translated_tables, str(translated_dir), file_id, output_format, suffix="_translated"
+        )
+        logger.info(f"✅ Merged {len(results[DETECT])} pages of {file_id}: {len(tables)} tables")
+        
+        return ExtractionResponse(
+            status="success",
+            file_id=file_id,
+            pages_processed=len(job["options"]["pages"]),
+            output_format=output_format,
+            tables_detected=len(configs),
+            tables_extracted=len(tables),
+            tables_translated=len(translated_tables),
+            extracted_files=[Path(f).name for f in extracted_files],
+            translated_files=[Path(f).name for f in translated_files]
+        )
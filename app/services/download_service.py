@@ -0,0 +1,193 @@
+# app/services/download_service.py
+import hashlib
+import uuid
+import zipfile
+import zlib
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from app.handlers.file_handler import FileHandler
+from typing import Dict, Iterator, List, Optional
+
+CHUNK_SIZE = 64 * 1024
+
+MEDIA_TYPES = {
+    # Starlette appends "; charset=utf-8" to text/* types itself
+    ".csv": "text/csv",
+    ".parquet": "application/vnd.apache.parquet",
+    ".arrow": "application/vnd.apache.arrow.file",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".zip": "application/zip",
+}
+
+# Parquet (zstd pages) and xlsx (zip) are already compressed
+COMPRESSIBLE_SUFFIXES = {".csv", ".arrow"}
+
+class _StreamBuffer:
+    """Write-only sink so zipfile can stream into a response (non-seekable)"""
+    
+    def __init__(self):
+        self.chunks: List[bytes] = []
+    
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+class DownloadService:
+    """Locates a job's table files and streams them with compression and cache validators"""
+    
+    def __init__(self, extracted_dir: str, translated_dir: str):
+        self.stage_dirs = {
+            "extracted": Path(extracted_dir),
+            "translated": Path(translated_dir),
+        }
+    
+    # === File lookup ===
+    
+    def list_job_files(self, file_id: str, stage: str) -> List[Path]:
+        """All files a job wrote for a stage ("extracted" or "translated")"""
+        if stage not in self.stage_dirs:
+            raise ValueError(f"Unknown stage '{stage}'")
+        # file_id is part of a glob pattern - only accept real job ids
+        try:
+            uuid.UUID(file_id)
+        except ValueError:
+            raise ValueError(f"Invalid file id '{file_id}'")
+        
+        # Sharded layout, plus the flat layout used before sharding
+        base = self.stage_dirs[stage]
+        candidates = list(FileHandler.shard_dir(base, file_id, create=False).glob(f"{file_id}_*"))
+        candidates += base.glob(f"{file_id}_*")
+        return sorted((p for p in candidates if p.is_file()), key=lambda p: p.name)
+    
+    def get_job_file(self, file_id: str, stage: str, filename: str) -> Optional[Path]:
+        """Resolve one of the job's files by name (never a path outside the job)"""
+        for path in self.list_job_files(file_id, stage):
+            if path.name == filename:
+                return path
+        return None
+    
+    # === Cache validators ===
+    
+    @staticmethod
+    def file_etag(path: Path, encoding: Optional[str] = None) -> str:
+        """Strong ETag from mtime+size (and encoding, since bytes differ per encoding)"""
+        stat = path.stat()
+        tag = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+        return f'"{tag}-{encoding}"' if encoding else f'"{tag}"'
+    
+    @staticmethod
+    def bundle_etag(paths: List[Path]) -> str:
+        """ETag for a zip bundle: changes when any member changes"""
+        digest = hashlib.sha1()
+        for path in paths:
+            stat = path.stat()
+            digest.update(f"{path.name}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+        return f'"{digest.hexdigest()}"'
+    
+    @staticmethod
+    def last_modified(paths: List[Path]) -> float:
+        return max(p.stat().st_mtime for p in paths)
+    
+    @staticmethod
+    def http_date(timestamp: float) -> str:
+        return formatdate(timestamp, usegmt=True)
+    
+    @staticmethod
+    def is_not_modified(headers: Dict[str, str], etag: str, last_modified: float) -> bool:
+        """Evaluate If-None-Match / If-Modified-Since (If-None-Match wins when present)"""
+        if_none_match = headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+        
+        if_modified_since = headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            # HTTP dates have 1s resolution
+            return int(last_modified) <= since
+        return False
+    
+    # === Content encoding ===
+    
+    @staticmethod
+    def negotiate_encoding(accept_encoding: Optional[str], path: Path) -> Optional[str]:
+        """Pick zstd (if installed) or gzip from Accept-Encoding; None = identity"""
+        if not accept_encoding or path.suffix.lower() not in COMPRESSIBLE_SUFFIXES:
+            return None
+        
+        accepted = {}
+        for part in accept_encoding.split(","):
+            name, _, params = part.strip().partition(";")
+            q = 1.0
+            if params.strip().startswith("q="):
+                try:
+                    q = float(params.strip()[2:])
+                except ValueError:
+                    q = 0.0
+            accepted[name.strip().lower()] = q
+        
+        candidates = ["gzip"]
+        try:
+            import zstandard  # noqa: F401
+            candidates.insert(0, "zstd")
+        except ImportError:
+            pass
+        
+        best = max(candidates, key=lambda c: accepted.get(c, 0.0))
+        return best if accepted.get(best, 0.0) > 0 else None
+    
+    @staticmethod
+    def iter_file(path: Path, encoding: Optional[str] = None) -> Iterator[bytes]:
+        """Stream a file from disk in chunks, compressing on the fly"""
+        if encoding == "zstd":
+            import zstandard
+            compressor = zstandard.ZstdCompressor().compressobj()
+            finish = compressor.flush
+        elif encoding == "gzip":
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+            finish = compressor.flush
+        else:
+            compressor = None
+        
+        with open(path, "rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                if compressor is None:
+                    yield chunk
+                else:
+                    out = compressor.compress(chunk)
+                    if out:
+                        yield out
+        if compressor is not None:
+            yield finish()
+    
+    @staticmethod
+    def iter_zip_bundle(members: Dict[str, Path]) -> Iterator[bytes]:
+        """Stream a zip of {archive name: path} without building it in memory or on disk"""
+        sink = _StreamBuffer()
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for arcname, path in members.items():
+                # Member timestamps come from the files, so equal ETags mean equal bytes
+                info = zipfile.ZipInfo.from_file(path, arcname)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with open(path, "rb") as src, zf.open(info, mode="w") as dst:
+                    while chunk := src.read(CHUNK_SIZE):
+                        dst.write(chunk)
+                        data = sink.drain()
+                        if data:
+                            yield data
+                data = sink.drain()
+                if data:
+                    yield data
+        # Central directory
+        yield sink.drain()
@@ -0,0 +1,527 @@
+# app/services/extraction_pipeline_service.py
+import importlib
+import queue
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+from app.handlers.file_handler import FileHandler
+from app.handlers.pdf_handler import PDFHandler
+from app.handlers.table_handler import TableHandler
+from app.models.response_models import ExtractionResponse
+from app.models.table_models import TableConfig, TableData
+from app.services.artifact_store_service import ArtifactStore, source_version
+from app.services.extraction_pool_service import PageExtractionPool
+from app.services.page_triage_service import PageTriageService
+from app.services.table_detection_service import TableDetectionService
+from app.services.pdf_extraction_service import PDFExtractionService
+from app.services.translation_service import DocumentTranslation, TranslationService
+from app.utils.cancellation import CancellationToken
+
+logger = logging.getLogger(__name__)
+
+# Output format -> file extension
+OUTPUT_FORMATS = {"csv": "csv", "parquet": "parquet", "arrow": "arrow", "xlsx": "xlsx"}
+
+# End-of-document marker on the overlapped pipeline's page queue
+_PAGES_DONE = object()
+
+class ExtractionPipelineService:
+    """Runs detect → extract → translate for one uploaded PDF"""
+    
+    def __init__(
+        self,
+        detection_service: TableDetectionService,
+        extraction_service: PDFExtractionService,
+        translation_service: TranslationService,
+        extracted_dir: str,
+        translated_dir: str,
+        artifact_store: Optional[ArtifactStore] = None,
+        overlap_stages: bool = False,
+        overlap_queue_pages: int = 4,
+        extraction_pool: Optional[PageExtractionPool] = None
+    ):
+        self.detection_service = detection_service
+        self.extraction_service = extraction_service
+        self.translation_service = translation_service
+        self.table_handler = TableHandler()
+        self.extracted_dir = Path(extracted_dir)
+        self.translated_dir = Path(translated_dir)
+        # Stage outputs keyed by input hash + stage version: unchanged stages are skipped
+        self.artifact_store = artifact_store
+        # Detect/extract on a producer thread while translation runs (bounded page queue)
+        self.overlap_stages = overlap_stages
+        self.overlap_queue_pages = overlap_queue_pages
+        # Worker processes for the overlapped producer (None = detect/extract on one thread)
+        self.extraction_pool = extraction_pool
+        if overlap_stages and artifact_store:
+            # Stored stages run whole-document; the two are not combined
+            logger.warning("Artifact store is enabled: overlapped stages are disabled for this pipeline")
+    
+    def run(
+        self,
+        pdf_path: str,
+        file_id: str,
+        pages: Optional[List[int]] = None,
+        output_format: str = "csv",
+        cancel_token: Optional[CancellationToken] = None
+    ) -> ExtractionResponse:
+        """Process a PDF end to end and describe the written files (raises OperationCancelled if abandoned)"""
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format '{output_format}' (expected one of: {', '.join(OUTPUT_FORMATS)})")
+        
+        # Outputs go to per-job shard directories
+        extracted_dir = FileHandler.shard_dir(self.extracted_dir, file_id)
+        translated_dir = FileHandler.shard_dir(self.translated_dir, file_id)
+        
+        timings = {}
+        start = time.perf_counter()
+        self.translation_service.last_document_stats = None
+        
+        if self.overlap_stages and not self.artifact_store:
+            # Step 1-3 overlapped: page N is translated while page N+1 is detected and extracted
+            (
+                tables_detected, tables_extracted, tables_translated, extracted_files, translated_files, triage
+            ) = self._run_overlapped(
+                pdf_path, file_id, pages, output_format, extracted_dir, translated_dir, timings, cancel_token
+            )
+            timings["total"] = time.perf_counter() - start
+            return self._build_response(
+                file_id, pages, output_format, tables_detected, tables_extracted, tables_translated,
+                extracted_files, translated_files, timings, triage
+            )
+        
+        # Step 1: Detect tables
+        if self.artifact_store:
+            table_configs = self._detect_stored(pdf_path, pages, cancel_token)
+        else:
+            table_configs = self.detection_service.detect_all_tables(pdf_path, pages, cancel_token)
+        timings["detect"] = time.perf_counter() - start
+        
+        if self.artifact_store:
+            # Step 2 + 3: reuse stored extractions/translations where inputs and versions match
+            tables, translated_tables = self._run_stages_stored(
+                pdf_path, file_id, pages, output_format, table_configs, timings, cancel_token
+            )
+            extracted_files = self.table_handler.save_stage_tables(tables, str(extracted_dir), file_id, output_format)
+            translated_files = self.table_handler.save_stage_tables(
+                translated_tables, str(translated_dir), file_id, output_format, suffix="_translated"
+            )
+            tables_extracted, tables_translated = len(tables), len(translated_tables)
+        elif output_format == "csv":
+            # Step 2 + 3: one CSV per table, translated CSV per table
+            stage_start = time.perf_counter()
+            extracted_files = self.extraction_service.extract_tables(
+                pdf_path, table_configs, str(extracted_dir), file_id, cancel_token
+            )
+            timings["extract"] = time.perf_counter() - stage_start
+            
+            stage_start = time.perf_counter()
+            translated_files = self.translation_service.translate_tables(
+                extracted_files, str(translated_dir), cancel_token
+            )
+            timings["translate"] = time.perf_counter() - stage_start
+            tables_extracted, tables_translated = len(extracted_files), len(translated_files)
+        else:
+            # Step 2 + 3: tables stay in memory, one file per document and stage
+            stage_start = time.perf_counter()
+            tables = list(self.extraction_service.iter_table_data(pdf_path, table_configs, cancel_token))
+            extracted_files = self.table_handler.save_stage_tables(tables, str(extracted_dir), file_id, output_format)
+            timings["extract"] = time.perf_counter() - stage_start
+            
+            stage_start = time.perf_counter()
+            translated_tables = self.translation_service.translate_table_data(tables, cancel_token=cancel_token)
+            translated_files = self.table_handler.save_stage_tables(
+                translated_tables, str(translated_dir), file_id, output_format, suffix="_translated"
+            )
+            timings["translate"] = time.perf_counter() - stage_start
+            tables_extracted, tables_translated = len(tables), len(translated_tables)
+        
+        timings["total"] = time.perf_counter() - start
+        
+        return self._build_response(
+            file_id, pages, output_format, len(table_configs), tables_extracted, tables_translated,
+            extracted_files, translated_files, timings
+        )
+    
+    def _build_response(
+        self,
+        file_id: str,
+        pages: Optional[List[int]],
+        output_format: str,
+        tables_detected: int,
+        tables_extracted: int,
+        tables_translated: int,
+        extracted_files: List[str],
+        translated_files: List[str],
+        timings: Dict[str, float],
+        triage: Optional[Dict] = None
+    ) -> ExtractionResponse:
+        return ExtractionResponse(
+            status="success",
+            file_id=file_id,
+            pages_processed=len(pages) if pages is not None else None,
+            output_format=output_format,
+            tables_detected=tables_detected,
+            tables_extracted=tables_extracted,
+            tables_translated=tables_translated,
+            extracted_files=[Path(f).name for f in extracted_files],
+            translated_files=[Path(f).name for f in translated_files],
+            triage=triage if triage is not None else self.detection_service.last_triage_report,
+            translation=self.translation_service.last_document_stats,
+            timings={stage: round(seconds, 4) for stage, seconds in timings.items()}
+        )
+    
+    # === Overlapped stages ===
+    
+    def _run_overlapped(
+        self,
+        pdf_path: str,
+        file_id: str,
+        pages: Optional[List[int]],
+        output_format: str,
+        extracted_dir: Path,
+        translated_dir: Path,
+        timings: Dict[str, float],
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Tuple[int, int, int, List[str], List[str], Optional[Dict]]:
+        """
+        Producer thread: detect + extract page by page (in the extraction pool's worker
+        processes when there is one, else on the thread itself).
+        This thread: translate each page's tables as soon as they arrive, through the
+        same per-table path as the sequential pipeline (CSVs: translate_tables, so large
+        tables stay chunked and a failing table is skipped, not fatal).
+        The page queue is bounded, so a fast producer blocks instead of piling up pages.
+        Returns (tables detected, extracted, translated, extracted files, translated files, triage report).
+        """
+        pages_queue = queue.Queue(maxsize=self.overlap_queue_pages)
+        stop = threading.Event()
+        produced = {"detect": 0.0, "extract": 0.0, "configs": 0, "triage": []}
+        
+        def put(item) -> bool:
+            # Give up once the consumer has stopped, instead of blocking on a full queue forever
+            while not stop.is_set():
+                try:
+                    pages_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def produce():
+            try:
+                if self.extraction_pool:
+                    finished = self._produce_pooled(pdf_path, pages, produced, put, cancel_token)
+                else:
+                    finished = self._produce_in_thread(pdf_path, pages, produced, put, cancel_token)
+                if finished:
+                    put(_PAGES_DONE)
+            except Exception as e:
+                put(e)
+        
+        def next_item():
+            while True:
+                try:
+                    return pages_queue.get(timeout=0.5)
+                except queue.Empty:
+                    if producer.is_alive():
+                        continue
+                # Producer gone: whatever it queued last is still there, else it died without a word
+                try:
+                    return pages_queue.get_nowait()
+                except queue.Empty:
+                    raise RuntimeError("Page extraction stopped before the end of the document")
+        
+        # One glossary snapshot for the whole document
+        if self.translation_service.glossary:
+            self.translation_service.glossary.reload_if_changed()
+        
+        producer = threading.Thread(target=produce, name=f"extract-{file_id[:8]}", daemon=True)
+        producer.start()
+        
+        tables, translated_tables = [], []
+        extracted_files, translated_files = [], []
+        tables_extracted = 0
+        translate_seconds = idle_seconds = 0.0
+        # Strings translated for earlier pages are reused for the rest of the document
+        document = DocumentTranslation()
+        finished = False
+        try:
+            while not finished:
+                wait_start = time.perf_counter()
+                items = [next_item()]
+                idle_seconds += time.perf_counter() - wait_start
+                
+                # Pages that queued up meanwhile are translated together (fuller batches)
+                while items[-1] is not _PAGES_DONE and not isinstance(items[-1], Exception):
+                    try:
+                        items.append(pages_queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if isinstance(items[-1], Exception):
+                    raise items[-1]
+                finished = items[-1] is _PAGES_DONE
+                page_tables = [t for item in items if item is not _PAGES_DONE for t in item]
+                if not page_tables:
+                    continue
+                tables_extracted += len(page_tables)
+                
+                stage_start = time.perf_counter()
+                if output_format == "csv":
+                    # One file per table, written as soon as its page is done; nothing kept in memory
+                    page_files = self.table_handler.save_stage_tables(page_tables, str(extracted_dir), file_id, "csv")
+                    extracted_files += page_files
+                    translated_files += self.translation_service.translate_tables(
+                        page_files, str(translated_dir), cancel_token, document=document, reload_glossary=False
+                    )
+                else:
+                    tables.extend(page_tables)
+                    translated_tables.extend(self.translation_service.translate_table_data(
+                        page_tables, reload_glossary=False, document=document, cancel_token=cancel_token
+                    ))
+                translate_seconds += time.perf_counter() - stage_start
+        finally:
+            stop.set()
+            producer.join()
+        
+        if output_format != "csv":
+            extracted_files = self.table_handler.save_stage_tables(tables, str(extracted_dir), file_id, output_format)
+            translated_files = self.table_handler.save_stage_tables(
+                translated_tables, str(translated_dir), file_id, output_format, suffix="_translated"
+            )
+        
+        # Stage times overlap; translate_idle is how long translation waited on extraction
+        timings["detect"] = produced["detect"]
+        timings["extract"] = produced["extract"]
+        timings["translate"] = translate_seconds
+        timings["translate_idle"] = idle_seconds
+        logger.info(f"Overlapped stages: detect {produced['detect']:.2f}s, extract {produced['extract']:.2f}s, "
+                    f"translate {translate_seconds:.2f}s (idle {idle_seconds:.2f}s)")
+        
+        triage = self.detection_service.last_triage_report
+        if self.extraction_pool:
+            triage = PageTriageService.merge_reports([r for r in produced["triage"] if r])
+        # CSV: tables whose translation failed have no file (same as the sequential path)
+        tables_translated = len(translated_files) if output_format == "csv" else len(translated_tables)
+        return produced["configs"], tables_extracted, tables_translated, extracted_files, translated_files, triage
+    
+    def _produce_in_thread(
+        self,
+        pdf_path: str,
+        pages: Optional[List[int]],
+        produced: Dict,
+        put: Callable[[object], bool],
+        cancel_token: Optional[CancellationToken] = None
+    ) -> bool:
+        """Detect + extract page by page on this thread; False if the consumer stopped first"""
+        page_configs = self.detection_service.iter_page_configs(pdf_path, pages, cancel_token)
+        try:
+            while True:
+                stage_start = time.perf_counter()
+                item = next(page_configs, None)
+                produced["detect"] += time.perf_counter() - stage_start
+                if item is None:
+                    return True
+                
+                page_num, words, configs = item
+                stage_start = time.perf_counter()
+                # Document-wide table numbering, same as detect_all_tables + iter_table_data
+                numbered = list(enumerate(configs, produced["configs"] + 1))
+                produced["configs"] += len(configs)
+                page_tables = list(self.extraction_service.tables_from_words(words, numbered, cancel_token))
+                produced["extract"] += time.perf_counter() - stage_start
+                
+                if page_tables and not put(page_tables):
+                    return False
+        finally:
+            page_configs.close()
+    
+    def _produce_pooled(
+        self,
+        pdf_path: str,
+        pages: Optional[List[int]],
+        produced: Dict,
+        put: Callable[[object], bool],
+        cancel_token: Optional[CancellationToken] = None
+    ) -> bool:
+        """Detect + extract page batches in the pool's workers, handing pages on in order"""
+        pool = self.extraction_pool
+        if pages is None:
+            pages = list(range(PDFHandler.get_page_count(pdf_path)))
+        batches = [pages[i:i + pool.batch_pages] for i in range(0, len(pages), pool.batch_pages)]
+        
+        # Two batches per worker in flight: nobody idles, and finished batches waiting
+        # for the consumer stay bounded
+        in_flight, next_batch = deque(), 0
+        try:
+            while next_batch < len(batches) or in_flight:
+                while next_batch < len(batches) and len(in_flight) < 2 * pool.workers:
+                    in_flight.append(pool.submit(pdf_path, batches[next_batch]))
+                    next_batch += 1
+                if cancel_token:
+                    cancel_token.check("detect", pages=sum(len(b) for b in batches[next_batch - len(in_flight):]))
+                
+                page_results, detect_seconds, extract_seconds, triage = in_flight.popleft().result()
+                produced["detect"] += detect_seconds
+                produced["extract"] += extract_seconds
+                produced["triage"].append(triage)
+                
+                for _, configs_found, local_tables in page_results:
+                    # Workers number tables within the page; renumber document-wide
+                    offset = produced["configs"]
+                    produced["configs"] += configs_found
+                    page_tables = [
+                        t.model_copy(update={"table_id": f"table_{offset + int(t.table_id.rsplit('_', 1)[1])}"})
+                        for t in local_tables
+                    ]
+                    if page_tables and not put(page_tables):
+                        return False
+            return True
+        finally:
+            for future in in_flight:
+                future.cancel()
+    
+    # === Artifact store (incremental reprocessing) ===
+    
+    def _stage_versions(self) -> Dict[str, list]:
+        """Code + config identity of each stage; any change invalidates that stage's artifacts"""
+        detection, translation = self.detection_service, self.translation_service
+        translator = translation.translator
+        word_source = getattr(detection.word_source, "inner", detection.word_source)
+        
+        def code(*module_names) -> str:
+            return source_version(*(importlib.import_module(name) for name in module_names))
+        
+        return {
+            "detect": [
+                code(
+                    type(detection).__module__, type(word_source).__module__,
+                    "app.services.page_triage_service", "app.services.ruling_detection_service"
+                ),
+                bool(detection.page_triage), detection.triage_force_all, detection.detection_mode,
+            ],
+            "extract": [
+                code(type(self.extraction_service).__module__, "app.handlers.table_handler", "app.utils.arabic_utils"),
+            ],
+            "translate": [
+                code(
+                    type(translation).__module__, type(translator).__module__, "app.utils.normalizer",
+                    "app.utils.segmenter", "app.services.glossary_service"
+                ),
+                getattr(translator, "model_name", None),
+                getattr(translator, "max_segment_tokens", None),
+                translation.glossary.fingerprint() if translation.glossary else None,
+            ],
+        }
+    
+    def _detect_stored(
+        self,
+        pdf_path: str,
+        pages: Optional[List[int]],
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[TableConfig]:
+        store = self.artifact_store
+        key = store.make_key("detect", self._stage_versions()["detect"], store.file_hash(pdf_path), pages)
+        stored = store.get("detect", key)
+        if stored is not None:
+            logger.info("Detect: reused stored table configs")
+            return [TableConfig(**c) for c in stored]
+        
+        configs = self.detection_service.detect_all_tables(pdf_path, pages, cancel_token)
+        store.put("detect", key, [c.model_dump() for c in configs])
+        return configs
+    
+    def _translate_stored(
+        self,
+        tables: List[TableData],
+        versions: Dict[str, list],
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Tuple[List[TableData], str, bool]:
+        """Translated tables for these exact extracted tables; returns (tables, key, reused)"""
+        store = self.artifact_store
+        key = store.make_key("translate", versions["translate"], [t.model_dump() for t in tables])
+        stored = store.get("translate", key)
+        if stored is not None:
+            return [TableData(**t) for t in stored], key, True
+        
+        translated = self.translation_service.translate_table_data(tables, cancel_token=cancel_token)
+        store.put("translate", key, [t.model_dump() for t in translated])
+        return translated, key, False
+    
+    def _run_stages_stored(
+        self,
+        pdf_path: str,
+        file_id: str,
+        pages: Optional[List[int]],
+        output_format: str,
+        table_configs: List[TableConfig],
+        timings: Dict[str, float],
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Tuple[List[TableData], List[TableData]]:
+        """Extract + translate through the artifact store, and record the job's manifest"""
+        store = self.artifact_store
+        versions = self._stage_versions()
+        pdf_hash = store.file_hash(pdf_path)
+        
+        stage_start = time.perf_counter()
+        extract_key = store.make_key("extract", versions["extract"], pdf_hash, [c.model_dump() for c in table_configs])
+        stored = store.get("extract", extract_key)
+        if stored is not None:
+            tables = [TableData(**t) for t in stored]
+            logger.info(f"Extract: reused {len(tables)} stored tables")
+        else:
+            tables = list(self.extraction_service.iter_table_data(pdf_path, table_configs, cancel_token))
+            store.put("extract", extract_key, [t.model_dump() for t in tables])
+        timings["extract"] = time.perf_counter() - stage_start
+        
+        stage_start = time.perf_counter()
+        translated_tables, translate_key, reused = self._translate_stored(tables, versions, cancel_token)
+        if reused:
+            logger.info(f"Translate: reused {len(translated_tables)} stored translations")
+        timings["translate"] = time.perf_counter() - stage_start
+        
+        # Lets retranslate() redo the last stage from stored extractions alone
+        store.put("jobs", file_id, {
+            "pdf_hash": pdf_hash,
+            "pages": pages,
+            "output_format": output_format,
+            "extract_key": extract_key,
+            "translate_key": translate_key,
+        })
+        return tables, translated_tables
+    
+    def retranslate(self, file_id: str) -> Dict:
+        """Re-run only translation for a stored job (no PDF needed) and rewrite its translated files"""
+        if not self.artifact_store:
+            raise RuntimeError("Artifact store is disabled")
+        
+        store = self.artifact_store
+        manifest = store.get("jobs", file_id)
+        if manifest is None:
+            raise KeyError(f"No stored job '{file_id}'")
+        stored = store.get("extract", manifest["extract_key"])
+        if stored is None:
+            raise KeyError(f"Stored extraction for '{file_id}' is missing")
+        
+        start = time.perf_counter()
+        tables = [TableData(**t) for t in stored]
+        translated_tables, translate_key, reused = self._translate_stored(tables, self._stage_versions())
+        
+        translated_files = []
+        if translate_key != manifest["translate_key"]:
+            translated_dir = FileHandler.shard_dir(self.translated_dir, file_id)
+            translated_files = self.table_handler.save_stage_tables(
+                translated_tables, str(translated_dir), file_id, manifest["output_format"], suffix="_translated"
+            )
+            store.put("jobs", file_id, {**manifest, "translate_key": translate_key})
+        
+        return {
+            "file_id": file_id,
+            "tables": len(tables),
+            "changed": translate_key != manifest["translate_key"],
+            "reused_translation": reused,
+            "translated_files": [Path(f).name for f in translated_files],
+            "seconds": round(time.perf_counter() - start, 3),
+        }
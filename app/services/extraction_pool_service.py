@@ -0,0 +1,76 @@
+# app/services/extraction_pool_service.py
+import multiprocessing
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+import logging
+from app.models.table_models import TableData
+
+logger = logging.getLogger(__name__)
+
+# (page, tables detected, non-empty tables numbered 1.. within the page)
+PageResult = Tuple[int, int, List[TableData]]
+
+# Built once per worker process by _init_worker
+_services: Dict[str, object] = {}
+
+def _init_worker():
+    """Worker process: build detection/extraction services from the same settings as the server"""
+    from app.core.dependencies import get_detection_service, get_extraction_service
+    _services["detection"] = get_detection_service()
+    _services["extraction"] = get_extraction_service()
+
+def _extract_pages(pdf_path: str, pages: List[int]) -> Tuple[List[PageResult], float, float, Optional[Dict]]:
+    """Detect + extract a batch of pages; returns (page results, detect s, extract s, triage report)"""
+    detection, extraction = _services["detection"], _services["extraction"]
+    results, detect_seconds, extract_seconds = [], 0.0, 0.0
+    page_configs = detection.iter_page_configs(pdf_path, pages)
+    while True:
+        start = time.perf_counter()
+        item = next(page_configs, None)
+        detect_seconds += time.perf_counter() - start
+        if item is None:
+            break
+        
+        page_num, words, configs = item
+        start = time.perf_counter()
+        tables = list(extraction.tables_from_words(words, list(enumerate(configs, 1))))
+        extract_seconds += time.perf_counter() - start
+        results.append((page_num, len(configs), tables))
+    # One batch per worker at a time, so the report is this batch's
+    return results, detect_seconds, extract_seconds, detection.last_triage_report
+
+class PageExtractionPool:
+    """
+    Worker processes that detect and extract batches of pages for the overlapped
+    pipeline, so page detection/extraction uses more than one core while the
+    request thread translates. A pool broken by a crashed worker is replaced.
+    """
+    
+    def __init__(self, workers: int = 2, batch_pages: int = 4):
+        self.workers = workers
+        self.batch_pages = batch_pages
+        self._executor = self._start()
+        logger.info(f"✅ Extraction pool: {workers} workers, {batch_pages} pages per batch")
+    
+    def _start(self) -> ProcessPoolExecutor:
+        # spawn: no inherited threads/locks from the web server
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+    
+    def submit(self, pdf_path: str, pages: List[int]) -> Future:
+        """Detect + extract these pages (0-based) in a worker"""
+        try:
+            return self._executor.submit(_extract_pages, pdf_path, pages)
+        except BrokenProcessPool:
+            logger.warning("Extraction pool broken (worker died), restarting it")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._start()
+            return self._executor.submit(_extract_pages, pdf_path, pages)
+    
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
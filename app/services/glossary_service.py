@@ -0,0 +1,199 @@
+# app/services/glossary_service.py
+import csv
+import hashlib
+import json
+import re
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional
+import logging
+from app.utils.normalizer import Normalizer
+
+logger = logging.getLogger(__name__)
+
+# Runs of Arabic letters (same blocks as Normalizer.has_arabic_letters) / of anything else
+TOKEN_RE = re.compile(
+    r"[\u0621-\u063A\u0641-\u064A\u0671-\u06D3\u06F0-\u06FC]+"
+    r"|[^\u0621-\u063A\u0641-\u064A\u0671-\u06D3\u06F0-\u06FC]+"
+)
+
+class GlossaryService:
+    """
+    Glossary / translation-memory lookup that resolves known terms without the model.
+    
+    Entries are keyed on the normalized form (NFKC + Normalizer.clean_text, whitespace
+    removed), so presentation-form glyphs and words broken by PDF spacing still match.
+    Supports .csv/.tsv (arabic,english) and .json ({"arabic": "english"}) files.
+    """
+    
+    def __init__(self, glossary_path: Optional[Path] = None, phrase_match: bool = True):
+        self.glossary_path = Path(glossary_path) if glossary_path else None
+        self.phrase_match = phrase_match
+        self.normalizer = Normalizer()
+        
+        self._lock = threading.Lock()
+        self._entries: Dict[str, str] = {}
+        self._max_key_len = 0
+        self._loaded_mtime: Optional[float] = None
+        self._fingerprint = ""
+        
+        self.lookups = 0
+        self.exact_hits = 0
+        self.phrase_hits = 0
+        
+        self.reload()
+    
+    def _clean(self, text: str) -> str:
+        return self.normalizer.clean_text(unicodedata.normalize("NFKC", text))
+    
+    def _key(self, text: str) -> str:
+        """Normalized lookup key"""
+        return "".join(self._clean(text).split())
+    
+    def _tokens(self, text: str) -> List[str]:
+        """Whitespace-separated words, with leading/trailing non-letters (numbers, punctuation) split off"""
+        tokens = []
+        for word in self._clean(text).split():
+            tokens.extend(TOKEN_RE.findall(word))
+        return tokens
+    
+    def _read_entries(self, path: Path) -> Dict[str, str]:
+        """Read raw (arabic, english) pairs from disk"""
+        if path.suffix.lower() == ".json":
+            with open(path, encoding="utf-8") as f:
+                return dict(json.load(f))
+        
+        delimiter = "\t" if path.suffix.lower() == ".tsv" else ","
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            rows = [row for row in csv.reader(f, delimiter=delimiter) if len(row) >= 2]
+        # Skip header row
+        if rows and rows[0][0].strip().lower() in ("arabic", "source", "ar"):
+            rows = rows[1:]
+        return {row[0]: row[1] for row in rows}
+    
+    def reload(self) -> int:
+        """(Re)load the glossary file; returns the number of entries"""
+        if self.glossary_path is None or not self.glossary_path.exists():
+            if self.glossary_path is not None:
+                logger.warning(f"Glossary file not found: {self.glossary_path}")
+            entries, mtime = {}, None
+        else:
+            mtime = self.glossary_path.stat().st_mtime
+            raw = self._read_entries(self.glossary_path)
+            entries = {self._key(ar): en.strip() for ar, en in raw.items() if ar.strip() and en.strip()}
+        
+        # Swap atomically so concurrent lookups never see a half-loaded glossary
+        with self._lock:
+            self._entries = entries
+            self._max_key_len = max((len(k) for k in entries), default=0)
+            self._loaded_mtime = mtime
+            self._fingerprint = hashlib.sha256(json.dumps(sorted(entries.items())).encode()).hexdigest()[:16]
+        
+        logger.info(f"📖 Glossary loaded: {len(entries)} entries")
+        return len(entries)
+    
+    def reload_if_changed(self) -> bool:
+        """Reload when the glossary file was modified on disk"""
+        if self.glossary_path is None or not self.glossary_path.exists():
+            return False
+        if self.glossary_path.stat().st_mtime == self._loaded_mtime:
+            return False
+        self.reload()
+        return True
+    
+    def fingerprint(self) -> str:
+        """Hash of the loaded entries (changes whenever the glossary content does)"""
+        with self._lock:
+            return self._fingerprint
+    
+    def lookup(self, text: str) -> Optional[str]:
+        """Resolve a cell from the glossary, or None if the model is needed"""
+        if not isinstance(text, str) or not self._entries:
+            return None
+        
+        key = self._key(text)
+        entries, max_key_len = self._entries, self._max_key_len
+        
+        with self._lock:
+            self.lookups += 1
+        
+        # Exact match on the normalized form
+        if key in entries:
+            with self._lock:
+                self.exact_hits += 1
+            return entries[key]
+        
+        if not self.phrase_match:
+            return None
+        
+        translated = self._lookup_phrases(self._tokens(text), entries, max_key_len)
+        if translated is not None:
+            with self._lock:
+                self.phrase_hits += 1
+        return translated
+    
+    def _lookup_phrases(self, tokens: List[str], entries: Dict[str, str], max_key_len: int) -> Optional[str]:
+        """
+        Greedy longest-phrase cover of the cell's tokens. A phrase is a run of whole
+        tokens (joined without whitespace, like the keys), so a term never matches part
+        of a longer word. Non-letter tokens (numbers, punctuation) pass through; any
+        Arabic word left uncovered means the model is needed.
+        """
+        # Pure numbers/punctuation are not glossary hits
+        if not any(self.normalizer.has_arabic_letters(t) for t in tokens):
+            return None
+        
+        parts: List[str] = []
+        literal = ""
+        i = 0
+        while i < len(tokens):
+            if not self.normalizer.has_arabic_letters(tokens[i]):
+                literal += tokens[i]
+                i += 1
+                continue
+            
+            # Candidate phrases: tokens[i:end] for every end, longest first
+            ends, phrase = [], ""
+            for end in range(i + 1, len(tokens) + 1):
+                phrase += tokens[end - 1]
+                if len(phrase) > max_key_len:
+                    break
+                ends.append((end, phrase))
+            for end, phrase in reversed(ends):
+                if phrase in entries:
+                    break
+            else:
+                return None
+            
+            if literal:
+                parts.append(literal)
+                literal = ""
+            parts.append(entries[phrase])
+            i = end
+        
+        if literal:
+            parts.append(literal)
+        return " ".join(parts)
+    
+    def resolve(self, texts: List[str]) -> Dict[str, str]:
+        """Resolve as many strings as possible; returns {text: translation} for hits"""
+        resolved = {}
+        for text in texts:
+            translated = self.lookup(text)
+            if translated is not None:
+                resolved[text] = translated
+        return resolved
+    
+    def get_stats(self) -> Dict:
+        """Entry count and hit-rate counters since startup"""
+        with self._lock:
+            hits = self.exact_hits + self.phrase_hits
+            return {
+                "path": str(self.glossary_path) if self.glossary_path else None,
+                "entries": len(self._entries),
+                "lookups": self.lookups,
+                "exact_hits": self.exact_hits,
+                "phrase_hits": self.phrase_hits,
+                "hit_rate": round(hits / self.lookups, 4) if self.lookups else 0.0,
+            }
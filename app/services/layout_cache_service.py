@@ -0,0 +1,121 @@
+# app/services/layout_cache_service.py
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Optional, Tuple
+import logging
+from app.models.table_models import TableConfig
+
+logger = logging.getLogger(__name__)
+
+# (mean_top, word_count, min_x0, max_x1) per row band
+RowBand = Tuple[float, int, float, float]
+
+class LayoutCacheService:
+    """
+    Caches detected TableConfigs under a coarse word-geometry fingerprint of the page.
+    Pages that reuse a statement template (same rows, extents and word counts within
+    tolerance) get the cached configs back instead of re-running region/column detection.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 256,
+        y_tolerance: float = 3.0,
+        x_tolerance: float = 20.0,
+        count_tolerance: int = 2,
+        row_tolerance: float = 12
+    ):
+        self.max_entries = max_entries
+        self.y_tolerance = y_tolerance
+        self.x_tolerance = x_tolerance
+        self.count_tolerance = count_tolerance
+        # Same banding as TableDetectionService._detect_table_regions
+        self.row_tolerance = row_tolerance
+        
+        self._lock = threading.Lock()
+        # coarse key -> [(bands, configs)], LRU ordered
+        self._entries: "OrderedDict[tuple, List[Tuple[List[RowBand], List[TableConfig]]]]" = OrderedDict()
+        self._size = 0
+        
+        self.lookups = 0
+        self.hits = 0
+        self.rejected = 0
+    
+    def fingerprint(self, words: List[Dict], pdf_w: float, pdf_h: float) -> Tuple[tuple, List[RowBand]]:
+        """Coarse key (page size, band count) plus per-band geometry"""
+        bands = defaultdict(list)
+        for w in words:
+            bands[round(w["top"] / self.row_tolerance)].append(w)
+        
+        rows = [
+            (
+                sum(w["top"] for w in ws) / len(ws),
+                len(ws),
+                min(w["x0"] for w in ws),
+                max(w["x1"] for w in ws),
+            )
+            for _, ws in sorted(bands.items())
+        ]
+        return (round(pdf_w), round(pdf_h), len(rows)), rows
+    
+    def _matches(self, a: List[RowBand], b: List[RowBand]) -> bool:
+        return all(
+            abs(ra[0] - rb[0]) <= self.y_tolerance
+            and abs(ra[1] - rb[1]) <= self.count_tolerance
+            and abs(ra[2] - rb[2]) <= self.x_tolerance
+            and abs(ra[3] - rb[3]) <= self.x_tolerance
+            for ra, rb in zip(a, b)
+        )
+    
+    def lookup(self, fingerprint: Tuple[tuple, List[RowBand]]) -> Optional[List[TableConfig]]:
+        """Cached configs for a matching layout (caller must verify them)"""
+        key, bands = fingerprint
+        with self._lock:
+            self.lookups += 1
+            candidates = self._entries.get(key)
+            if not candidates:
+                return None
+            self._entries.move_to_end(key)
+            for cached_bands, configs in candidates:
+                if self._matches(bands, cached_bands):
+                    return configs
+        return None
+    
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+    
+    def record_rejected(self):
+        """Cached configs matched the fingerprint but failed verification"""
+        with self._lock:
+            self.rejected += 1
+    
+    def store(self, fingerprint: Tuple[tuple, List[RowBand]], configs: List[TableConfig]):
+        """Remember configs for this layout (LRU-evicting old layouts)"""
+        key, bands = fingerprint
+        # "No tables" cannot be verified against a page, so a table page whose fingerprint
+        # matched a text page would come back empty: never cache it
+        if not bands or not configs:
+            return
+        with self._lock:
+            self._entries.setdefault(key, []).append((bands, configs))
+            self._entries.move_to_end(key)
+            self._size += 1
+            while self._size > self.max_entries and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "layouts": self._size,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "rejected": self.rejected,
+                "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            }
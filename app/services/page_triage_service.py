@@ -0,0 +1,143 @@
+# app/services/page_triage_service.py
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+import fitz
+import logging
+from app.handlers.word_sources import PyMuPDFWordSource
+
+logger = logging.getLogger(__name__)
+
+LIKELY_TABLE = "likely_table"
+TEXT_ONLY = "text_only"
+EMPTY = "empty"
+
+class PageTriageService:
+    """
+    Fast PyMuPDF pre-pass that classifies pages as likely-table, text-only or empty,
+    so the full pdfplumber pipeline only runs where a table can exist.
+    
+    A page is likely-table if it has a run of `min_rows` wide multi-word rows, by the
+    same rule and on the same (pdfplumber-shaped) words as
+    TableDetectionService._detect_table_regions, so a page the word heuristics would
+    find a table on is never skipped; or enough ruling lines to form the smallest grid
+    RulingGridDetector accepts. Deliberately errs towards likely-table.
+    """
+    
+    def __init__(
+        self,
+        min_rows: int = 3,
+        row_tolerance: float = 12,
+        min_row_span: float = 200,
+        min_ruling_lines: int = 4
+    ):
+        self.min_rows = min_rows
+        self.row_tolerance = row_tolerance
+        self.min_row_span = min_row_span
+        # 3 rules + 1 column line: a 2x2 open-sided grid
+        self.min_ruling_lines = min_ruling_lines
+        self.word_source = PyMuPDFWordSource()
+    
+    def classify_page(self, page) -> str:
+        """Classify one fitz page"""
+        words = self.word_source.extract_words(page)
+        if not words:
+            return EMPTY
+        
+        if self._has_row_run(words) or self._count_ruling_lines(page) >= self.min_ruling_lines:
+            return LIKELY_TABLE
+        return TEXT_ONLY
+    
+    def _has_row_run(self, words: List[Dict]) -> bool:
+        """
+        Any region of min_rows wide multi-word rows? Same rule as the detector: a
+        single-word row ends the region, a narrow multi-word row (e.g. a wrapped cell)
+        neither counts nor ends it, and wide rows join while the gap is under 2 rows.
+        """
+        rows = defaultdict(list)
+        for w in words:
+            rows[round(w["top"] / self.row_tolerance) * self.row_tolerance].append((w["x0"], w["x1"]))
+        
+        run, last_y = 0, None
+        for y, spans in sorted(rows.items()):
+            if len(spans) < 2:
+                run, last_y = 0, None
+                continue
+            if max(s[1] for s in spans) - min(s[0] for s in spans) <= self.min_row_span:
+                continue
+            # The detector's region ends one row_tolerance below its last wide row
+            run = run + 1 if last_y is not None and y - (last_y + self.row_tolerance) < self.row_tolerance * 2 else 1
+            last_y = y
+            if run >= self.min_rows:
+                return True
+        return False
+    
+    def _count_ruling_lines(self, page) -> int:
+        """Horizontal/vertical line segments and thin rectangles in the vector graphics"""
+        count = 0
+        for path in page.get_drawings():
+            for item in path["items"]:
+                if item[0] == "l":
+                    p1, p2 = item[1], item[2]
+                    if abs(p1.x - p2.x) < 1 or abs(p1.y - p2.y) < 1:
+                        count += 1
+                elif item[0] == "re":
+                    rect = item[1]
+                    count += 1 if min(rect.width, rect.height) < 2 else 4
+        return count
+    
+    def triage(self, pdf_path: str, pages: Optional[Iterable[int]] = None) -> Tuple[Dict[int, str], float]:
+        """Classify pages (0-based); returns ({page: class}, seconds spent)"""
+        start = time.perf_counter()
+        decisions = {}
+        doc = fitz.open(pdf_path)
+        try:
+            numbers = range(doc.page_count) if pages is None else sorted(set(pages))
+            for page_num in numbers:
+                if 0 <= page_num < doc.page_count:
+                    decisions[page_num] = self.classify_page(doc[page_num])
+        finally:
+            doc.close()
+        return decisions, time.perf_counter() - start
+    
+    @staticmethod
+    def build_report(
+        decisions: Dict[int, str],
+        triage_seconds: float,
+        processed_pages: List[int],
+        detection_seconds: float,
+        forced: bool,
+        audit_misses: Optional[List[int]] = None
+    ) -> Dict:
+        """Summarize decisions and estimate time saved from the measured per-page cost"""
+        counts = defaultdict(int)
+        for decision in decisions.values():
+            counts[decision] += 1
+        
+        skipped = 0 if forced else len(decisions) - len(processed_pages)
+        per_page = detection_seconds / len(processed_pages) if processed_pages else 0.0
+        return {
+            "pages_total": len(decisions),
+            "likely_table": counts[LIKELY_TABLE],
+            "text_only": counts[TEXT_ONLY],
+            "empty": counts[EMPTY],
+            "pages_skipped": skipped,
+            "forced": forced,
+            "triage_seconds": round(triage_seconds, 3),
+            "estimated_seconds_saved": round(max(0.0, per_page * skipped - triage_seconds), 3),
+            "audit_misses": audit_misses or [],
+        }
+    
+    @staticmethod
+    def merge_reports(reports: List[Dict]) -> Optional[Dict]:
+        """One report for a document triaged in several page batches"""
+        if not reports:
+            return None
+        merged = dict(reports[0], audit_misses=list(reports[0]["audit_misses"]))
+        for report in reports[1:]:
+            for field in ("pages_total", "likely_table", "text_only", "empty", "pages_skipped"):
+                merged[field] += report[field]
+            for field in ("triage_seconds", "estimated_seconds_saved"):
+                merged[field] = round(merged[field] + report[field], 3)
+            merged["audit_misses"] += report["audit_misses"]
+        return merged
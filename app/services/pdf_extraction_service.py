@@ -1,51 +1,97 @@
 # app/services/pdf_extraction_service.py
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
+from collections import defaultdict
 from pathlib import Path
 from app.handlers.pdf_handler import PDFHandler
 from app.handlers.table_handler import TableHandler
-from app.models.table_models import TableConfig
+from app.handlers.word_sources import get_word_source
+from app.models.table_models import TableConfig, TableData
+from app.utils.cancellation import CancellationToken
 
 class PDFExtractionService:
     """Service for extracting tables from PDFs [web:42][web:45]"""
     
-    def __init__(self):
+    def __init__(self, word_backend: str = "pdfplumber"):
         self.pdf_handler = PDFHandler()
         self.table_handler = TableHandler()
+        self.word_source = get_word_source(word_backend)
     
     def extract_tables(
         self, 
         pdf_path: str, 
         table_configs: List[TableConfig],
         output_dir: str,
-        file_id: str
+        file_id: str,
+        cancel_token: Optional[CancellationToken] = None
     ) -> List[str]:
-        """Extract all tables and save to CSV"""
+        """Extract all tables and save to CSV (one page in memory at a time)"""
         extracted_files = []
         
-        for idx, config in enumerate(table_configs, 1):
-            # Extract words in bbox
-            all_words = self.pdf_handler.extract_words_from_page(pdf_path, config.page)
-            bbox = config.bbox
-            
-            words = [
-                w for w in all_words 
-                if (w["x1"] > bbox.x0 and w["x0"] < bbox.x1 and
-                    w["bottom"] > bbox.y0 and w["top"] < bbox.y1)
-            ]
-            
-            # Convert to table
-            col_bounds = sorted(config.columns)
-            if col_bounds[0] > bbox.x0:
-                col_bounds.insert(0, bbox.x0)
-            if col_bounds[-1] < bbox.x1:
-                col_bounds.append(bbox.x1)
-            
-            table_rows = self.table_handler.words_to_table(words, col_bounds)
-            
-            # Save to CSV
-            if table_rows:
-                output_path = Path(output_dir) / f"{file_id}_table_{idx}.csv"
-                self.table_handler.save_table_to_csv(table_rows, str(output_path))
-                extracted_files.append(str(output_path))
+        for table in self.iter_table_data(pdf_path, table_configs, cancel_token):
+            output_path = Path(output_dir) / f"{file_id}_{table.table_id}.csv"
+            self.table_handler.save_table_to_csv(table.rows, str(output_path))
+            extracted_files.append(str(output_path))
         
         return extracted_files
+    
+    def iter_table_data(
+        self,
+        pdf_path: str,
+        table_configs: List[TableConfig],
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Iterator[TableData]:
+        """Yield non-empty tables page by page (table_id keeps document-wide numbering)"""
+        # Group configs by page, keeping the document-wide table numbering
+        configs_by_page = defaultdict(list)
+        for idx, config in enumerate(table_configs, 1):
+            configs_by_page[config.page].append((idx, config))
+        
+        for page_num, all_words, _, _ in self.word_source.iter_pages(pdf_path, configs_by_page.keys()):
+            # Words are extracted once per page, shared by all its tables
+            for idx, config in configs_by_page[page_num]:
+                if cancel_token:
+                    cancel_token.check("extract", tables=len(table_configs) - idx + 1)
+                table = self._build_table(all_words, idx, config)
+                if table:
+                    yield table
+    
+    def tables_from_words(
+        self,
+        all_words: List[Dict],
+        numbered_configs: List[Tuple[int, TableConfig]],
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Iterator[TableData]:
+        """Build the non-empty tables of one page from its words ((table number, config) pairs)"""
+        for i, (idx, config) in enumerate(numbered_configs):
+            if cancel_token:
+                cancel_token.check("extract", tables=len(numbered_configs) - i)
+            table = self._build_table(all_words, idx, config)
+            if table:
+                yield table
+    
+    def _build_table(self, all_words: List[Dict], idx: int, config: TableConfig) -> Optional[TableData]:
+        # Words in bbox
+        bbox = config.bbox
+        words = [
+            w for w in all_words 
+            if (w["x1"] > bbox.x0 and w["x0"] < bbox.x1 and
+                w["bottom"] > bbox.y0 and w["top"] < bbox.y1)
+        ]
+        
+        # Convert to table
+        col_bounds = sorted(config.columns)
+        if col_bounds[0] > bbox.x0:
+            col_bounds.insert(0, bbox.x0)
+        if col_bounds[-1] < bbox.x1:
+            col_bounds.append(bbox.x1)
+        
+        table_rows = self.table_handler.words_to_table(words, col_bounds)
+        if not table_rows:
+            return None
+        
+        return TableData(
+            table_id=f"table_{idx}",
+            page=config.page,
+            rows=table_rows,
+            column_count=len(col_bounds) - 1
+        )
@@ -0,0 +1,276 @@
+# app/services/preview_service.py
+import hashlib
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import fitz
+import logging
+from app.handlers.file_handler import FileHandler
+from app.handlers.pdf_handler import PDFHandler
+from app.models.table_models import TableConfig
+from app.services.table_detection_service import TableDetectionService
+
+logger = logging.getLogger(__name__)
+
+class _OpenDocument:
+    """A fitz document kept open between previews (fitz objects are not thread-safe)"""
+    
+    def __init__(self, path: str, mtime_ns: int):
+        self.doc = fitz.open(path)
+        self.mtime_ns = mtime_ns
+        self.lock = threading.Lock()
+    
+    def close(self):
+        with self.lock:
+            self.doc.close()
+
+class PagePreviewService:
+    """
+    Page images for the review UI, rendered with PDFHandler.render_page_to_image.
+    Keeps one open fitz document per file (LRU, `max_open_documents`) and caches PNGs
+    on disk under <cache_dir>/<key[:2]>/<key>.png, keyed by file hash, page, DPI and
+    crop; least recently viewed previews are evicted above `max_cache_mb`.
+    Table crops use their own detection service without page triage, so every page
+    is searched and the pipeline's triage report is left alone; tables are addressed
+    by page and page-local index.
+    """
+    
+    def __init__(
+        self,
+        upload_dir: str,
+        cache_dir: str,
+        max_cache_mb: Optional[float] = 512,
+        max_open_documents: int = 16,
+        max_page_layouts: int = 256,
+        max_file_hashes: int = 1024,
+        detection_service: Optional[TableDetectionService] = None
+    ):
+        self.upload_dir = Path(upload_dir)
+        self.cache_dir = Path(cache_dir)
+        self.max_cache_bytes = int(max_cache_mb * 1024 * 1024) if max_cache_mb else None
+        self.max_open_documents = max_open_documents
+        self.max_page_layouts = max_page_layouts
+        self.max_file_hashes = max_file_hashes
+        self.detection_service = detection_service or TableDetectionService()
+        
+        self._lock = threading.Lock()
+        self._documents: "OrderedDict[str, _OpenDocument]" = OrderedDict()
+        # Cached previews, least recently viewed first: key -> bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        # (path, mtime_ns, size) -> sha256, least recently used first
+        self._file_hashes: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        # (file hash, page) -> detected TableConfigs, so crops don't re-run detection
+        self._page_layouts: "OrderedDict[Tuple[str, int], List[TableConfig]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load_index()
+    
+    def _load_index(self):
+        """Pick up previews rendered before a restart (file mtime = last view)"""
+        if not self.cache_dir.exists():
+            return
+        entries = []
+        for path in self.cache_dir.glob("*/*.png"):
+            if path.name.endswith(".tmp.png"):
+                # Left behind by an interrupted render
+                FileHandler.delete_file(str(path))
+                continue
+            stat = path.stat()
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._bytes += size
+        if entries:
+            logger.info(f"Preview cache: {len(entries)} previews ({self._bytes / 1024 / 1024:.1f} MB)")
+    
+    # === Source files ===
+    
+    def source_pdf(self, file_id: str) -> Optional[Path]:
+        """The job's uploaded PDF (None once it has been evicted/discarded)"""
+        try:
+            uuid.UUID(file_id)
+        except ValueError:
+            raise ValueError(f"Invalid file id '{file_id}'")
+        
+        for directory in (FileHandler.shard_dir(self.upload_dir, file_id, create=False), self.upload_dir):
+            path = directory / f"{file_id}.pdf"
+            if path.is_file():
+                return path
+        return None
+    
+    def file_hash(self, path: str) -> str:
+        """sha256 of a file's bytes (memoized on path + mtime + size)"""
+        stat = os.stat(path)
+        memo_key = (str(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._file_hashes.get(memo_key)
+            if cached:
+                self._file_hashes.move_to_end(memo_key)
+                return cached
+        
+        # Hashed outside the lock; two threads racing on one file just compute it twice
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                digest.update(chunk)
+        with self._lock:
+            self._file_hashes[memo_key] = digest.hexdigest()
+            while len(self._file_hashes) > self.max_file_hashes:
+                self._file_hashes.popitem(last=False)
+        return digest.hexdigest()
+    
+    def _document(self, pdf_path: str) -> _OpenDocument:
+        """Open document for a file, reopened if the file changed since"""
+        mtime_ns = os.stat(pdf_path).st_mtime_ns
+        evicted = []
+        with self._lock:
+            document = self._documents.get(pdf_path)
+            if document is not None and document.mtime_ns == mtime_ns:
+                self._documents.move_to_end(pdf_path)
+                return document
+            if document is not None:
+                evicted.append(self._documents.pop(pdf_path))
+            
+            document = _OpenDocument(pdf_path, mtime_ns)
+            self._documents[pdf_path] = document
+            while len(self._documents) > self.max_open_documents:
+                evicted.append(self._documents.popitem(last=False)[1])
+        
+        # Outside the service lock: waits for renders still using these documents
+        for old in evicted:
+            old.close()
+        return document
+    
+    @contextmanager
+    def _open(self, pdf_path: str) -> Iterator["fitz.Document"]:
+        """Exclusive use of the file's open document"""
+        while True:
+            document = self._document(pdf_path)
+            with document.lock:
+                # Evicted (and closed) between the lookup and the lock: take a fresh one
+                if document.doc.is_closed:
+                    continue
+                yield document.doc
+                return
+    
+    def page_count(self, pdf_path: str) -> int:
+        with self._open(str(pdf_path)) as doc:
+            return doc.page_count
+    
+    def table_configs(self, pdf_path: str, page_num: int) -> List[TableConfig]:
+        """Tables detected on one page (0-based), remembered per file content"""
+        layout_key = (self.file_hash(str(pdf_path)), page_num)
+        with self._lock:
+            configs = self._page_layouts.get(layout_key)
+            if configs is not None:
+                self._page_layouts.move_to_end(layout_key)
+                return configs
+        
+        configs = self.detection_service.detect_all_tables(str(pdf_path), [page_num])
+        with self._lock:
+            self._page_layouts[layout_key] = configs
+            while len(self._page_layouts) > self.max_page_layouts:
+                self._page_layouts.popitem(last=False)
+        return configs
+    
+    def page_table(self, pdf_path: str, page_num: int, index: int) -> Optional[TableConfig]:
+        """
+        The `index`-th (1-based) table detected on a page (0-based); None if the page has
+        fewer. Numbering is page-local and comes from this service's detector, which
+        searches every page: it is not the pipeline's document-wide table_N, whose
+        numbering depends on the requested pages, triage and the layout cache.
+        """
+        configs = self.table_configs(pdf_path, page_num)
+        return configs[index - 1] if 1 <= index <= len(configs) else None
+    
+    # === Previews ===
+    
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.png"
+    
+    def preview(
+        self,
+        pdf_path: str,
+        page_num: int,
+        dpi: int = 120,
+        clip: Optional[Tuple[float, float, float, float]] = None,
+        overlay_columns: Optional[List[float]] = None
+    ) -> Tuple[Path, str]:
+        """PNG of a page (0-based) or of its `clip` rectangle; returns (path, cache key)"""
+        pdf_path = str(pdf_path)
+        key = hashlib.sha256(json.dumps([
+            self.file_hash(pdf_path), page_num, dpi,
+            [round(v, 2) for v in clip] if clip else None,
+            [round(v, 2) for v in overlay_columns] if overlay_columns is not None else None,
+        ]).encode()).hexdigest()
+        path = self._path(key)
+        
+        with self._lock:
+            cached = key in self._entries and path.exists()
+            if cached:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            else:
+                self.misses += 1
+        if cached:
+            # mtime tracks recency across restarts
+            os.utime(path)
+            return path, key
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp.png")
+        with self._open(pdf_path) as doc:
+            if not 0 <= page_num < doc.page_count:
+                raise ValueError(f"Page {page_num + 1} out of range (document has {doc.page_count} pages)")
+            PDFHandler.render_page_to_image(
+                pdf_path, page_num, str(tmp_path), dpi=dpi,
+                clip=clip, overlay_columns=overlay_columns, doc=doc
+            )
+        tmp_path.replace(path)
+        
+        with self._lock:
+            self._bytes += path.stat().st_size - self._entries.pop(key, 0)
+            self._entries[key] = path.stat().st_size
+            evicted = self._evict()
+        for old_key in evicted:
+            FileHandler.delete_file(str(self._path(old_key)))
+        return path, key
+    
+    def _evict(self) -> List[str]:
+        """Least recently viewed keys to drop to get under the size limit (call with the lock held)"""
+        evicted = []
+        while self.max_cache_bytes is not None and self._bytes > self.max_cache_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            evicted.append(key)
+        return evicted
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "previews": len(self._entries),
+                "bytes_used": self._bytes,
+                "max_bytes": self.max_cache_bytes,
+                "open_documents": len(self._documents),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+    
+    def close(self):
+        """Close all open documents"""
+        with self._lock:
+            documents = list(self._documents.values())
+            self._documents.clear()
+        for document in documents:
+            document.close()
@@ -0,0 +1,204 @@
+# app/services/ruling_detection_service.py
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (position, start, end): y + x-span for horizontals, x + y-span for verticals
+Segment = Tuple[float, float, float]
+
+class RulingGridDetector:
+    """
+    Finds table grids in a page's vector graphics (PyMuPDF drawings).
+    Ruling lines are line items and thin rectangles (how Word/Excel exports draw
+    borders); invisible white ones and large shading fills are ignored. Lines that
+    touch form a grid, whose outer edges give the table bbox and whose vertical
+    lines give the column boundaries.
+    """
+    
+    def __init__(
+        self,
+        max_line_width: float = 2.0,
+        snap_tolerance: float = 3.0,
+        min_segment_length: float = 5.0,
+        min_rows: int = 2,
+        min_columns: int = 2
+    ):
+        self.max_line_width = max_line_width
+        # Lines this close are one line (double borders, rounding) / touch each other
+        self.snap_tolerance = snap_tolerance
+        self.min_segment_length = min_segment_length
+        self.min_rows = min_rows
+        self.min_columns = min_columns
+    
+    def detect(self, page) -> List[Dict]:
+        """Grids on one fitz page: [{"x0", "y0", "x1", "y1", "columns", "rows"}] in page points"""
+        horizontals, verticals = self._ruling_segments(page)
+        horizontals = self._merge_segments(horizontals)
+        verticals = self._merge_segments(verticals)
+        if not horizontals or not verticals:
+            return []
+        
+        components = self._connected_grids(horizontals, verticals)
+        # Rules that belong to no grid (e.g. the rows of a horizontal-rules-only table)
+        gridded = {h for h_lines, _ in components for h in h_lines}
+        free = [h for h in horizontals if h not in gridded]
+        
+        grids = []
+        for h_lines, v_lines in components:
+            if self._continues_outside(h_lines, free):
+                continue
+            
+            x0 = min(min(h[1] for h in h_lines), min(v[0] for v in v_lines))
+            x1 = max(max(h[2] for h in h_lines), max(v[0] for v in v_lines))
+            y0 = min(min(h[0] for h in h_lines), min(v[1] for v in v_lines))
+            y1 = max(max(h[0] for h in h_lines), max(v[2] for v in v_lines))
+            
+            # Open-sided tables have no outer vertical line: the horizontals still bound them
+            columns = self._cluster([x0] + [v[0] for v in v_lines] + [x1])
+            rows = self._cluster([y0] + [h[0] for h in h_lines] + [y1])
+            if len(columns) - 1 < self.min_columns or len(rows) - 1 < self.min_rows:
+                continue
+            
+            grids.append({"x0": x0, "y0": y0, "x1": x1, "y1": y1, "columns": columns, "rows": len(rows) - 1})
+        
+        return sorted(grids, key=lambda g: (g["y0"], g["x0"]))
+    
+    def _continues_outside(self, h_lines: List[Segment], free: List[Segment]) -> bool:
+        """
+        A boxed block inside a horizontal-rules-only table (e.g. a framed subtotal) is
+        not a table of its own: free rules of the same width go on above or below it at
+        the same row spacing, at least two in a row. A single underline, a double rule
+        or a neighbouring grid does not count.
+        """
+        ys = sorted(h[0] for h in h_lines)
+        x0, x1 = min(h[1] for h in h_lines), max(h[2] for h in h_lines)
+        gaps = [b - a for a, b in zip(ys, ys[1:]) if b - a > self.snap_tolerance]
+        if not gaps:
+            return False
+        gap = sorted(gaps)[len(gaps) // 2]
+        
+        def same_width(hx0: float, hx1: float) -> bool:
+            overlap = min(x1, hx1) - max(x0, hx0)
+            return overlap >= 0.5 * (x1 - x0) and overlap >= 0.5 * (hx1 - hx0)
+        
+        rule_ys = sorted(y for y, hx0, hx1 in free if same_width(hx0, hx1))
+        for direction, edge in ((-1, ys[0]), (1, ys[-1])):
+            run, y = 0, edge
+            while True:
+                steps = [r for r in rule_ys if 0.5 * gap <= direction * (r - y) <= 1.5 * gap]
+                if not steps:
+                    break
+                y = min(steps, key=lambda r: abs(r - y))
+                run += 1
+            if run >= 2:
+                return True
+        return False
+    
+    @staticmethod
+    def _is_visible(color: Optional[tuple]) -> bool:
+        # White on (usually) white paper draws nothing
+        return bool(color) and min(color) < 0.95
+    
+    def _ruling_segments(self, page) -> Tuple[List[Segment], List[Segment]]:
+        horizontals, verticals = [], []
+        
+        def add_line(x0, y0, x1, y1):
+            if abs(y1 - y0) <= self.max_line_width and abs(x1 - x0) >= self.min_segment_length:
+                horizontals.append(((y0 + y1) / 2, min(x0, x1), max(x0, x1)))
+            elif abs(x1 - x0) <= self.max_line_width and abs(y1 - y0) >= self.min_segment_length:
+                verticals.append(((x0 + x1) / 2, min(y0, y1), max(y0, y1)))
+        
+        # Raw tuples (get_cdrawings) - much cheaper than get_drawings' Point/Rect objects
+        for path in page.get_cdrawings():
+            stroked = "s" in path["type"] and self._is_visible(path.get("color"))
+            filled = "f" in path["type"] and self._is_visible(path.get("fill"))
+            if not stroked and not filled:
+                continue
+            
+            for item in path["items"]:
+                if item[0] == "l":
+                    (ax, ay), (bx, by) = item[1], item[2]
+                    add_line(ax, ay, bx, by)
+                    continue
+                if item[0] == "re":
+                    x0, y0, x1, y1 = item[1]
+                elif item[0] == "qu":
+                    xs, ys = [p[0] for p in item[1]], [p[1] for p in item[1]]
+                    x0, y0, x1, y1 = min(xs), min(ys), max(xs), max(ys)
+                else:
+                    continue
+                
+                width, height = abs(x1 - x0), abs(y1 - y0)
+                # Thin rectangle = one ruling line (through its middle)
+                if height <= self.max_line_width and width > height:
+                    add_line(x0, (y0 + y1) / 2, x1, (y0 + y1) / 2)
+                elif width <= self.max_line_width:
+                    add_line((x0 + x1) / 2, y0, (x0 + x1) / 2, y1)
+                elif stroked:
+                    # Outlined box: its four edges (plain fills are shading, not borders)
+                    add_line(x0, y0, x1, y0)
+                    add_line(x0, y1, x1, y1)
+                    add_line(x0, y0, x0, y1)
+                    add_line(x1, y0, x1, y1)
+        
+        return horizontals, verticals
+    
+    def _merge_segments(self, segments: List[Segment]) -> List[Segment]:
+        """Snap segments at (almost) the same position together and join overlapping/touching ones"""
+        merged = []
+        for group in self._group_by_position(segments):
+            position = sum(s[0] for s in group) / len(group)
+            group.sort(key=lambda s: s[1])
+            start, end = group[0][1], group[0][2]
+            for _, s_start, s_end in group[1:]:
+                if s_start <= end + self.snap_tolerance:
+                    end = max(end, s_end)
+                else:
+                    merged.append((position, start, end))
+                    start, end = s_start, s_end
+            merged.append((position, start, end))
+        return merged
+    
+    def _group_by_position(self, segments: List[Segment]) -> List[List[Segment]]:
+        groups = []
+        for segment in sorted(segments):
+            if groups and segment[0] - groups[-1][-1][0] <= self.snap_tolerance:
+                groups[-1].append(segment)
+            else:
+                groups.append([segment])
+        return groups
+    
+    def _connected_grids(self, horizontals: List[Segment], verticals: List[Segment]) -> List[Tuple[List[Segment], List[Segment]]]:
+        """Split the lines into sets that touch each other (one set per table)"""
+        parent = list(range(len(horizontals) + len(verticals)))
+        
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+        
+        tol = self.snap_tolerance
+        for hi, (y, hx0, hx1) in enumerate(horizontals):
+            for vi, (x, vy0, vy1) in enumerate(verticals):
+                if hx0 - tol <= x <= hx1 + tol and vy0 - tol <= y <= vy1 + tol:
+                    parent[find(hi)] = find(len(horizontals) + vi)
+        
+        components = {}
+        for hi, h in enumerate(horizontals):
+            components.setdefault(find(hi), ([], []))[0].append(h)
+        for vi, v in enumerate(verticals):
+            components.setdefault(find(len(horizontals) + vi), ([], []))[1].append(v)
+        return [(h, v) for h, v in components.values() if h and v]
+    
+    def _cluster(self, positions: List[float]) -> List[float]:
+        """Sorted positions with near-duplicates collapsed (keeps the outermost ends exact)"""
+        positions = sorted(positions)
+        clustered = [positions[0]]
+        for p in positions[1:]:
+            if p - clustered[-1] > self.snap_tolerance:
+                clustered.append(p)
+        if positions[-1] - clustered[-1] > 0:
+            clustered[-1] = positions[-1]
+        return clustered
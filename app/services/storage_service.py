@@ -0,0 +1,156 @@
+# app/services/storage_service.py
+import asyncio
+import re
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+import logging
+from app.handlers.file_handler import FileHandler
+from app.services.work_queue_service import WorkQueue
+
+logger = logging.getLogger(__name__)
+
+# Artifacts are named "<uuid>.pdf" / "<uuid>_table_1.csv" / ... - group them per job
+JOB_ID_RE = re.compile(r"^([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})", re.IGNORECASE)
+
+class StorageLifecycleService:
+    """
+    Evicts old job artifacts from the data directories.
+    A job's upload, extracted and translated files are evicted together:
+    first everything past the TTL, then oldest jobs until under the quota.
+    Only job files in shard directories (<dir>/<id[:2]>/<id>...) are managed; flat
+    files (checked-in samples, pre-sharding jobs) and jobs still running on the
+    work queue are never touched. Finished queue records past the TTL are purged.
+    """
+    
+    def __init__(
+        self,
+        directories: List[Path],
+        ttl_hours: Optional[float] = None,
+        quota_mb: Optional[float] = None,
+        min_age_seconds: float = 600,
+        work_queue: Optional[WorkQueue] = None
+    ):
+        self.directories = [Path(d) for d in directories]
+        self.ttl_seconds = ttl_hours * 3600 if ttl_hours else None
+        self.quota_bytes = int(quota_mb * 1024 * 1024) if quota_mb else None
+        # Never touch jobs written this recently (they may still be running)
+        self.min_age_seconds = min_age_seconds
+        # Distributed jobs keep reading their upload until the last page task finishes
+        self.work_queue = work_queue
+        self.last_report: Optional[Dict] = None
+        self.total_bytes_reclaimed = 0
+    
+    def scan(self) -> Dict[str, Dict]:
+        """Group files under all directories by job id: {job: {files, bytes, mtime}}"""
+        jobs = defaultdict(lambda: {"files": [], "bytes": 0, "mtime": 0.0})
+        for directory in self.directories:
+            if not directory.exists():
+                continue
+            for path in directory.glob("*/*"):
+                match = JOB_ID_RE.match(path.name)
+                if not match or path.parent.name != match.group(1)[:2].lower():
+                    continue
+                try:
+                    if not path.is_file():
+                        continue
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                job = jobs[match.group(1).lower()]
+                job["files"].append(path)
+                job["bytes"] += stat.st_size
+                job["mtime"] = max(job["mtime"], stat.st_mtime)
+        return dict(jobs)
+    
+    def sweep(self, now: Optional[float] = None) -> Dict:
+        """Evict expired jobs, then oldest jobs over quota; returns a report"""
+        start = time.perf_counter()
+        now = now if now is not None else time.time()
+        jobs = self.scan()
+        total_bytes = sum(j["bytes"] for j in jobs.values())
+        live = self.work_queue.active_jobs() if self.work_queue is not None else set()
+        
+        evictable = sorted(
+            (
+                item for item in jobs.items()
+                if item[0] not in live and now - item[1]["mtime"] >= self.min_age_seconds
+            ),
+            key=lambda item: item[1]["mtime"]
+        )
+        
+        evicted, files_deleted, reclaimed = [], 0, 0
+        for job_id, job in evictable:
+            expired = self.ttl_seconds is not None and now - job["mtime"] > self.ttl_seconds
+            over_quota = self.quota_bytes is not None and total_bytes - reclaimed > self.quota_bytes
+            if not (expired or over_quota):
+                # Oldest first: nothing newer can be expired, and quota is met
+                break
+            
+            for path in job["files"]:
+                FileHandler.delete_file(str(path))
+            evicted.append(job_id)
+            files_deleted += len(job["files"])
+            reclaimed += job["bytes"]
+        
+        self._remove_empty_shards()
+        self.total_bytes_reclaimed += reclaimed
+        
+        queue_jobs_purged = 0
+        if self.work_queue is not None:
+            # Records of evicted jobs point at deleted files; expired ones are just history
+            finished_before = now - self.ttl_seconds if self.ttl_seconds is not None else None
+            queue_jobs_purged = self.work_queue.purge_jobs(evicted, finished_before)
+        
+        report = {
+            "jobs_evicted": len(evicted),
+            "files_deleted": files_deleted,
+            "bytes_reclaimed": reclaimed,
+            "bytes_remaining": total_bytes - reclaimed,
+            "jobs_remaining": len(jobs) - len(evicted),
+            "queue_jobs_purged": queue_jobs_purged,
+            "duration_seconds": round(time.perf_counter() - start, 3),
+            "swept_at": now,
+        }
+        self.last_report = report
+        
+        if evicted:
+            logger.info(f"🧹 Storage sweep: evicted {len(evicted)} jobs, reclaimed {reclaimed / 1024 / 1024:.1f} MB")
+        return report
+    
+    def _remove_empty_shards(self):
+        """Drop shard directories left empty after eviction (skipping freshly created ones)"""
+        now = time.time()
+        for directory in self.directories:
+            if not directory.exists():
+                continue
+            for shard in directory.iterdir():
+                try:
+                    if (shard.is_dir() and not any(shard.iterdir())
+                            and now - shard.stat().st_mtime >= self.min_age_seconds):
+                        shard.rmdir()
+                except OSError:
+                    # A job wrote into it meanwhile
+                    continue
+    
+    def get_stats(self) -> Dict:
+        """Current usage plus the outcome of the last sweep"""
+        jobs = self.scan()
+        return {
+            "jobs": len(jobs),
+            "bytes_used": sum(j["bytes"] for j in jobs.values()),
+            "quota_bytes": self.quota_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "total_bytes_reclaimed": self.total_bytes_reclaimed,
+            "last_sweep": self.last_report,
+        }
+    
+    async def run_forever(self, interval_seconds: float):
+        """Background loop: sweep every interval without blocking the event loop"""
+        while True:
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                logger.error(f"❌ Storage sweep failed: {e}")
+            await asyncio.sleep(interval_seconds)
@@ -1,35 +1,226 @@
 # app/services/table_detection_service.py
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
 from collections import defaultdict
+import fitz
 from app.handlers.pdf_handler import PDFHandler
+from app.handlers.word_sources import get_word_source
 from app.models.table_models import TableConfig, BoundingBox
+from app.services.layout_cache_service import LayoutCacheService
+from app.services.page_triage_service import PageTriageService, LIKELY_TABLE
+from app.services.ruling_detection_service import RulingGridDetector
+from app.utils.cancellation import CancellationToken
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+# "heuristic": word-density regions/columns only
+# "ruling": tables from vector grid lines, heuristics for pages (and words) outside any grid
+DETECTION_MODES = ("heuristic", "ruling")
+
 class TableDetectionService:
     """Service for detecting tables in PDFs"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        word_backend: str = "pdfplumber",
+        layout_cache: Optional[LayoutCacheService] = None,
+        page_triage: Optional[PageTriageService] = None,
+        triage_force_all: bool = False,
+        detection_mode: str = "heuristic"
+    ):
+        if detection_mode not in DETECTION_MODES:
+            raise ValueError(f"Unknown detection mode '{detection_mode}' (expected one of: {', '.join(DETECTION_MODES)})")
         self.pdf_handler = PDFHandler()
+        self.word_source = get_word_source(word_backend)
+        self.layout_cache = layout_cache
+        self.page_triage = page_triage
+        # Audit mode: classify every page but still run the full pipeline on all of them
+        self.triage_force_all = triage_force_all
+        self.last_triage_report: Optional[Dict] = None
+        self.detection_mode = detection_mode
+        self.ruling_detector = RulingGridDetector() if detection_mode == "ruling" else None
     
-    def detect_all_tables(self, pdf_path: str) -> List[TableConfig]:
-        """Detect all tables in PDF"""
+    def detect_all_tables(
+        self,
+        pdf_path: str,
+        pages: Optional[List[int]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[TableConfig]:
+        """Detect all tables in PDF (optionally only the given 0-based pages)"""
         all_configs = []
-        page_count = self.pdf_handler.get_page_count(pdf_path)
-        
-        for page_num in range(page_count):
-            page_configs = self.detect_tables_on_page(pdf_path, page_num)
+        for _, _, page_configs in self.iter_page_configs(pdf_path, pages, cancel_token):
             all_configs.extend(page_configs)
-            logger.info(f"Page {page_num}: Detected {len(page_configs)} tables")
-        
         return all_configs
     
+    def iter_page_configs(
+        self,
+        pdf_path: str,
+        pages: Optional[List[int]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Iterator[Tuple[int, List[Dict], List[TableConfig]]]:
+        """Yield (page, words, configs) page by page, so callers can reuse the page's words"""
+        # Cheap pre-pass: only likely-table pages get the full pipeline
+        decisions = None
+        if self.page_triage:
+            decisions, triage_seconds = self.page_triage.triage(pdf_path, pages)
+            if not self.triage_force_all:
+                pages = [p for p, decision in decisions.items() if decision == LIKELY_TABLE]
+        
+        # One open document, each page released once its configs exist
+        processed_pages, audit_misses, grid_pages = [], [], 0
+        # This call's own layout cache outcomes (the cache's counters are process-wide)
+        layout_counts = defaultdict(int)
+        start = time.perf_counter()
+        consumer_seconds = 0.0
+        # Vector graphics come from a second (fitz) handle, kept open alongside the word source
+        drawings_doc = fitz.open(pdf_path) if self.ruling_detector else None
+        try:
+            for page_num, words, pdf_w, pdf_h in self.word_source.iter_pages(pdf_path, pages):
+                if cancel_token:
+                    # Stop before this page's detection and the next page's word extraction
+                    cancel_token.check("detect", pages=len(pages) - len(processed_pages) if pages is not None else 0)
+                if drawings_doc is not None:
+                    page_configs, from_grid = self._detect_ruled_page(
+                        drawings_doc[page_num], words, page_num, pdf_w, pdf_h, layout_counts
+                    )
+                    grid_pages += from_grid
+                else:
+                    page_configs = self._detect_page(words, page_num, pdf_w, pdf_h, layout_counts)
+                processed_pages.append(page_num)
+                if decisions and page_configs and decisions.get(page_num) != LIKELY_TABLE:
+                    audit_misses.append(page_num)
+                logger.info(f"Page {page_num}: Detected {len(page_configs)} tables")
+                
+                yield_start = time.perf_counter()
+                yield page_num, words, page_configs
+                consumer_seconds += time.perf_counter() - yield_start
+        finally:
+            if drawings_doc is not None:
+                drawings_doc.close()
+        # Word extraction counts towards the detection cost, time spent by the caller does not
+        detection_seconds = time.perf_counter() - start - consumer_seconds
+        
+        if decisions is not None:
+            self.last_triage_report = self.page_triage.build_report(
+                decisions, triage_seconds, processed_pages, detection_seconds,
+                forced=self.triage_force_all, audit_misses=audit_misses
+            )
+            report = self.last_triage_report
+            logger.info(f"Triage: {report['likely_table']} likely-table, {report['text_only']} text-only, "
+                        f"{report['empty']} empty; skipped {report['pages_skipped']} pages "
+                        f"(~{report['estimated_seconds_saved']:.2f}s saved)")
+            if audit_misses:
+                logger.warning(f"Triage audit: tables found on skipped-class pages {audit_misses}")
+        
+        if drawings_doc is not None:
+            logger.info(f"Ruling lines: {grid_pages}/{len(processed_pages)} pages detected from grids")
+        
+        if self.layout_cache and layout_counts["lookups"]:
+            logger.info(f"Layout cache: {layout_counts['hits']}/{layout_counts['lookups']} hits "
+                        f"({layout_counts['hits'] / layout_counts['lookups']:.0%}), "
+                        f"{layout_counts['rejected']} rejected")
+    
     def detect_tables_on_page(self, pdf_path: str, page_num: int) -> List[TableConfig]:
         """Detect tables on a specific page"""
-        words = self.pdf_handler.extract_words_from_page(pdf_path, page_num)
-        pdf_w, pdf_h = self.pdf_handler.get_page_dimensions(pdf_path, page_num)
+        return self.detect_all_tables(pdf_path, [page_num])
+    
+    def _detect_page(
+        self,
+        words: List[Dict],
+        page_num: int,
+        pdf_w: float,
+        pdf_h: float,
+        layout_counts: Optional[Dict[str, int]] = None
+    ) -> List[TableConfig]:
+        """Reuse configs of a known page layout when they verify, else detect from scratch"""
+        if not self.layout_cache or not words:
+            return self._detect_tables_from_words(words, page_num, pdf_w, pdf_h)
+        
+        layout_counts = layout_counts if layout_counts is not None else defaultdict(int)
+        layout_counts["lookups"] += 1
+        fingerprint = self.layout_cache.fingerprint(words, pdf_w, pdf_h)
+        cached = self.layout_cache.lookup(fingerprint)
+        if cached is not None:
+            if self._verify_configs(cached, words):
+                self.layout_cache.record_hit()
+                layout_counts["hits"] += 1
+                logger.info(f"Page {page_num}: layout cache hit")
+                return [c.model_copy(update={"page": page_num}, deep=True) for c in cached]
+            self.layout_cache.record_rejected()
+            layout_counts["rejected"] += 1
+            logger.info(f"Page {page_num}: cached layout failed verification")
+        
+        configs = self._detect_tables_from_words(words, page_num, pdf_w, pdf_h)
+        self.layout_cache.store(fingerprint, configs)
+        return configs
+    
+    def _detect_ruled_page(
+        self,
+        page,
+        words: List[Dict],
+        page_num: int,
+        pdf_w: float,
+        pdf_h: float,
+        layout_counts: Optional[Dict[str, int]] = None
+    ) -> Tuple[List[TableConfig], bool]:
+        """Tables from the page's ruling grids; the word heuristics only see what no grid covers"""
+        grids = [
+            g for g in self.ruling_detector.detect(page)
+            if any(self._is_in_region(w, g) for w in words)
+        ]
+        if not grids:
+            return self._detect_page(words, page_num, pdf_w, pdf_h, layout_counts), False
+        
+        configs = [
+            TableConfig(
+                page=page_num,
+                bbox=BoundingBox(x0=g["x0"], y0=g["y0"], x1=g["x1"], y1=g["y1"]),
+                columns=g["columns"],
+                img_width=pdf_w,
+                img_height=pdf_h
+            )
+            for g in grids
+        ]
+        logger.info(f"Page {page_num}: {len(grids)} ruled tables")
         
+        # Un-ruled tables next to the grids (their words only, so this pass stays small)
+        remaining = [w for w in words if not any(self._is_in_region(w, g) for g in grids)]
+        if remaining:
+            configs.extend(self._detect_tables_from_words(remaining, page_num, pdf_w, pdf_h))
+        
+        return sorted(configs, key=lambda c: (c.bbox.y0, c.bbox.x0)), True
+    
+    def _verify_configs(self, configs: List[TableConfig], words: List[Dict]) -> bool:
+        """
+        Cheap check that cached configs fit this page's words: every table still
+        has words, none fall outside its outer column bounds (they would be dropped
+        by extraction) and no word straddles an inner column boundary.
+        """
+        if not configs:
+            return False
+        for config in configs:
+            bbox = config.bbox
+            region_words = [
+                w for w in words
+                if w["x1"] > bbox.x0 and w["x0"] < bbox.x1 and w["bottom"] > bbox.y0 and w["top"] < bbox.y1
+            ]
+            if not region_words:
+                return False
+            
+            bounds = sorted(config.columns)
+            left, right = min(bounds[0], bbox.x0), max(bounds[-1], bbox.x1)
+            inner = [b for b in bounds if left < b < right]
+            for w in region_words:
+                x_center = (w["x0"] + w["x1"]) / 2
+                if not left <= x_center <= right:
+                    return False
+                if any(w["x0"] < b < w["x1"] for b in inner):
+                    return False
+        return True
+    
+    def _detect_tables_from_words(self, words: List[Dict], page_num: int, pdf_w: float, pdf_h: float) -> List[TableConfig]:
+        """Run region detection, splitting and column detection on one page's words"""
         # Step 1: Detect table regions
         table_regions = self._detect_table_regions(words, pdf_h)
         logger.info(f"Initial regions detected: {len(table_regions)}")
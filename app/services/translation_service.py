@@ -1,110 +1,380 @@
 # app/services/translation_service.py
 import pandas as pd
 from pathlib import Path
-from typing import List
+from functools import lru_cache
+from typing import Callable, Iterator, List, Dict, Optional, Set
 import time
 import logging
 from app.ml_models.translator_model import TranslatorModel
+from app.models.table_models import TableData
+from app.services.glossary_service import GlossaryService
+from app.utils.cancellation import CancellationToken, OperationCancelled
 from app.utils.normalizer import Normalizer
 
 logger = logging.getLogger(__name__)
 
+class DocumentTranslation:
+    """Translation map and cell counters shared by all tables of one document"""
+    
+    def __init__(self):
+        self.translation_map: Dict[str, str] = {}
+        self.tables = 0
+        self.cells_total = 0
+        self.cells_translatable = 0
+        self.glossary_resolved = 0
+        self.model_strings = 0
+    
+    def get_stats(self) -> Dict:
+        unique = len(self.translation_map)
+        return {
+            "tables": self.tables,
+            "cells_total": self.cells_total,
+            "cells_translatable": self.cells_translatable,
+            "unique_strings": unique,
+            "glossary_resolved": self.glossary_resolved,
+            "model_strings": self.model_strings,
+            # Translatable cells per unique string: how much the document-level pass saved
+            "dedupe_ratio": round(self.cells_translatable / unique, 2) if unique else 0.0,
+        }
+
 class TranslationService:
     """Service for translating extracted tables using batch processing"""
     
-    def __init__(self, translator_model: TranslatorModel):
+    def __init__(
+        self,
+        translator_model: TranslatorModel,
+        glossary: Optional[GlossaryService] = None,
+        stream_threshold_bytes: Optional[int] = None,
+        chunk_rows: int = 5000,
+        document_level: bool = True
+    ):
         self.translator = translator_model
+        self.glossary = glossary
         self.normalizer = Normalizer()
+        # CSVs larger than this are translated in row chunks (None = never)
+        self.stream_threshold_bytes = stream_threshold_bytes
+        self.chunk_rows = chunk_rows
+        # Collect unique strings across all tables of a document and translate them once
+        self.document_level = document_level
+        self.last_document_stats: Optional[Dict] = None
     
-    def translate_tables(self, csv_files: List[str], output_dir: str) -> List[str]:
-        """Translate all CSV files using efficient batch processing"""
+    def translate_tables(
+        self,
+        csv_files: List[str],
+        output_dir: str,
+        cancel_token: Optional[CancellationToken] = None,
+        document: Optional[DocumentTranslation] = None,
+        reload_glossary: bool = True
+    ) -> List[str]:
+        """
+        Translate all CSV files using efficient batch processing.
+        Pass the same `document` for successive batches of one document's CSVs to keep
+        deduplicating across them (strings seen earlier are not translated again).
+        """
         translated_files = []
         
-        for csv_path in csv_files:
+        # Pick up glossary edits between documents
+        if self.glossary and reload_glossary:
+            self.glossary.reload_if_changed()
+        
+        covered = set()
+        if self.document_level:
+            document = document or DocumentTranslation()
+            try:
+                covered = self._translate_document_strings(csv_files, document, cancel_token)
+            except OperationCancelled:
+                raise
+            except Exception as e:
+                # Not fatal: every table is retried (and reported) on its own below
+                logger.error(f"❌ Document-level translation failed, translating table by table: {e}")
+        else:
+            document = None
+        
+        for i, csv_path in enumerate(csv_files):
+            if cancel_token:
+                cancel_token.check("translate", tables=len(csv_files) - i)
             csv_path = Path(csv_path)
             logger.info(f"Processing {csv_path.name}...")
             
             try:
-                # Read CSV (no headers in your case)
-                df = pd.read_csv(csv_path, header=None)
-                
-                # Translate using batch processing
+                output_path = Path(output_dir) / f"{csv_path.stem}_translated.csv"
                 start_time = time.time()
-                translated_df = self._process_dataframe(df)
-                duration = time.time() - start_time
                 
-                # Save
-                output_path = Path(output_dir) / f"{csv_path.stem}_translated.csv"
-                translated_df.to_csv(output_path, index=False, header=False, encoding='utf-8-sig')
+                if csv_path in covered:
+                    # The document-wide map covers all its strings: re-read, normalize, apply
+                    df = self._normalize_dataframe(self._read_csv(csv_path))
+                    translated_df = self._apply_translation_map(df, document.translation_map)
+                    translated_df.to_csv(output_path, index=False, header=False, encoding='utf-8-sig')
+                elif self._is_large(csv_path):
+                    # Very large table: peak memory bounded by chunk size
+                    self._translate_csv_chunked(csv_path, output_path, cancel_token)
+                else:
+                    # Read CSV (no headers in your case)
+                    df = self._read_csv(csv_path)
+                    
+                    # Translate using batch processing
+                    translated_df = self._process_dataframe(df, cancel_token)
+                    
+                    # Save
+                    translated_df.to_csv(output_path, index=False, header=False, encoding='utf-8-sig')
+                
+                duration = time.time() - start_time
                 translated_files.append(str(output_path))
                 
                 logger.info(f"✅ Translated {csv_path.name} in {duration:.2f}s")
                 
+            except OperationCancelled:
+                raise
             except Exception as e:
                 logger.error(f"❌ Failed to translate {csv_path.name}: {e}")
                 import traceback
                 traceback.print_exc()
                 continue
         
+        if document:
+            self._finish_document(document)
         return translated_files
     
-    def _process_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _read_csv(self, csv_path: Path, **options):
+        """
+        Read a table CSV with every cell as text ("" for empty), so output never depends
+        on pandas type inference: 100 stays 100, not 100.0, whether or not the file is
+        large enough to be chunked
+        """
+        return pd.read_csv(csv_path, header=None, dtype=str, keep_default_na=False, encoding="utf-8-sig", **options)
+    
+    def _is_large(self, csv_path: Path) -> bool:
+        return self.stream_threshold_bytes is not None and csv_path.stat().st_size > self.stream_threshold_bytes
+    
+    def _translate_document_strings(
+        self,
+        csv_files: List[str],
+        document: DocumentTranslation,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Set[Path]:
+        """
+        Document-level pass: collect the unique strings of every table, then translate
+        their union in one go (full batches, repeated headers translated once). Only the
+        strings are kept, one table in memory at a time; returns the CSVs covered.
+        Large CSVs keep their own bounded-memory chunked pass.
+        """
+        covered, unique_strings = set(), set()
+        tables = cells_total = cells_translatable = 0
+        for csv_path in map(Path, csv_files):
+            try:
+                if self._is_large(csv_path):
+                    continue
+                df = self._normalize_dataframe(self._read_csv(csv_path))
+            except Exception as e:
+                # Retried (and reported) per file by translate_tables
+                logger.warning(f"Document pass skipped {csv_path.name}: {e}")
+                continue
+            
+            cells = self._collect_translatable(df)
+            tables += 1
+            cells_total += df.size
+            cells_translatable += len(cells)
+            unique_strings.update(cells)
+            covered.add(csv_path)
+        
+        new_strings = unique_strings - document.translation_map.keys()
+        if new_strings:
+            document.translation_map.update(self._translate_unique(new_strings, document, cancel_token))
+        # Counted only once translated, so a failed pass leaves the stats untouched
+        document.tables += tables
+        document.cells_total += cells_total
+        document.cells_translatable += cells_translatable
+        return covered
+    
+    def _finish_document(self, document: DocumentTranslation):
+        self.last_document_stats = document.get_stats()
+        stats = self.last_document_stats
+        logger.info(f"📖 Document: {stats['cells_translatable']} translatable cells in {stats['tables']} tables, "
+                    f"{stats['unique_strings']} unique ({stats['glossary_resolved']} glossary, "
+                    f"{stats['model_strings']} model)")
+    
+    def _process_dataframe(self, df: pd.DataFrame, cancel_token: Optional[CancellationToken] = None) -> pd.DataFrame:
         """
         OPTIMIZED batch processing pipeline:
         1. Normalize numerals/punctuation FIRST
         2. Collect UNIQUE Arabic text strings (skip pure numbers)
-        3. Batch translate ALL at once
+        3. Resolve known terms from the glossary, batch translate the REST at once
         4. Apply translation map back to DataFrame
         """
         
         # Step 1: Normalize entire DataFrame (convert Persian/Arabic numerals)
         logger.info("Step 1: Normalizing text...")
-        
-        def normalize_cell(x):
-            if isinstance(x, str):
-                return self.normalizer.clean_text(x)
-            return x
-        
-        # Apply to all cells (this converts ۱۲۳ → 123)
-        df_normalized = df.applymap(normalize_cell)
+        df_normalized = self._normalize_dataframe(df)
         
         # Step 2: Collect UNIQUE Arabic strings (skip numbers!)
         logger.info("Step 2: Collecting unique Arabic strings...")
-        unique_strings = set()
-        
-        def collect_if_arabic(x):
-            """Only collect cells with actual Arabic LETTERS (not just numbers)"""
-            if isinstance(x, str) and x.strip():
-                # Must have Arabic letters AND not be pure numeric
-                if self.normalizer.has_arabic_letters(x) and not self.normalizer.is_numeric_only(x):
-                    unique_strings.add(x)
-        
-        # Scan entire DataFrame
-        df_normalized.applymap(collect_if_arabic)
+        unique_strings = set(self._collect_translatable(df_normalized))
         
         # Step 3: Batch translate all unique strings
-        unique_list = list(unique_strings)
-        logger.info(f"Step 3: Translating {len(unique_list)} unique Arabic strings...")
-        
-        if not unique_list:
-            logger.warning("No Arabic text found to translate!")
+        translation_map = self._translate_unique(unique_strings, cancel_token=cancel_token)
+        if not translation_map:
             return df_normalized
         
-        translated_list = self.translator.translate_batch(unique_list, batch_size=32)
-        translation_map = dict(zip(unique_list, translated_list))
-        
         # Debug: Show sample translations
         for i, (orig, trans) in enumerate(list(translation_map.items())[:5]):
             logger.debug(f"  '{orig}' → '{trans}'")
         
         # Step 4: Apply translation map to DataFrame
         logger.info("Step 4: Applying translations...")
+        return self._apply_translation_map(df_normalized, translation_map)
+    
+    def _normalize_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+        def normalize_cell(x):
+            if isinstance(x, str):
+                return self.normalizer.clean_text(x)
+            return x
         
+        # Apply to all cells (this converts ۱۲۳ → 123)
+        return df.applymap(normalize_cell)
+    
+    def _collect_translatable(self, df: pd.DataFrame) -> List[str]:
+        """Cells with actual Arabic LETTERS (not just numbers), repeats included"""
+        return [x for x in df.to_numpy().ravel() if isinstance(x, str) and x.strip() and self._is_translatable(x)]
+    
+    @staticmethod
+    def _apply_translation_map(df: pd.DataFrame, translation_map: Dict[str, str]) -> pd.DataFrame:
         def apply_translation(x):
             if isinstance(x, str) and x in translation_map:
                 return translation_map[x]
             return x
         
-        df_translated = df_normalized.applymap(apply_translation)
+        return df.applymap(apply_translation)
+    
+    def _translate_csv_chunked(self, csv_path: Path, output_path: Path, cancel_token: Optional[CancellationToken] = None):
+        """
+        Streaming version of _process_dataframe, two passes over row chunks:
+        1. Normalize and collect unique Arabic strings across all chunks
+        2. Translate them in batches (glossary first)
+        3. Re-read, normalize and map each chunk, appending it to the output
+        Cells are read as text (_read_csv), like the unchunked paths.
+        """
+        # Financial tables repeat cells a lot; a bounded memo avoids normalizing them twice
+        clean = lru_cache(maxsize=65536)(self.normalizer.clean_text)
+        
+        unique_strings = set()
+        for rows in self._iter_csv_chunks(csv_path, clean):
+            if cancel_token:
+                cancel_token.check("translate")
+            chunk_cells = {c for row in rows for c in row} - unique_strings
+            unique_strings.update(c for c in chunk_cells if self._is_translatable(c))
+        
+        translation_map = self._translate_unique(unique_strings, cancel_token=cancel_token)
+        
+        # BOM once at the top, like to_csv(encoding='utf-8-sig'); renamed only when complete
+        partial_path = output_path.with_name(output_path.name + ".part")
+        with open(partial_path, "w", encoding="utf-8-sig", newline="") as f:
+            for rows in self._iter_csv_chunks(csv_path, clean):
+                if cancel_token:
+                    cancel_token.check("translate")
+                translated_rows = [[translation_map.get(c, c) for c in row] for row in rows]
+                pd.DataFrame(translated_rows).to_csv(f, index=False, header=False)
+        partial_path.replace(output_path)
+    
+    def _iter_csv_chunks(self, csv_path: Path, clean: Callable[[str], str]) -> Iterator[List[List[str]]]:
+        """Normalized rows of a CSV, chunk_rows at a time"""
+        with self._read_csv(csv_path, chunksize=self.chunk_rows) as reader:
+            for chunk in reader:
+                yield [[clean(c) for c in row] for row in chunk.itertuples(index=False, name=None)]
+    
+    def _is_translatable(self, text: str) -> bool:
+        """Has Arabic letters and is not just a number"""
+        return bool(text) and self.normalizer.has_arabic_letters(text) and not self.normalizer.is_numeric_only(text)
+    
+    def translate_table_data(
+        self,
+        tables: List[TableData],
+        reload_glossary: bool = True,
+        document: Optional[DocumentTranslation] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[TableData]:
+        """
+        Translate in-memory tables (same pipeline as CSVs, without the disk round-trip).
+        Pass the same `document` for successive batches of one document to keep
+        deduplicating across them (strings seen earlier are not translated again).
+        """
+        if self.glossary and reload_glossary:
+            self.glossary.reload_if_changed()
+        
+        if self.document_level:
+            document = document or DocumentTranslation()
+            start_time = time.time()
+            row_sets = self._translate_document_rows([table.rows for table in tables], document, cancel_token)
+            self._finish_document(document)
+            logger.info(f"✅ Translated {len(tables)} tables in {time.time() - start_time:.2f}s")
+            return [table.model_copy(update={"rows": rows}) for table, rows in zip(tables, row_sets)]
+        
+        translated = []
+        for i, table in enumerate(tables):
+            if cancel_token:
+                cancel_token.check("translate", tables=len(tables) - i)
+            start_time = time.time()
+            rows = self._process_rows(table.rows, cancel_token)
+            translated.append(table.model_copy(update={"rows": rows}))
+            logger.info(f"✅ Translated {table.table_id} in {time.time() - start_time:.2f}s")
+        
+        return translated
+    
+    def _process_rows(self, rows: List[List[str]], cancel_token: Optional[CancellationToken] = None) -> List[List[str]]:
+        """Row-list version of _process_dataframe: normalize, collect unique, translate, apply"""
+        normalized = [[self.normalizer.clean_text(c) for c in row] for row in rows]
+        
+        unique_strings = {c for row in normalized for c in row if self._is_translatable(c)}
+        translation_map = self._translate_unique(unique_strings, cancel_token=cancel_token)
+        
+        return [[translation_map.get(c, c) for c in row] for row in normalized]
+    
+    def _translate_document_rows(
+        self,
+        row_sets: List[List[List[str]]],
+        document: DocumentTranslation,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[List[List[str]]]:
+        """Row-list version of the document pass: normalize all, translate new unique strings once, apply"""
+        normalized = [[[self.normalizer.clean_text(c) for c in row] for row in rows] for rows in row_sets]
+        cells = [c for rows in normalized for row in rows for c in row if self._is_translatable(c)]
+        
+        document.tables += len(row_sets)
+        document.cells_total += sum(len(row) for rows in normalized for row in rows)
+        document.cells_translatable += len(cells)
+        
+        new_strings = set(cells) - document.translation_map.keys()
+        if new_strings:
+            document.translation_map.update(self._translate_unique(new_strings, document, cancel_token))
+        
+        translation_map = document.translation_map
+        return [[[translation_map.get(c, c) for c in row] for row in rows] for rows in normalized]
+    
+    def _translate_unique(
+        self,
+        unique_strings,
+        document: Optional[DocumentTranslation] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Dict[str, str]:
+        """Resolve unique strings from the glossary, batch translate the rest"""
+        unique_list = list(unique_strings)
+        logger.info(f"Step 3: Translating {len(unique_list)} unique Arabic strings...")
+        
+        if not unique_list:
+            logger.warning("No Arabic text found to translate!")
+            return {}
+        
+        # Glossary hits bypass the model entirely
+        translation_map = self.glossary.resolve(unique_list) if self.glossary else {}
+        model_list = [s for s in unique_list if s not in translation_map]
+        if translation_map:
+            logger.info(f"  Glossary resolved {len(translation_map)}/{len(unique_list)} strings")
+        
+        glossary_resolved = len(translation_map)
+        if model_list:
+            translated_list = self.translator.translate_batch(model_list, batch_size=32, cancel_token=cancel_token)
+            translation_map.update(zip(model_list, translated_list))
         
-        return df_translated
+        if document:
+            document.glossary_resolved += glossary_resolved
+            document.model_strings += len(model_list)
+        return translation_map
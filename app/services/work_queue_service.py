@@ -0,0 +1,301 @@
+# app/services/work_queue_service.py
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Task states
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+# Job state while its finished pages are being merged (claimed by exactly one caller)
+MERGING = "merging"
+
+class WorkQueue(ABC):
+    """
+    Durable task queue shared by the coordinator and page workers.
+    Tasks are leased on claim; a lease that runs out (crashed worker) makes the task
+    claimable again, and failed tasks are retried until max_attempts.
+    """
+    
+    @abstractmethod
+    def create_job(self, job_id: str, pdf_path: str, options: Dict, tasks: List[Dict]):
+        """Register a document job together with its initial tasks"""
+    
+    @abstractmethod
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """Job record (pdf_path, options, status, result) or None"""
+    
+    @abstractmethod
+    def finish_job(self, job_id: str, status: str, result: Optional[Dict] = None):
+        """Store the merged document result"""
+    
+    @abstractmethod
+    def claim_merge(self, job_id: str) -> bool:
+        """Atomically move a running job to MERGING; True for exactly one caller"""
+    
+    @abstractmethod
+    def active_jobs(self) -> Set[str]:
+        """Ids of jobs that are still running or merging (their files are in use)"""
+    
+    @abstractmethod
+    def purge_jobs(self, job_ids: Iterable[str] = (), finished_before: Optional[float] = None) -> int:
+        """Delete finished jobs (listed, or finished before the cutoff) with their tasks; returns jobs deleted"""
+    
+    @abstractmethod
+    def claim(self, worker_id: str, kinds: Optional[List[str]] = None) -> Optional[Dict]:
+        """Lease the oldest runnable task, or None if there is nothing to do"""
+    
+    @abstractmethod
+    def complete(self, task: Dict, result: Dict, next_tasks: Optional[List[Dict]] = None) -> bool:
+        """Mark a claimed task done and enqueue its follow-up tasks atomically (False if the lease was lost)"""
+    
+    @abstractmethod
+    def fail(self, task: Dict, error: str):
+        """Record a failure; the task is retried until it runs out of attempts"""
+    
+    @abstractmethod
+    def list_tasks(self, job_id: str) -> List[Dict]:
+        """All tasks of a job (with results), ordered by id"""
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    WorkQueue on a single SQLite file. Works locally and for several nodes sharing
+    a filesystem (one connection per thread, writes serialized by SQLite).
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            pdf_path TEXT NOT NULL,
+            options TEXT NOT NULL,
+            status TEXT NOT NULL,
+            result TEXT,
+            created_at REAL NOT NULL,
+            finished_at REAL
+        );
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            page INTEGER NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            available_at REAL NOT NULL,
+            lease_until REAL,
+            worker TEXT,
+            error TEXT,
+            result TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_runnable ON tasks (status, available_at);
+        CREATE INDEX IF NOT EXISTS idx_tasks_job ON tasks (job_id);
+    """
+    
+    def __init__(
+        self,
+        db_path: str,
+        lease_seconds: float = 600,
+        max_attempts: int = 3,
+        retry_backoff_seconds: float = 5
+    ):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self._local = threading.local()
+        
+        self._connect().executescript(self.SCHEMA)
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+    
+    # === Jobs ===
+    
+    def create_job(self, job_id: str, pdf_path: str, options: Dict, tasks: List[Dict]):
+        conn = self._connect()
+        now = time.time()
+        # One transaction, so a job is never observed without its tasks
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO jobs (job_id, pdf_path, options, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, pdf_path, json.dumps(options), RUNNING, now)
+            )
+            self._insert_tasks(conn, tasks, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        row = self._connect().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["options"] = json.loads(job["options"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+    
+    def finish_job(self, job_id: str, status: str, result: Optional[Dict] = None):
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, result = ?, finished_at = ? WHERE job_id = ?",
+            (status, json.dumps(result) if result is not None else None, time.time(), job_id)
+        )
+    
+    def claim_merge(self, job_id: str) -> bool:
+        return self._connect().execute(
+            "UPDATE jobs SET status = ? WHERE job_id = ? AND status = ?", (MERGING, job_id, RUNNING)
+        ).rowcount == 1
+    
+    def active_jobs(self) -> Set[str]:
+        rows = self._connect().execute(
+            "SELECT job_id FROM jobs WHERE status IN (?, ?)", (RUNNING, MERGING)
+        ).fetchall()
+        return {row["job_id"] for row in rows}
+    
+    def purge_jobs(self, job_ids: Iterable[str] = (), finished_before: Optional[float] = None) -> int:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            doomed = set()
+            if finished_before is not None:
+                doomed.update(row["job_id"] for row in conn.execute(
+                    "SELECT job_id FROM jobs WHERE status IN (?, ?) AND finished_at < ?", (DONE, FAILED, finished_before)
+                ))
+            for job_id in job_ids:
+                row = conn.execute("SELECT status FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+                # A running/merging job's tasks are still being worked on
+                if row is not None and row["status"] in (DONE, FAILED):
+                    doomed.add(job_id)
+            conn.executemany("DELETE FROM tasks WHERE job_id = ?", [(j,) for j in doomed])
+            conn.executemany("DELETE FROM jobs WHERE job_id = ?", [(j,) for j in doomed])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(doomed)
+    
+    # === Tasks ===
+    
+    def claim(self, worker_id: str, kinds: Optional[List[str]] = None) -> Optional[Dict]:
+        conn = self._connect()
+        now = time.time()
+        kind_filter, params = "", [PENDING, now, RUNNING, now]
+        if kinds:
+            kind_filter = f" AND kind IN ({', '.join('?' * len(kinds))})"
+            params += list(kinds)
+        
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers never lease the same row
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT * FROM tasks WHERE ((status = ? AND available_at <= ?) OR (status = ? AND lease_until < ?))"
+                f"{kind_filter} ORDER BY id LIMIT 1",
+                params
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            
+            if row["status"] == RUNNING:
+                logger.warning(f"Task {row['id']} lease expired (worker {row['worker']}), reclaiming")
+            conn.execute(
+                "UPDATE tasks SET status = ?, attempts = attempts + 1, lease_until = ?, worker = ? WHERE id = ?",
+                (RUNNING, now + self.lease_seconds, worker_id, row["id"])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        
+        task = dict(row)
+        task["attempts"] += 1
+        task["worker"] = worker_id
+        task["payload"] = json.loads(task["payload"])
+        return task
+    
+    def complete(self, task: Dict, result: Dict, next_tasks: Optional[List[Dict]] = None) -> bool:
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Only the current lease holder may complete (a reclaimed task must not fan out twice)
+            updated = conn.execute(
+                "UPDATE tasks SET status = ?, result = ?, lease_until = NULL, error = NULL "
+                "WHERE id = ? AND status = ? AND worker = ? AND attempts = ?",
+                (DONE, json.dumps(result), task["id"], RUNNING, task["worker"], task["attempts"])
+            ).rowcount
+            if not updated:
+                conn.execute("COMMIT")
+                logger.warning(f"Task {task['id']} lease lost before completion, result discarded")
+                return False
+            self._insert_tasks(conn, next_tasks or [], now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return True
+    
+    def fail(self, task: Dict, error: str):
+        attempts = task["attempts"]
+        exhausted = attempts >= self.max_attempts
+        # Back off linearly so a flaky dependency gets time to recover
+        retry_at = time.time() + self.retry_backoff_seconds * attempts
+        
+        # Conditional on still holding the lease; otherwise whoever holds it now decides
+        updated = self._connect().execute(
+            "UPDATE tasks SET status = ?, error = ?, lease_until = NULL, available_at = ? "
+            "WHERE id = ? AND status = ? AND worker = ? AND attempts = ?",
+            (FAILED if exhausted else PENDING, error, retry_at, task["id"], RUNNING, task["worker"], attempts)
+        ).rowcount
+        if not updated:
+            return
+        
+        if exhausted:
+            logger.error(f"❌ Task {task['id']} failed permanently after {attempts} attempts: {error}")
+        else:
+            logger.warning(f"Task {task['id']} failed (attempt {attempts}/{self.max_attempts}), will retry: {error}")
+    
+    @staticmethod
+    def _insert_tasks(conn: sqlite3.Connection, tasks: List[Dict], now: float):
+        conn.executemany(
+            "INSERT INTO tasks (job_id, kind, page, payload, status, available_at) VALUES (?, ?, ?, ?, ?, ?)",
+            [(t["job_id"], t["kind"], t["page"], json.dumps(t["payload"]), PENDING, now) for t in tasks]
+        )
+    
+    def list_tasks(self, job_id: str) -> List[Dict]:
+        rows = self._connect().execute("SELECT * FROM tasks WHERE job_id = ? ORDER BY id", (job_id,)).fetchall()
+        tasks = []
+        for row in rows:
+            task = dict(row)
+            task["payload"] = json.loads(task["payload"])
+            task["result"] = json.loads(task["result"]) if task["result"] else None
+            tasks.append(task)
+        return tasks
+
+# Available queue backends
+WORK_QUEUES = {
+    "sqlite": SQLiteWorkQueue,
+}
+
+def get_work_queue(backend: str, path: str, **options) -> WorkQueue:
+    """Instantiate a queue backend by name"""
+    if backend.lower() not in WORK_QUEUES:
+        raise ValueError(f"Unknown queue backend '{backend}' (expected one of: {', '.join(WORK_QUEUES)})")
+    return WORK_QUEUES[backend.lower()](path, **options)
@@ -0,0 +1,108 @@
+# app/tools/backend_parity.py
+"""
+Parity harness for word-extraction backends.
+
+Runs detection + extraction over a PDF corpus with two backends and diffs the
+detected TableConfigs and extracted cells. Exits non-zero on any mismatch.
+
+    python -m app.tools.backend_parity [corpus_dir_or_pdf ...] [--tolerance 3.0]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List, Dict
+
+from app.core.config import settings
+from app.models.table_models import TableConfig
+from app.services.table_detection_service import TableDetectionService
+from app.services.pdf_extraction_service import PDFExtractionService
+
+def _collect_pdfs(paths: List[str]) -> List[Path]:
+    pdfs = []
+    for p in map(Path, paths):
+        pdfs.extend(sorted(p.glob("*.pdf")) if p.is_dir() else [p])
+    return pdfs
+
+def _run_backend(pdf_path: Path, backend: str) -> Dict:
+    start = time.perf_counter()
+    configs = TableDetectionService(word_backend=backend).detect_all_tables(str(pdf_path))
+    tables = list(PDFExtractionService(word_backend=backend).iter_table_data(str(pdf_path), configs))
+    return {"configs": configs, "tables": tables, "seconds": time.perf_counter() - start}
+
+def _diff_configs(ref: List[TableConfig], cand: List[TableConfig], tolerance: float) -> List[str]:
+    if len(ref) != len(cand):
+        return [f"table count {len(ref)} != {len(cand)}"]
+    
+    issues = []
+    for i, (a, b) in enumerate(zip(ref, cand), 1):
+        if a.page != b.page:
+            issues.append(f"table {i}: page {a.page} != {b.page}")
+        edges = [(k, getattr(a.bbox, k), getattr(b.bbox, k)) for k in ("x0", "y0", "x1", "y1")]
+        for k, va, vb in edges:
+            if abs(va - vb) > tolerance:
+                issues.append(f"table {i}: bbox.{k} {va:.1f} != {vb:.1f}")
+        if len(a.columns) != len(b.columns):
+            issues.append(f"table {i}: {len(a.columns) - 1} columns != {len(b.columns) - 1}")
+        elif any(abs(ca - cb) > tolerance for ca, cb in zip(a.columns, b.columns)):
+            issues.append(f"table {i}: column boundaries differ beyond {tolerance}pt")
+    return issues
+
+def _diff_cells(ref, cand) -> List[str]:
+    issues = []
+    ref_by_id = {t.table_id: t for t in ref}
+    cand_by_id = {t.table_id: t for t in cand}
+    
+    for table_id in sorted(set(ref_by_id) | set(cand_by_id)):
+        a, b = ref_by_id.get(table_id), cand_by_id.get(table_id)
+        if a is None or b is None:
+            issues.append(f"{table_id}: only in {'candidate' if a is None else 'reference'}")
+            continue
+        if len(a.rows) != len(b.rows):
+            issues.append(f"{table_id}: {len(a.rows)} rows != {len(b.rows)}")
+            continue
+        cell_diffs = sum(
+            1
+            for ra, rb in zip(a.rows, b.rows)
+            for ca, cb in zip(ra + [""] * (len(rb) - len(ra)), rb + [""] * (len(ra) - len(rb)))
+            if ca != cb
+        )
+        if cell_diffs:
+            issues.append(f"{table_id}: {cell_diffs} cells differ")
+    return issues
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Diff table detection/extraction between word backends")
+    parser.add_argument("paths", nargs="*", default=[str(settings.UPLOAD_DIR)], help="PDF files or directories")
+    parser.add_argument("--reference", default="pdfplumber")
+    parser.add_argument("--candidate", default="pymupdf")
+    parser.add_argument("--tolerance", type=float, default=3.0, help="Max bbox/column drift in points")
+    args = parser.parse_args(argv)
+    
+    report = {"reference": args.reference, "candidate": args.candidate, "documents": []}
+    failures = 0
+    
+    for pdf_path in _collect_pdfs(args.paths):
+        ref = _run_backend(pdf_path, args.reference)
+        cand = _run_backend(pdf_path, args.candidate)
+        
+        issues = _diff_configs(ref["configs"], cand["configs"], args.tolerance)
+        issues += _diff_cells(ref["tables"], cand["tables"])
+        failures += bool(issues)
+        
+        report["documents"].append({
+            "pdf": pdf_path.name,
+            "tables": len(ref["configs"]),
+            "reference_seconds": round(ref["seconds"], 3),
+            "candidate_seconds": round(cand["seconds"], 3),
+            "match": not issues,
+            "issues": issues,
+        })
+    
+    report["mismatched_documents"] = failures
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+# app/tools/load_test.py
+"""
+Async load generator for the extraction endpoint.
+
+Drives /api/v1/extraction/extract-and-translate either in-process (ASGI, no server)
+or against a running uvicorn, and prints latency percentiles, error rate,
+throughput and per-stage time as JSON.
+
+    python -m app.tools.load_test data/uploads --requests 200 --concurrency 1,4,8 --stub-translator
+    python -m app.tools.load_test a.pdf:3 b.pdf:1 --url http://127.0.0.1:8000 --rate 2 --requests 100
+
+PDF arguments take an optional ":weight" for the request mix. With --rate, arrivals
+are open-loop (Poisson) and latency is measured from the scheduled arrival time, so
+queueing behind a saturated server shows up in the percentiles.
+"""
+import argparse
+import asyncio
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import httpx
+except ImportError:
+    raise SystemExit("httpx is required for the load test (pip install -r requirements.txt)")
+
+from app.core.config import settings
+
+ENDPOINT = "/api/v1/extraction/extract-and-translate"
+STAGES = ["detect", "extract", "translate", "total"]
+
+def _collect_mix(specs: List[str]) -> List[Tuple[Path, float]]:
+    """'path[:weight]' arguments -> [(pdf, weight)] (directories expand to all PDFs)"""
+    mix = []
+    for spec in specs:
+        path, sep, weight = spec.rpartition(":")
+        if not sep or not weight.replace(".", "", 1).isdigit():
+            path, weight = spec, "1"
+        path = Path(path)
+        pdfs = sorted(path.rglob("*.pdf")) if path.is_dir() else [path]
+        mix.extend((pdf, float(weight)) for pdf in pdfs)
+    return mix
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+    
+    def pct(p: float) -> float:
+        # Nearest-rank percentile
+        return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered) + 0.5)) - 1))]
+    
+    return {
+        "min": round(ordered[0], 2),
+        "p50": round(pct(50), 2),
+        "p90": round(pct(90), 2),
+        "p99": round(pct(99), 2),
+        "max": round(ordered[-1], 2),
+        "mean": round(sum(ordered) / len(ordered), 2),
+    }
+
+def _build_client(url: Optional[str], timeout: float) -> httpx.AsyncClient:
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=timeout)
+    
+    from app.main import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://in-process", timeout=timeout)
+
+async def _run_level(
+    client: httpx.AsyncClient,
+    mix: List[Tuple[Path, float]],
+    payloads: Dict[Path, bytes],
+    requests: int,
+    concurrency: int,
+    rate: Optional[float],
+    params: Dict[str, str],
+    rng: random.Random
+) -> Dict:
+    """Send `requests` requests with at most `concurrency` in flight"""
+    pdfs, weights = zip(*mix)
+    schedule = rng.choices(pdfs, weights=weights, k=requests)
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    latencies_ms, stage_ms = [], defaultdict(list)
+    per_pdf = defaultdict(list)
+    statuses, errors = Counter(), Counter()
+    
+    async def one(pdf: Path, arrival: Optional[float]):
+        async with semaphore:
+            # Closed loop: the clock starts when a slot frees up
+            arrival = arrival if arrival is not None else time.perf_counter()
+            try:
+                response = await client.post(
+                    ENDPOINT,
+                    params=params,
+                    files={"file": (pdf.name, payloads[pdf], "application/pdf")}
+                )
+                statuses[str(response.status_code)] += 1
+                ok = response.status_code == 200
+                if ok:
+                    for stage, seconds in (response.json().get("timings") or {}).items():
+                        stage_ms[stage].append(seconds * 1000)
+                else:
+                    errors[f"HTTP {response.status_code}"] += 1
+            except Exception as e:
+                statuses["exception"] += 1
+                errors[type(e).__name__] += 1
+                ok = False
+            
+            elapsed = (time.perf_counter() - arrival) * 1000
+            if ok:
+                latencies_ms.append(elapsed)
+                per_pdf[pdf.name].append(elapsed)
+    
+    start = time.perf_counter()
+    tasks = []
+    arrival = start
+    for pdf in schedule:
+        if rate:
+            # Open loop: next arrival regardless of how the server is doing
+            arrival += rng.expovariate(rate)
+            await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
+            tasks.append(asyncio.create_task(one(pdf, arrival)))
+        else:
+            tasks.append(asyncio.create_task(one(pdf, None)))
+    await asyncio.gather(*tasks)
+    duration = time.perf_counter() - start
+    
+    failed = sum(errors.values())
+    return {
+        "concurrency": concurrency,
+        "rate": rate,
+        "requests": requests,
+        "duration_seconds": round(duration, 3),
+        "throughput_rps": round((requests - failed) / duration, 3) if duration else 0.0,
+        "error_rate": round(failed / requests, 4) if requests else 0.0,
+        "status_codes": dict(statuses),
+        "errors": dict(errors),
+        "latency_ms": _percentiles(latencies_ms),
+        "stage_ms": {stage: _percentiles(stage_ms[stage]) for stage in STAGES if stage_ms[stage]},
+        "per_pdf_latency_ms": {name: _percentiles(values) for name, values in sorted(per_pdf.items())},
+    }
+
+async def run_load_test(args) -> Dict:
+    mix = _collect_mix(args.pdfs)
+    if not mix:
+        raise SystemExit("No PDFs found")
+    payloads = {pdf: pdf.read_bytes() for pdf, _ in mix}
+    params = {k: v for k, v in (("pages", args.pages), ("output_format", args.output_format)) if v}
+    rng = random.Random(args.seed)
+    
+    levels = []
+    async with _build_client(args.url, args.timeout) as client:
+        if args.warmup:
+            await _run_level(client, mix, payloads, args.warmup, 1, None, params, rng)
+        for concurrency in args.concurrency:
+            level = await _run_level(client, mix, payloads, args.requests, concurrency, args.rate, params, rng)
+            levels.append(level)
+            print(f"concurrency={concurrency}: {level['throughput_rps']} req/s, "
+                  f"p50={level['latency_ms'].get('p50')}ms p99={level['latency_ms'].get('p99')}ms, "
+                  f"errors={level['error_rate']:.1%}", file=sys.stderr)
+    
+    best = max(levels, key=lambda level: level["throughput_rps"])
+    return {
+        "target": args.url or "in-process",
+        "endpoint": ENDPOINT,
+        "translator": "stub" if args.stub_translator else settings.TRANSLATOR_BACKEND,
+        "pdfs": {pdf.name: weight for pdf, weight in mix},
+        "params": params,
+        "levels": levels,
+        "saturation": {"concurrency": best["concurrency"], "throughput_rps": best["throughput_rps"]},
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the extraction endpoint")
+    parser.add_argument("pdfs", nargs="*", default=[str(settings.UPLOAD_DIR)], help="PDFs or directories, optional ':weight'")
+    parser.add_argument("--url", default=None, help="Base URL of a running server (default: in-process ASGI)")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per concurrency level")
+    parser.add_argument("--concurrency", default="1,4", help="Comma-separated in-flight limits to sweep")
+    parser.add_argument("--rate", type=float, default=None, help="Open-loop arrival rate (req/s); default closed loop")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured requests before the first level")
+    parser.add_argument("--pages", default=None, help="Page selection passed to the endpoint")
+    parser.add_argument("--output-format", default=None)
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stub-translator", action="store_true", help="In-process only: no model weights needed")
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0, help="Stub translator delay per string")
+    parser.add_argument("--keep-files", action="store_true", help="In-process only: keep written outputs")
+    parser.add_argument("--output", default=None, help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+    args.concurrency = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    
+    workdir = None
+    if not args.url:
+        if args.stub_translator:
+            settings.TRANSLATOR_BACKEND = "stub"
+            settings.TRANSLATOR_STUB_LATENCY_PER_STRING_MS = args.stub_latency_ms
+        if not args.keep_files:
+            # Keep load-test artifacts out of the real data directories
+            workdir = Path(tempfile.mkdtemp(prefix="loadtest-"))
+            settings.UPLOAD_DIR = workdir / "uploads"
+            settings.EXTRACTED_DIR = workdir / "extracted"
+            settings.TRANSLATED_DIR = workdir / "translated"
+    elif args.stub_translator:
+        parser.error("--stub-translator applies to in-process runs; start the server with TRANSLATOR_BACKEND=stub")
+    
+    try:
+        report = asyncio.run(run_load_test(args))
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        print(output)
+    return 1 if any(level["error_rate"] for level in report["levels"]) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
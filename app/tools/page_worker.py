@@ -0,0 +1,61 @@
+# app/tools/page_worker.py
+"""
+Page-task worker for distributed processing.
+
+Start any number of these on any node that can reach the queue database and the
+upload directory (e.g. a shared volume); each pulls detect/extract/translate tasks.
+
+    python -m app.tools.page_worker [--stages detect,extract] [--idle-exit]
+    python -m app.tools.page_worker --submit statement.pdf --pages 1-200 --wait
+"""
+import argparse
+import json
+import logging
+import sys
+import uuid
+
+from app.core.dependencies import get_distributed_coordinator, get_page_worker
+from app.handlers.pdf_handler import PDFHandler
+from app.services.distributed_pipeline_service import STAGES
+from app.utils.page_range import parse_page_range
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run a page-task worker, or submit a PDF to the queue")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma-separated stages this worker runs")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--idle-exit", action="store_true", help="Exit once the queue is empty")
+    parser.add_argument("--max-tasks", type=int, default=None)
+    parser.add_argument("--submit", metavar="PDF", help="Queue this PDF instead of working")
+    parser.add_argument("--pages", default=None, help="1-based page selection for --submit")
+    parser.add_argument("--output-format", default="csv")
+    parser.add_argument("--wait", action="store_true", help="With --submit: block and print the merged result")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    
+    if args.submit:
+        coordinator = get_distributed_coordinator()
+        pages = parse_page_range(args.pages, PDFHandler.get_page_count(args.submit))
+        status = coordinator.submit(args.submit, str(uuid.uuid4()), pages, args.output_format)
+        if args.wait:
+            status = coordinator.wait(status["file_id"], poll_interval=args.poll_interval)
+        print(json.dumps(status, indent=2, ensure_ascii=False))
+        return 1 if status["status"] == "failed" else 0
+    
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    
+    worker = get_page_worker(stages)
+    logging.getLogger(__name__).info(f"Worker {worker.worker_id} running stages {stages}")
+    try:
+        handled = worker.run(args.poll_interval, stop_when_idle=args.idle_exit, max_tasks=args.max_tasks)
+    except KeyboardInterrupt:
+        handled = worker.tasks_done + worker.tasks_failed
+    print(json.dumps({"worker": worker.worker_id, "handled": handled,
+                      "done": worker.tasks_done, "failed": worker.tasks_failed}))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+# app/tools/retranslate.py
+"""
+Re-run only the translation stage for documents already in the artifact store.
+
+Useful after a glossary or translation-model change: extraction results are read
+back from the store, so no PDF parsing happens and unchanged cells are not retranslated.
+
+    ARTIFACT_STORE_ENABLED=true python -m app.tools.retranslate            # every stored job
+    ARTIFACT_STORE_ENABLED=true python -m app.tools.retranslate <file_id> ...
+"""
+import argparse
+import json
+import logging
+import sys
+
+from app.core.config import settings
+from app.core.dependencies import get_artifact_store, get_pipeline_service
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Retranslate stored jobs from their cached extractions")
+    parser.add_argument("file_ids", nargs="*", help="Jobs to retranslate (default: all stored jobs)")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    
+    if not settings.ARTIFACT_STORE_ENABLED:
+        parser.error("the artifact store is disabled (set ARTIFACT_STORE_ENABLED=true)")
+    
+    store = get_artifact_store()
+    file_ids = args.file_ids or sorted(store.iter_keys("jobs"))
+    pipeline = get_pipeline_service()
+    
+    results, errors = [], []
+    for file_id in file_ids:
+        try:
+            results.append(pipeline.retranslate(file_id))
+        except KeyError as e:
+            errors.append({"file_id": file_id, "error": str(e)})
+    
+    print(json.dumps({
+        "jobs": len(file_ids),
+        "changed": sum(1 for r in results if r["changed"]),
+        "results": results,
+        "errors": errors,
+        "store": store.get_stats(),
+    }, indent=2, ensure_ascii=False))
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
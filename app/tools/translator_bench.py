@@ -0,0 +1,140 @@
+# app/tools/translator_bench.py
+"""
+Translation throughput vs. number of model replicas.
+
+Pulls the translatable cell strings out of a PDF corpus (detection + extraction +
+normalization), then translates the same uncached strings with 1 in-process model
+and with TranslatorPools of K replicas, and prints strings/sec and speedup as JSON.
+
+    python -m app.tools.translator_bench data/uploads --replicas 1,2,4,8
+    python -m app.tools.translator_bench --backend stub --stub-latency-ms 5 --min-strings 2000
+
+Replica load time is reported separately and not counted in strings/sec.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from app.core.config import settings
+from app.ml_models.translator_pool import TranslatorPool
+from app.services.table_detection_service import TableDetectionService
+from app.services.pdf_extraction_service import PDFExtractionService
+from app.utils.normalizer import Normalizer
+
+def _collect_strings(paths: List[str], min_strings: int) -> List[str]:
+    """Unique translatable cell strings of the corpus, repeated with a counter up to min_strings"""
+    detection, extraction, normalizer = TableDetectionService(), PDFExtractionService(), Normalizer()
+    strings = {}
+    for path in map(Path, paths):
+        for pdf in sorted(path.rglob("*.pdf")) if path.is_dir() else [path]:
+            configs = detection.detect_all_tables(str(pdf))
+            for table in extraction.iter_table_data(str(pdf), configs):
+                for cell in (c for row in table.rows for c in row):
+                    text = normalizer.clean_text(cell)
+                    if text and normalizer.has_arabic_letters(text) and not normalizer.is_numeric_only(text):
+                        strings[text] = None
+    
+    base = list(strings)
+    if not base:
+        raise SystemExit("No translatable strings found")
+    # Distinct strings so neither the model cache nor dedupe hides any work
+    padded, n = list(base), 0
+    while len(padded) < min_strings:
+        padded.append(f"{base[n % len(base)]} {n // len(base) + 1}")
+        n += 1
+    return padded
+
+def _build_translator(replicas: int, args):
+    stub_options = {"latency_per_string_ms": args.stub_latency_ms}
+    if replicas > 1:
+        return TranslatorPool(
+            settings.TRANSLATION_MODEL,
+            replicas=replicas,
+            threads_per_replica=args.threads_per_replica,
+            shard_tokens=args.shard_tokens,
+            max_segment_tokens=settings.TRANSLATION_MAX_SEGMENT_TOKENS,
+            backend=args.backend,
+            replica_options=stub_options if args.backend == "stub" else None
+        )
+    if args.backend == "stub":
+        from app.ml_models.stub_translator import StubTranslatorModel
+        return StubTranslatorModel(**stub_options)
+    
+    import torch
+    from app.ml_models.translator_model import TranslatorModel
+    if args.threads_per_replica:
+        torch.set_num_threads(args.threads_per_replica)
+    return TranslatorModel(settings.TRANSLATION_MODEL, max_segment_tokens=settings.TRANSLATION_MAX_SEGMENT_TOKENS)
+
+def _run_level(replicas: int, texts: List[str], args) -> Dict:
+    start = time.perf_counter()
+    translator = _build_translator(replicas, args)
+    load_seconds = time.perf_counter() - start
+    
+    try:
+        # In-process model is a singleton: start every level from a cold cache
+        getattr(translator, "cache", {}).clear()
+        start = time.perf_counter()
+        translated = translator.translate_batch(texts, batch_size=args.batch_size)
+        seconds = time.perf_counter() - start
+    finally:
+        if hasattr(translator, "close"):
+            translator.close()
+    
+    return {
+        "replicas": replicas,
+        "core_slices": getattr(translator, "core_slices", None),
+        "load_seconds": round(load_seconds, 3),
+        "seconds": round(seconds, 3),
+        "strings_per_second": round(len(texts) / seconds, 1) if seconds else 0.0,
+        "translated": len(translated),
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark translation throughput across model replicas")
+    parser.add_argument("pdfs", nargs="*", default=[str(settings.UPLOAD_DIR)], help="PDFs or directories")
+    parser.add_argument("--replicas", default="1,2,4", help="Comma-separated replica counts to sweep")
+    parser.add_argument("--backend", default=settings.TRANSLATOR_BACKEND, choices=["marian", "stub"])
+    parser.add_argument("--threads-per-replica", type=int, default=None, help="Default: cores / replicas")
+    parser.add_argument("--shard-tokens", type=int, default=settings.TRANSLATOR_SHARD_TOKENS)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--min-strings", type=int, default=0, help="Pad the corpus strings up to this many")
+    parser.add_argument("--stub-latency-ms", type=float, default=1.0, help="Stub translator delay per string")
+    parser.add_argument("--output", default=None, help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+    
+    texts = _collect_strings(args.pdfs, args.min_strings)
+    levels = []
+    for replicas in (int(r) for r in args.replicas.split(",") if r.strip()):
+        level = _run_level(replicas, texts, args)
+        levels.append(level)
+        print(f"replicas={replicas}: {level['strings_per_second']} strings/s "
+              f"({level['seconds']}s, load {level['load_seconds']}s)", file=sys.stderr)
+    
+    baseline = levels[0]["strings_per_second"] if levels else 0.0
+    for level in levels:
+        level["speedup"] = round(level["strings_per_second"] / baseline, 2) if baseline else 0.0
+    
+    report = {
+        "backend": args.backend,
+        "model": settings.TRANSLATION_MODEL if args.backend != "stub" else "stub",
+        "cores": len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count(),
+        "strings": len(texts),
+        "batch_size": args.batch_size,
+        "shard_tokens": args.shard_tokens,
+        "levels": levels,
+    }
+    
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        print(output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
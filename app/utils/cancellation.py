@@ -0,0 +1,82 @@
+# app/utils/cancellation.py
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+# Why a token was cancelled
+CLIENT_DISCONNECTED = "client_disconnected"
+DEADLINE_EXCEEDED = "deadline_exceeded"
+
+class OperationCancelled(Exception):
+    """Raised at a checkpoint once the request's token is cancelled or past its deadline"""
+    
+    def __init__(self, reason: str, stage: str, abandoned: Optional[Dict[str, int]] = None):
+        super().__init__(f"{stage} cancelled: {reason}")
+        self.reason = reason
+        self.stage = stage
+        # Work units skipped at the checkpoint, e.g. {"pages": 40}
+        self.abandoned = abandoned or {}
+
+class CancellationToken:
+    """
+    Shared by a request and the pipeline threads working for it. Long loops call
+    check() between pages/tables/batches, so abandoned work stops within one unit.
+    """
+    
+    def __init__(self, timeout_seconds: Optional[float] = None):
+        self.deadline = time.monotonic() + timeout_seconds if timeout_seconds else None
+        self._reason: Optional[str] = None
+        self._event = threading.Event()
+    
+    def cancel(self, reason: str = CLIENT_DISCONNECTED):
+        if not self._event.is_set():
+            self._reason = reason
+            self._event.set()
+    
+    @property
+    def reason(self) -> Optional[str]:
+        if not self._event.is_set() and self.deadline is not None and time.monotonic() > self.deadline:
+            self.cancel(DEADLINE_EXCEEDED)
+        return self._reason
+    
+    @property
+    def cancelled(self) -> bool:
+        return self.reason is not None
+    
+    def check(self, stage: str, **abandoned: int):
+        """Raise OperationCancelled if the work is no longer wanted"""
+        reason = self.reason
+        if reason is not None:
+            raise OperationCancelled(reason, stage, {k: v for k, v in abandoned.items() if v})
+
+class CancellationMetrics:
+    """Counts of cancelled requests and the work they skipped"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.cancelled = 0
+        self.by_reason: Dict[str, int] = defaultdict(int)
+        self.by_stage: Dict[str, int] = defaultdict(int)
+        self.abandoned: Dict[str, int] = defaultdict(int)
+        self.seconds_run = 0.0
+    
+    def record(self, error: OperationCancelled, seconds_run: float = 0.0):
+        with self._lock:
+            self.cancelled += 1
+            self.by_reason[error.reason] += 1
+            self.by_stage[error.stage] += 1
+            for unit, count in error.abandoned.items():
+                self.abandoned[unit] += count
+            self.seconds_run += seconds_run
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "cancelled": self.cancelled,
+                "by_reason": dict(self.by_reason),
+                "by_stage": dict(self.by_stage),
+                "abandoned": dict(self.abandoned),
+                # Time spent on requests before they were cancelled (work nobody received)
+                "seconds_run": round(self.seconds_run, 3),
+            }
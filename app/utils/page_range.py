@@ -0,0 +1,39 @@
+# app/utils/page_range.py
+from typing import List, Optional
+
+def parse_page_range(spec: Optional[str], page_count: int) -> List[int]:
+    """
+    Parse a 1-based page selection like "1-5,8,10-" into sorted 0-based page numbers.
+    Empty/None selects every page. Raises ValueError on malformed or out-of-range input.
+    """
+    if spec is None or not spec.strip():
+        return list(range(page_count))
+    
+    selected = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        
+        try:
+            if "-" in part:
+                start_s, end_s = part.split("-", 1)
+                start = int(start_s) if start_s.strip() else 1
+                end = int(end_s) if end_s.strip() else page_count
+            else:
+                start = end = int(part)
+        except ValueError:
+            raise ValueError(f"Invalid page range '{part}'")
+        
+        if start < 1 or end < start:
+            raise ValueError(f"Invalid page range '{part}'")
+        if start > page_count:
+            raise ValueError(f"Page {start} out of range (document has {page_count} pages)")
+        
+        # Clamp open-ended/overlong ranges to the document
+        selected.update(range(start - 1, min(end, page_count)))
+    
+    if not selected:
+        raise ValueError(f"Page selection '{spec}' is empty")
+    
+    return sorted(selected)
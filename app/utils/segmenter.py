@@ -0,0 +1,48 @@
+# app/utils/segmenter.py
+import re
+from typing import Callable, List
+
+# Sentence ends, then clause breaks (Arabic and ASCII); "." and "," between digits are numbers
+SENTENCE_RE = re.compile(r"(?<=[.!?؟\n])(?<!\d\.)\s*|(?<=\d\.)(?!\d)\s*")
+CLAUSE_RE = re.compile(r"(?<=[;؛،:])\s*|(?<=,)(?!\d)\s*|(?<=[^\d],)\s*")
+
+def _split(text: str, pattern: re.Pattern) -> List[str]:
+    return [piece.strip() for piece in pattern.split(text) if piece.strip()]
+
+def _pack(pieces: List[str], counts: List[int], max_tokens: int) -> List[str]:
+    """Greedily merge neighbouring pieces while they fit (keeps some context per segment)"""
+    packed, current, current_count = [], [], 0
+    for piece, count in zip(pieces, counts):
+        if current and current_count + count > max_tokens:
+            packed.append(" ".join(current))
+            current, current_count = [], 0
+        current.append(piece)
+        current_count += count
+    if current:
+        packed.append(" ".join(current))
+    return packed
+
+def segment_text(text: str, max_tokens: int, count_tokens: Callable[[str], int]) -> List[str]:
+    """
+    Split text into segments of at most max_tokens: by sentence first, then by
+    clause, then by runs of words. Short text comes back as a single segment.
+    """
+    if count_tokens(text) <= max_tokens:
+        return [text]
+    
+    for level, pattern in enumerate((SENTENCE_RE, CLAUSE_RE)):
+        pieces = _split(text, pattern)
+        if len(pieces) > 1:
+            segments, counts = [], []
+            for piece in pieces:
+                # Pieces that are still too long go down a level
+                for segment in segment_text(piece, max_tokens, count_tokens) if count_tokens(piece) > max_tokens else [piece]:
+                    segments.append(segment)
+                    counts.append(count_tokens(segment))
+            return _pack(segments, counts, max_tokens)
+    
+    # No punctuation left: fall back to word runs
+    words = text.split()
+    if len(words) <= 1:
+        return [text]
+    return _pack(words, [count_tokens(w) for w in words], max_tokens)
@@ -0,0 +1,147 @@
+# tests/test_artifact_store.py
+import logging
+from pathlib import Path
+
+import fitz
+import pytest
+
+from app.services.artifact_store_service import ArtifactStore
+
+FIXTURE = Path(__file__).resolve().parent.parent / "data" / "uploads" / "334bf948-9682-4a55-bf3a-272c38e5ae2b.pdf"
+FILE_ID = "00000000-0000-0000-0000-000000000001"
+
+def test_get_counts_hits_and_misses(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    store.put("words", "ab12", [["x"], 600, 800])
+    
+    assert store.get("words", "ab12") == [["x"], 600, 800]
+    assert store.get("words", "cd34") is None
+    stats = store.get_stats()
+    assert (stats["hits"], stats["misses"], stats["writes"]) == (1, 1, 1)
+
+def test_unreadable_artifact_is_a_miss(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    store.put("words", "ab12", [1])
+    store._path("words", "ab12").write_bytes(b"not gzip")
+    
+    assert store.get("words", "ab12") is None
+
+def test_evicts_least_recently_used(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    store.put("words", "aa", ["x" * 10])
+    size = store.get_stats()["bytes_used"]
+    store.max_bytes = 2 * size
+    store.put("words", "bb", ["x" * 10])
+    store.get("words", "aa")
+    store.put("words", "cc", ["x" * 10])
+    
+    assert store.has("words", "aa") and store.has("words", "cc")
+    assert not store.has("words", "bb")
+    assert store.get_stats()["evictions"] == 1
+
+def test_manifests_and_extractions_are_never_evicted(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    store.max_bytes = 1
+    store.put("jobs", "job", {"extract_key": "ee"})
+    store.put("extract", "ee", [])
+    store.put("words", "aa", [1])
+    store.put("words", "bb", [2])
+    
+    assert store.has("jobs", "job") and store.has("extract", "ee")
+    assert not store.has("words", "aa")
+    
+    # Also after a restart
+    reloaded = ArtifactStore(str(tmp_path), max_size_mb=1e-6)
+    reloaded.put("words", "cc", [3])
+    assert reloaded.has("jobs", "job") and reloaded.has("extract", "ee")
+    assert reloaded.get_stats()["pinned_artifacts"] == 2
+
+# === Pipeline with the store ===
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    """The fixture page plus a generated table of bare numbers"""
+    if not FIXTURE.exists():
+        pytest.skip("fixture PDF missing")
+    doc = fitz.open(str(FIXTURE))
+    page = doc.new_page()
+    for row, values in enumerate([("100", "7", "1.50"), ("0012", "35", "2"), ("8", "9", "10.0"), ("4", "5", "6")]):
+        for col, value in enumerate(values):
+            page.insert_text((72 + col * 150, 100 + row * 18), value)
+    path = tmp_path / "doc.pdf"
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+@pytest.fixture
+def make_pipeline(tmp_path):
+    pytest.importorskip("transformers")
+    from app.ml_models.stub_translator import StubTranslatorModel
+    from app.services.extraction_pipeline_service import ExtractionPipelineService
+    from app.services.glossary_service import GlossaryService
+    from app.services.pdf_extraction_service import PDFExtractionService
+    from app.services.table_detection_service import TableDetectionService
+    from app.services.translation_service import TranslationService
+    
+    glossary_path = tmp_path / "glossary.csv"
+    glossary_path.write_text("arabic,english\n", encoding="utf-8")
+    
+    def make(name, store=None, **options):
+        return ExtractionPipelineService(
+            TableDetectionService(),
+            PDFExtractionService(),
+            TranslationService(StubTranslatorModel(), GlossaryService(glossary_path)),
+            extracted_dir=str(tmp_path / name / "extracted"),
+            translated_dir=str(tmp_path / name / "translated"),
+            artifact_store=store,
+            **options
+        )
+    make.glossary_path = glossary_path
+    return make
+
+def output_files(root: Path):
+    return {path.name: path.read_bytes() for path in sorted(root.rglob(f"{FILE_ID}*"))}
+
+def test_stored_csvs_match_the_plain_path(pdf_path, tmp_path, make_pipeline):
+    make_pipeline("plain").run(pdf_path, FILE_ID)
+    make_pipeline("stored", ArtifactStore(str(tmp_path / "store"))).run(pdf_path, FILE_ID)
+    
+    plain = output_files(tmp_path / "plain")
+    assert len(plain) == 6
+    assert output_files(tmp_path / "stored") == plain
+
+def test_rerun_reuses_stages_until_their_version_changes(pdf_path, tmp_path, make_pipeline):
+    store = ArtifactStore(str(tmp_path / "store"))
+    make_pipeline("first", store).run(pdf_path, FILE_ID)
+    writes = store.get_stats()["writes"]
+    
+    make_pipeline("second", store).run(pdf_path, FILE_ID)
+    # Only the job manifest is rewritten
+    assert store.get_stats()["writes"] == writes + 1
+    
+    # A glossary edit changes the translate stage's version, not the others'
+    make_pipeline.glossary_path.write_text("arabic,english\nالإيرادات,Revenue\n", encoding="utf-8")
+    make_pipeline("third", store).run(pdf_path, FILE_ID)
+    assert store.get_stats()["writes"] == writes + 3
+
+def test_retranslate_after_eviction(pdf_path, tmp_path, make_pipeline):
+    store = ArtifactStore(str(tmp_path / "store"))
+    store.max_bytes = 1
+    pipeline = make_pipeline("job", store)
+    pipeline.run(pdf_path, FILE_ID)
+    
+    unchanged = pipeline.retranslate(FILE_ID)
+    assert unchanged["changed"] is False and unchanged["tables"] >= 2
+    
+    make_pipeline.glossary_path.write_text("arabic,english\nالإيرادات,Revenue\n", encoding="utf-8")
+    changed = make_pipeline("job", store).retranslate(FILE_ID)
+    assert changed["changed"] is True
+    assert changed["translated_files"]
+    
+    with pytest.raises(KeyError):
+        pipeline.retranslate("unknown")
+
+def test_store_with_overlap_is_logged(tmp_path, make_pipeline, caplog):
+    with caplog.at_level(logging.WARNING):
+        make_pipeline("both", ArtifactStore(str(tmp_path / "store")), overlap_stages=True)
+    assert "overlapped stages are disabled" in caplog.text
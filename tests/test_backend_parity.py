@@ -0,0 +1,44 @@
+# tests/test_backend_parity.py
+from pathlib import Path
+
+import fitz
+import pytest
+
+from app.handlers.word_sources import get_word_source
+from app.tools.backend_parity import main
+
+FIXTURE = Path(__file__).resolve().parent.parent / "data" / "uploads" / "334bf948-9682-4a55-bf3a-272c38e5ae2b.pdf"
+
+@pytest.fixture
+def generated_pdf(tmp_path):
+    """Two pages of column-aligned Latin text"""
+    doc = fitz.open()
+    for page_no in range(2):
+        page = doc.new_page()
+        for row in range(8):
+            for col, x in enumerate((72, 220, 360)):
+                page.insert_text((x, 100 + row * 18), f"r{row}c{col} p{page_no} {row * 7 + col}.50")
+    path = tmp_path / "generated.pdf"
+    doc.save(str(path))
+    doc.close()
+    return path
+
+def tokens(backend: str, pdf_path: Path):
+    return [
+        (page_num, [w["text"] for w in words])
+        for page_num, words, _, _ in get_word_source(backend).iter_pages(str(pdf_path))
+    ]
+
+@pytest.mark.parametrize("pdf", ["fixture", "generated"])
+def test_word_sources_produce_the_same_tokens(pdf, generated_pdf):
+    path = FIXTURE if pdf == "fixture" else generated_pdf
+    if not path.exists():
+        pytest.skip("fixture PDF missing")
+    
+    assert tokens("pymupdf", path) == tokens("pdfplumber", path)
+
+def test_parity_harness_reports_no_mismatch(generated_pdf, capsys):
+    paths = [str(generated_pdf)] + ([str(FIXTURE)] if FIXTURE.exists() else [])
+    
+    assert main(paths) == 0
+    assert '"mismatched_documents": 0' in capsys.readouterr().out
@@ -0,0 +1,118 @@
+# tests/test_cancellation.py
+import time
+
+import fitz
+import pytest
+
+from app.handlers.file_handler import FileHandler
+from app.utils.cancellation import (
+    CancellationMetrics, CancellationToken, OperationCancelled, CLIENT_DISCONNECTED, DEADLINE_EXCEEDED
+)
+
+def test_check_raises_once_cancelled():
+    token = CancellationToken()
+    token.check("detect", pages=3)
+    
+    token.cancel()
+    token.cancel(DEADLINE_EXCEEDED)
+    with pytest.raises(OperationCancelled) as error:
+        token.check("detect", pages=3, tables=0)
+    
+    # First reason wins; zero counts are not reported as abandoned
+    assert error.value.reason == CLIENT_DISCONNECTED
+    assert error.value.stage == "detect"
+    assert error.value.abandoned == {"pages": 3}
+
+def test_deadline_cancels_the_token():
+    token = CancellationToken(timeout_seconds=0.05)
+    assert not token.cancelled
+    
+    time.sleep(0.1)
+    assert token.reason == DEADLINE_EXCEEDED
+    with pytest.raises(OperationCancelled):
+        token.check("translate")
+
+def test_metrics_add_up_cancellations():
+    metrics = CancellationMetrics()
+    metrics.record(OperationCancelled(CLIENT_DISCONNECTED, "detect", {"pages": 4}), 1.0)
+    metrics.record(OperationCancelled(DEADLINE_EXCEEDED, "translate", {"pages": 1, "tables": 2}), 0.5)
+    
+    assert metrics.get_stats() == {
+        "cancelled": 2,
+        "by_reason": {CLIENT_DISCONNECTED: 1, DEADLINE_EXCEEDED: 1},
+        "by_stage": {"detect": 1, "translate": 1},
+        "abandoned": {"pages": 5, "tables": 2},
+        "seconds_run": 1.5,
+    }
+
+# === Endpoint ===
+
+class FakePipeline:
+    """Writes a partial output, then fails the way `mode` says"""
+    
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.jobs = []
+    
+    def run(self, pdf_path, file_id, pages, output_format, cancel_token):
+        from app.core.config import settings
+        
+        self.jobs.append((pdf_path, file_id))
+        for base_dir in (settings.EXTRACTED_DIR, settings.TRANSLATED_DIR):
+            (FileHandler.shard_dir(base_dir, file_id) / f"{file_id}_table_1.csv").write_text("0\n")
+        if self.mode == "disconnect":
+            raise OperationCancelled(CLIENT_DISCONNECTED, "extract", {"tables": 2})
+        # Work page by page until the request's deadline
+        while True:
+            cancel_token.check("detect", pages=5)
+            time.sleep(0.01)
+
+@pytest.fixture
+def pdf_bytes():
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "page")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+@pytest.fixture
+def make_client(tmp_path, monkeypatch):
+    pytest.importorskip("transformers")
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.controllers import extraction_controller
+    from app.core.config import settings
+    from app.core.dependencies import get_cancellation_metrics, get_pipeline_service
+    
+    for name in ("UPLOAD_DIR", "EXTRACTED_DIR", "TRANSLATED_DIR"):
+        monkeypatch.setattr(settings, name, tmp_path / name.lower())
+    
+    def make(pipeline, metrics):
+        app = FastAPI()
+        app.include_router(extraction_controller.router)
+        app.dependency_overrides[get_pipeline_service] = lambda: pipeline
+        app.dependency_overrides[get_cancellation_metrics] = lambda: metrics
+        return TestClient(app)
+    return make
+
+@pytest.mark.parametrize("mode, query, status, reason", [
+    ("disconnect", "", 499, CLIENT_DISCONNECTED),
+    ("deadline", "?timeout=0.05", 504, DEADLINE_EXCEEDED),
+])
+def test_cancelled_request_is_mapped_and_cleaned_up(tmp_path, make_client, pdf_bytes, mode, query, status, reason):
+    pipeline, metrics = FakePipeline(mode), CancellationMetrics()
+    client = make_client(pipeline, metrics)
+    
+    response = client.post(
+        f"/api/v1/extraction/extract-and-translate{query}",
+        files={"file": ("doc.pdf", pdf_bytes, "application/pdf")}
+    )
+    
+    assert response.status_code == status
+    assert metrics.get_stats()["by_reason"] == {reason: 1}
+    # Upload and partial outputs of the abandoned job are gone
+    [(_, file_id)] = pipeline.jobs
+    assert not list(tmp_path.rglob(f"{file_id}*"))
+    
+    stats = client.get("/api/v1/extraction/cancellations").json()
+    assert stats["cancelled"] == 1
@@ -0,0 +1,128 @@
+# tests/test_downloads.py
+import gzip
+import io
+import uuid
+import zipfile
+
+import pytest
+
+from app.handlers.file_handler import FileHandler
+from app.services.download_service import DownloadService
+
+FILE_ID = str(uuid.UUID(int=7))
+CSV = ("البند,2023\n" + "الإيرادات,100\n" * 200).encode("utf-8-sig")
+
+@pytest.fixture
+def download_service(tmp_path):
+    extracted, translated = tmp_path / "extracted", tmp_path / "translated"
+    (FileHandler.shard_dir(extracted, FILE_ID) / f"{FILE_ID}_table_1.csv").write_bytes(CSV)
+    (FileHandler.shard_dir(translated, FILE_ID) / f"{FILE_ID}_table_1_translated.csv").write_bytes(CSV)
+    # Pre-sharding flat layout is still found
+    (extracted / f"{FILE_ID}_table_2.csv").write_bytes(b"a,b\n")
+    return DownloadService(str(extracted), str(translated))
+
+@pytest.fixture
+def client(download_service):
+    pytest.importorskip("transformers")
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.controllers import download_controller
+    from app.core.dependencies import get_download_service
+    
+    app = FastAPI()
+    app.include_router(download_controller.router)
+    app.dependency_overrides[get_download_service] = lambda: download_service
+    return TestClient(app)
+
+def url(path=""):
+    return f"/api/v1/extraction/{FILE_ID}{path}"
+
+def test_list_job_files_across_layouts(download_service):
+    names = [p.name for p in download_service.list_job_files(FILE_ID, "extracted")]
+    
+    assert names == [f"{FILE_ID}_table_1.csv", f"{FILE_ID}_table_2.csv"]
+    with pytest.raises(ValueError):
+        download_service.list_job_files("../etc", "extracted")
+    with pytest.raises(ValueError):
+        download_service.list_job_files(FILE_ID, "other")
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, None),
+    ("gzip", "gzip"),
+    ("gzip, zstd", "zstd"),
+    ("zstd;q=0.1, gzip;q=0.9", "gzip"),
+    ("gzip;q=0, br", None),
+    ("identity", None),
+])
+def test_negotiate_encoding(tmp_path, accept, expected):
+    if expected == "zstd":
+        pytest.importorskip("zstandard")
+    
+    assert DownloadService.negotiate_encoding(accept, tmp_path / "t.csv") == expected
+
+def test_already_compressed_formats_are_sent_as_is(tmp_path):
+    assert DownloadService.negotiate_encoding("gzip", tmp_path / "t.parquet") is None
+    assert DownloadService.negotiate_encoding("gzip", tmp_path / "t.xlsx") is None
+
+def test_is_not_modified():
+    headers = {"if-none-match": 'W/"abc", "def"'}
+    
+    assert DownloadService.is_not_modified(headers, '"abc"', 0)
+    assert not DownloadService.is_not_modified(headers, '"xyz"', 0)
+    assert DownloadService.is_not_modified({"if-modified-since": DownloadService.http_date(1000)}, '"x"', 1000.5)
+    assert not DownloadService.is_not_modified({"if-modified-since": DownloadService.http_date(1000)}, '"x"', 1001)
+
+def test_file_download_media_type_and_revalidation(client):
+    response = client.get(url(f"/files/extracted/{FILE_ID}_table_1.csv"), headers={"Accept-Encoding": "identity"})
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert response.content == CSV
+    
+    etag = response.headers["etag"]
+    assert client.get(url(f"/files/extracted/{FILE_ID}_table_1.csv"),
+                      headers={"Accept-Encoding": "identity", "If-None-Match": etag}).status_code == 304
+    again = client.get(url(f"/files/extracted/{FILE_ID}_table_1.csv"),
+                       headers={"Accept-Encoding": "identity", "If-Modified-Since": response.headers["last-modified"]})
+    assert again.status_code == 304
+
+def test_file_download_is_compressed_on_request(client):
+    response = client.get(url(f"/files/translated/{FILE_ID}_table_1_translated.csv"),
+                          headers={"Accept-Encoding": "gzip"})
+    
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"].endswith('-gzip"')
+    # httpx decodes gzip transparently
+    assert response.content == CSV
+    assert len(gzip.compress(CSV)) < len(CSV)
+
+def test_zstd_download_round_trips(client):
+    zstandard = pytest.importorskip("zstandard")
+    
+    with client.stream("GET", url(f"/files/extracted/{FILE_ID}_table_1.csv"), headers={"Accept-Encoding": "zstd"}) as response:
+        raw = b"".join(response.iter_raw())
+    
+    assert response.headers["content-encoding"] == "zstd"
+    assert zstandard.ZstdDecompressor().decompressobj().decompress(raw) == CSV
+
+def test_bundle_streams_a_zip_and_revalidates(client):
+    response = client.get(url("/bundle"))
+    
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+        assert sorted(zf.namelist()) == [
+            f"extracted/{FILE_ID}_table_1.csv",
+            f"extracted/{FILE_ID}_table_2.csv",
+            f"translated/{FILE_ID}_table_1_translated.csv",
+        ]
+        assert zf.read(f"translated/{FILE_ID}_table_1_translated.csv") == CSV
+    
+    assert client.get(url("/bundle"), headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+    only_translated = client.get(url("/bundle?stage=translated"))
+    assert zipfile.ZipFile(io.BytesIO(only_translated.content)).namelist() == [f"translated/{FILE_ID}_table_1_translated.csv"]
+
+def test_missing_and_invalid_jobs(client):
+    assert client.get(url("/files/extracted/nope.csv")).status_code == 404
+    assert client.get("/api/v1/extraction/not-a-uuid/files").status_code == 400
+    assert client.get(f"/api/v1/extraction/{uuid.UUID(int=8)}/bundle").status_code == 404
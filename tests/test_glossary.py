@@ -0,0 +1,78 @@
+# tests/test_glossary.py
+import json
+import os
+
+import pytest
+
+from app.services.glossary_service import GlossaryService
+
+ENTRIES = {
+    "الإيرادات": "Revenue",
+    "إجمالي الإيرادات": "Total revenue",
+    "إجمالي": "Total",
+    "صافي": "Net",
+    "ربح": "Profit",
+}
+
+@pytest.fixture
+def glossary_path(tmp_path):
+    path = tmp_path / "glossary.csv"
+    path.write_text("arabic,english\n" + "".join(f"{ar},{en}\n" for ar, en in ENTRIES.items()), encoding="utf-8")
+    return path
+
+@pytest.fixture
+def glossary(glossary_path):
+    return GlossaryService(glossary_path)
+
+def test_exact_match_ignores_presentation_forms_and_broken_spacing(glossary):
+    assert glossary.lookup("الإيرادات") == "Revenue"
+    # Presentation-form glyphs as extracted from many PDFs
+    assert glossary.lookup("ﺍﻹﻳﺮﺍﺩﺍﺕ") == "Revenue"
+    # A word split by PDF spacing
+    assert glossary.lookup("الإير ادات") == "Revenue"
+
+def test_phrase_match_prefers_the_longest_entry(glossary):
+    assert glossary.lookup("إجمالي الإيرادات") == "Total revenue"
+    assert glossary.lookup("إجمالي الإيرادات 2023") == "Total revenue 2023"
+
+def test_terms_only_match_whole_words(glossary):
+    # "ربح" is an entry, but "الربح" is a different word: the model is needed
+    assert glossary.lookup("صافي الربح") is None
+    assert glossary.lookup("صافي ربح") == "Net Profit"
+
+def test_numbers_and_unknown_words_are_not_hits(glossary):
+    assert glossary.lookup("1,234") is None
+    assert glossary.lookup("الإيرادات الأخرى") is None
+
+def test_phrase_match_can_be_disabled(glossary_path):
+    glossary = GlossaryService(glossary_path, phrase_match=False)
+    
+    assert glossary.lookup("إجمالي الإيرادات") == "Total revenue"
+    assert glossary.lookup("صافي ربح") is None
+
+def test_hit_counters(glossary):
+    glossary.resolve(["الإيرادات", "صافي ربح", "غير معروف"])
+    
+    stats = glossary.get_stats()
+    assert (stats["lookups"], stats["exact_hits"], stats["phrase_hits"]) == (3, 1, 1)
+    assert stats["hit_rate"] == round(2 / 3, 4)
+
+def test_reload_when_the_file_changes(glossary, glossary_path):
+    fingerprint = glossary.fingerprint()
+    assert not glossary.reload_if_changed()
+    
+    glossary_path.write_text("arabic,english\nالأصول,Assets\n", encoding="utf-8")
+    mtime = glossary_path.stat().st_mtime + 5
+    os.utime(glossary_path, (mtime, mtime))
+    
+    assert glossary.reload_if_changed()
+    assert glossary.lookup("الأصول") == "Assets"
+    assert glossary.lookup("الإيرادات") is None
+    assert glossary.fingerprint() != fingerprint
+
+def test_json_glossary_and_missing_file(tmp_path):
+    path = tmp_path / "glossary.json"
+    path.write_text(json.dumps({"الأصول": "Assets"}, ensure_ascii=False), encoding="utf-8")
+    
+    assert GlossaryService(path).lookup("الأصول") == "Assets"
+    assert GlossaryService(tmp_path / "missing.csv").lookup("الأصول") is None
@@ -0,0 +1,100 @@
+# tests/test_layout_cache.py
+from pathlib import Path
+
+import fitz
+import pytest
+
+from app.handlers.word_sources import get_word_source
+from app.models.table_models import BoundingBox, TableConfig
+from app.services.layout_cache_service import LayoutCacheService
+from app.services.table_detection_service import TableDetectionService
+
+FIXTURE = Path(__file__).resolve().parent.parent / "data" / "uploads" / "334bf948-9682-4a55-bf3a-272c38e5ae2b.pdf"
+
+def word(text, x0, top, width=30):
+    return {"text": text, "x0": x0, "x1": x0 + width, "top": top, "bottom": top + 10}
+
+def config(page=0):
+    return TableConfig(page=page, bbox=BoundingBox(x0=0, y0=0, x1=100, y1=100), columns=[0, 50, 100], img_width=600, img_height=800)
+
+@pytest.fixture
+def template_pdf(tmp_path):
+    """The fixture page three times: one statement template"""
+    if not FIXTURE.exists():
+        pytest.skip("fixture PDF missing")
+    source, doc = fitz.open(str(FIXTURE)), fitz.open()
+    for _ in range(3):
+        doc.insert_pdf(source)
+    path = tmp_path / "template.pdf"
+    doc.save(str(path))
+    doc.close()
+    source.close()
+    return str(path)
+
+def test_lookup_matches_within_tolerance():
+    cache = LayoutCacheService()
+    words = [word("a", 10, 100), word("b", 60, 100), word("c", 10, 130)]
+    cache.store(cache.fingerprint(words, 600, 800), [config()])
+    
+    shifted = [dict(w, top=w["top"] + 2, x0=w["x0"] + 5, x1=w["x1"] + 5) for w in words]
+    assert cache.lookup(cache.fingerprint(shifted, 600, 800)) == [config()]
+    
+    moved = [dict(w, top=w["top"] + 8) for w in words]
+    assert cache.lookup(cache.fingerprint(moved, 600, 800)) is None
+    assert cache.lookup(cache.fingerprint(words, 612, 792)) is None
+
+def test_empty_results_are_never_cached():
+    cache = LayoutCacheService()
+    fingerprint = cache.fingerprint([word("a", 10, 100)], 600, 800)
+    
+    cache.store(fingerprint, [])
+    
+    assert cache.lookup(fingerprint) is None
+    assert cache.get_stats()["layouts"] == 0
+
+def test_least_recently_used_layouts_are_evicted():
+    cache = LayoutCacheService(max_entries=2)
+    fingerprints = [cache.fingerprint([word("a", 10, 100)] * (n + 1), 600, 800 + n * 10) for n in range(3)]
+    for fp in fingerprints[:2]:
+        cache.store(fp, [config()])
+    cache.lookup(fingerprints[0])
+    
+    cache.store(fingerprints[2], [config()])
+    
+    assert cache.lookup(fingerprints[1]) is None
+    assert cache.lookup(fingerprints[0]) is not None and cache.lookup(fingerprints[2]) is not None
+
+def test_repeated_template_hits_and_matches_uncached_detection(template_pdf):
+    cache = LayoutCacheService()
+    
+    cached = TableDetectionService(layout_cache=cache).detect_all_tables(template_pdf)
+    
+    assert cached == TableDetectionService().detect_all_tables(template_pdf)
+    assert [c.page for c in cached] == [0, 0, 1, 1, 2, 2]
+    assert (cache.lookups, cache.hits, cache.rejected) == (3, 2, 0)
+
+def test_table_page_matching_an_empty_layout_is_detected(template_pdf):
+    _, words, pdf_w, pdf_h = next(get_word_source("pdfplumber").iter_pages(template_pdf, [0]))
+    cache = LayoutCacheService()
+    service = TableDetectionService(layout_cache=cache)
+    # As if a text page with the same fingerprint had been cached with no tables
+    key, bands = cache.fingerprint(words, pdf_w, pdf_h)
+    cache._entries[key] = [(bands, [])]
+    
+    configs = service._detect_page(words, 0, pdf_w, pdf_h)
+    
+    assert len(configs) == 2
+    assert cache.hits == 0
+
+def test_cached_configs_that_do_not_fit_are_rejected(template_pdf):
+    _, words, pdf_w, pdf_h = next(get_word_source("pdfplumber").iter_pages(template_pdf, [0]))
+    cache = LayoutCacheService()
+    service = TableDetectionService(layout_cache=cache)
+    real = service._detect_page(words, 0, pdf_w, pdf_h)
+    # Column boundaries cutting through words
+    bad = [c.model_copy(update={"columns": [(w["x0"] + w["x1"]) / 2 for w in words[:3]]}) for c in real]
+    cache.clear()
+    cache.store(cache.fingerprint(words, pdf_w, pdf_h), bad)
+    
+    assert service._detect_page(words, 0, pdf_w, pdf_h) == real
+    assert cache.rejected == 1
@@ -0,0 +1,27 @@
+# tests/test_page_range.py
+import pytest
+
+from app.utils.page_range import parse_page_range
+
+def test_empty_selects_every_page():
+    assert parse_page_range(None, 3) == [0, 1, 2]
+    assert parse_page_range("  ", 3) == [0, 1, 2]
+
+def test_pages_and_ranges_are_zero_based_sorted_and_deduplicated():
+    assert parse_page_range("8, 1-3,2", 10) == [0, 1, 2, 7]
+
+def test_open_ended_ranges():
+    assert parse_page_range("9-", 10) == [8, 9]
+    assert parse_page_range("-2", 10) == [0, 1]
+
+def test_overlong_range_is_clamped():
+    assert parse_page_range("4-100", 5) == [3, 4]
+
+@pytest.mark.parametrize("spec", ["abc", "0", "3-1", "1-x", ",", "2--3"])
+def test_malformed_input_raises(spec):
+    with pytest.raises(ValueError):
+        parse_page_range(spec, 10)
+
+def test_start_past_the_end_raises():
+    with pytest.raises(ValueError, match="out of range"):
+        parse_page_range("11", 10)
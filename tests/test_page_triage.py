@@ -0,0 +1,104 @@
+# tests/test_page_triage.py
+import random
+
+import fitz
+import pytest
+
+from app.services.page_triage_service import EMPTY, LIKELY_TABLE, TEXT_ONLY, PageTriageService
+from app.services.table_detection_service import TableDetectionService
+
+def save(doc, tmp_path, name="doc.pdf") -> str:
+    path = tmp_path / name
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+def table_with_wrapped_cells(page, top=100, rows=6):
+    """Wide 3-cell rows alternating with narrow 2-word continuation lines"""
+    for r in range(rows):
+        y = top + r * 26
+        for x in (72, 260, 450):
+            page.insert_text((x, y), f"cell{r}{x}")
+        page.insert_text((72, y + 13), "wrapped text")
+
+def random_page(page, rng):
+    """Rows of 1-4 words at random spacing and widths: some pages hold tables, some don't"""
+    y = 60
+    while y < 760:
+        words = rng.choice([1, 2, 2, 3, 4])
+        xs = sorted(rng.sample(range(40, 520, 10), words))
+        if rng.random() < 0.3:
+            # Keep it narrow
+            xs = [40 + i * 45 for i in range(words)]
+        for x in xs:
+            page.insert_text((x, y), rng.choice(["alpha", "12.5", "net", "total", "x"]))
+        y += rng.choice([12, 13, 14, 20, 26, 40])
+
+@pytest.fixture
+def detector():
+    return TableDetectionService()
+
+def test_rows_alternating_with_wrapped_lines_are_not_skipped(tmp_path, detector):
+    doc = fitz.open()
+    table_with_wrapped_cells(doc.new_page())
+    path = save(doc, tmp_path)
+    
+    decisions, _ = PageTriageService().triage(path)
+    
+    assert len(detector.detect_all_tables(path)) == 1
+    assert decisions == {0: LIKELY_TABLE}
+    triaged = TableDetectionService(page_triage=PageTriageService())
+    assert triaged.detect_all_tables(path) == detector.detect_all_tables(path)
+    assert triaged.last_triage_report["pages_skipped"] == 0
+
+def test_triage_never_skips_a_page_the_heuristics_find_a_table_on(tmp_path, detector):
+    rng = random.Random(33)
+    doc = fitz.open()
+    for _ in range(40):
+        random_page(doc.new_page(), rng)
+    path = save(doc, tmp_path)
+    
+    decisions, _ = PageTriageService().triage(path)
+    pages_with_tables = {c.page for c in detector.detect_all_tables(path)}
+    
+    assert pages_with_tables, "generator should produce some table pages"
+    assert {p for p in pages_with_tables if decisions[p] != LIKELY_TABLE} == set()
+    # ...while still skipping something
+    assert any(d != LIKELY_TABLE for d in decisions.values())
+
+def test_text_and_empty_pages(tmp_path):
+    doc = fitz.open()
+    text = doc.new_page()
+    # A narrow column of prose (wide multi-word rows look like table rows to the heuristics)
+    for i in range(10):
+        text.insert_text((72, 100 + i * 14), f"note line {i} here")
+    doc.new_page()
+    path = save(doc, tmp_path)
+    
+    decisions, _ = PageTriageService().triage(path)
+    
+    assert decisions == {0: TEXT_ONLY, 1: EMPTY}
+
+def test_smallest_ruled_grid_is_likely_table(tmp_path):
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((80, 115), "open")
+    # Open-sided 2x2 grid: 3 rules and one inner column line
+    for y in (100, 120, 140):
+        page.draw_line((60, y), (400, y))
+    page.draw_line((230, 100), (230, 140))
+    path = save(doc, tmp_path)
+    
+    assert PageTriageService().triage(path)[0] == {0: LIKELY_TABLE}
+
+def test_merge_reports_adds_up_batches():
+    reports = [
+        PageTriageService.build_report({0: LIKELY_TABLE, 1: TEXT_ONLY}, 0.1, [0], 1.0, forced=False),
+        PageTriageService.build_report({2: EMPTY}, 0.05, [], 0.0, forced=False, audit_misses=[2]),
+    ]
+    
+    merged = PageTriageService.merge_reports(reports)
+    
+    assert (merged["pages_total"], merged["likely_table"], merged["pages_skipped"]) == (3, 1, 2)
+    assert merged["audit_misses"] == [2]
+    assert PageTriageService.merge_reports([]) is None
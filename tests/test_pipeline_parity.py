@@ -0,0 +1,60 @@
+# tests/test_pipeline_parity.py
+import hashlib
+from pathlib import Path
+
+import fitz
+import pytest
+
+# TranslationService imports the Marian model module
+pytest.importorskip("transformers")
+
+from app.ml_models.stub_translator import StubTranslatorModel
+from app.services.extraction_pipeline_service import ExtractionPipelineService
+from app.services.pdf_extraction_service import PDFExtractionService
+from app.services.table_detection_service import TableDetectionService
+from app.services.translation_service import TranslationService
+
+FIXTURE = Path(__file__).resolve().parent.parent / "data" / "uploads" / "334bf948-9682-4a55-bf3a-272c38e5ae2b.pdf"
+FILE_ID = "00000000-0000-0000-0000-000000000001"
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    """The fixture page three times over, so overlapped batches span several pages"""
+    if not FIXTURE.exists():
+        pytest.skip("fixture PDF missing")
+    source = fitz.open(str(FIXTURE))
+    doc = fitz.open()
+    for _ in range(3):
+        doc.insert_pdf(source)
+    path = tmp_path / "doc.pdf"
+    doc.save(str(path))
+    doc.close()
+    source.close()
+    return str(path)
+
+def run_pipeline(pdf_path, out_dir, overlap, stream_threshold_bytes=None):
+    translation_service = TranslationService(StubTranslatorModel(), stream_threshold_bytes=stream_threshold_bytes)
+    pipeline = ExtractionPipelineService(
+        TableDetectionService(),
+        PDFExtractionService(),
+        translation_service,
+        extracted_dir=str(out_dir / "extracted"),
+        translated_dir=str(out_dir / "translated"),
+        overlap_stages=overlap,
+        overlap_queue_pages=1
+    )
+    response = pipeline.run(pdf_path, FILE_ID)
+    files = {
+        path.name: hashlib.sha256(path.read_bytes()).hexdigest()
+        for path in sorted(out_dir.rglob(f"{FILE_ID}*"))
+    }
+    counts = (response.tables_detected, response.tables_extracted, response.tables_translated)
+    return counts, response.extracted_files, response.translated_files, files
+
+@pytest.mark.parametrize("stream_threshold_bytes", [None, 200])
+def test_overlap_matches_sequential_csv(pdf_path, tmp_path, stream_threshold_bytes):
+    sequential = run_pipeline(pdf_path, tmp_path / "sequential", False, stream_threshold_bytes)
+    overlapped = run_pipeline(pdf_path, tmp_path / "overlapped", True, stream_threshold_bytes)
+    
+    assert sequential[0][0] > 0
+    assert overlapped == sequential
@@ -0,0 +1,86 @@
+# tests/test_preview_cache.py
+from pathlib import Path
+
+import fitz
+import pytest
+
+from app.services.preview_service import PagePreviewService
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    doc = fitz.open()
+    for i in range(4):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {i + 1}")
+    path = tmp_path / "doc.pdf"
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+@pytest.fixture
+def service(tmp_path):
+    service = PagePreviewService(str(tmp_path / "uploads"), str(tmp_path / "previews"), max_cache_mb=None)
+    yield service
+    service.close()
+
+def test_second_view_is_a_hit(service, pdf_path):
+    first, key = service.preview(pdf_path, 0, dpi=40)
+    again, same_key = service.preview(pdf_path, 0, dpi=40)
+    
+    assert (again, same_key) == (first, key)
+    assert (service.hits, service.misses) == (1, 1)
+
+def test_least_recently_viewed_preview_is_evicted(service, pdf_path):
+    first, _ = service.preview(pdf_path, 0, dpi=40)
+    second, _ = service.preview(pdf_path, 1, dpi=40)
+    # Room for about two previews; page 1 is viewed again, so page 2 is the oldest
+    service.max_cache_bytes = first.stat().st_size + second.stat().st_size + 16
+    service.preview(pdf_path, 0, dpi=40)
+    
+    third, _ = service.preview(pdf_path, 2, dpi=40)
+    
+    assert service.evictions == 1
+    assert first.exists() and third.exists() and not second.exists()
+    assert service.get_stats()["bytes_used"] == first.stat().st_size + third.stat().st_size
+
+def test_cache_index_survives_a_restart(service, pdf_path, tmp_path):
+    path, _ = service.preview(pdf_path, 3, dpi=40)
+    
+    restarted = PagePreviewService(str(tmp_path / "uploads"), str(tmp_path / "previews"))
+    
+    assert restarted.get_stats()["previews"] == 1
+    assert restarted.preview(pdf_path, 3, dpi=40)[0] == path
+    assert restarted.hits == 1
+    restarted.close()
+
+def test_file_hash_memo_is_bounded(tmp_path, pdf_path):
+    service = PagePreviewService(str(tmp_path / "uploads"), str(tmp_path / "previews"), max_file_hashes=2)
+    other = tmp_path / "other.bin"
+    other.write_bytes(b"other")
+    third = tmp_path / "third.bin"
+    third.write_bytes(b"third")
+    
+    for path in (pdf_path, other, third):
+        service.file_hash(str(path))
+    
+    assert len(service._file_hashes) == 2
+
+def test_tables_are_numbered_per_page(service, tmp_path):
+    fixture = Path(__file__).resolve().parent.parent / "data" / "uploads" / "334bf948-9682-4a55-bf3a-272c38e5ae2b.pdf"
+    if not fixture.exists():
+        pytest.skip("fixture PDF missing")
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Cover")
+    source = fitz.open(str(fixture))
+    doc.insert_pdf(source)
+    path = tmp_path / "tables.pdf"
+    doc.save(str(path))
+    doc.close()
+    source.close()
+    
+    first, second = service.page_table(str(path), 1, 1), service.page_table(str(path), 1, 2)
+    
+    assert (first.page, second.page) == (1, 1)
+    assert first.bbox != second.bbox
+    assert service.page_table(str(path), 1, 3) is None
+    assert service.page_table(str(path), 0, 1) is None
@@ -0,0 +1,82 @@
+# tests/test_ruling_detection.py
+from app.services.ruling_detection_service import RulingGridDetector
+
+BLACK = (0.0, 0.0, 0.0)
+
+class FakePage:
+    """Stands in for a fitz page: only get_cdrawings() is used"""
+    
+    def __init__(self, paths):
+        self.paths = paths
+    
+    def get_cdrawings(self):
+        return self.paths
+
+def line(x0, y0, x1, y1):
+    return {"type": "s", "color": BLACK, "items": [("l", (x0, y0), (x1, y1))]}
+
+def box(x0, y0, x1, y1):
+    return {"type": "s", "color": BLACK, "items": [("re", (x0, y0, x1, y1))]}
+
+def grid(xs, ys, outer_verticals=True):
+    """Full-width row rules at ys, column rules at xs (optionally without the outer two)"""
+    paths = [line(xs[0], y, xs[-1], y) for y in ys]
+    columns = xs if outer_verticals else xs[1:-1]
+    paths += [line(x, ys[0], x, ys[-1]) for x in columns]
+    return paths
+
+def test_ruled_table():
+    page = FakePage(grid([50, 150, 250, 350], [100, 120, 140, 160, 180]))
+    
+    grids = RulingGridDetector().detect(page)
+    
+    assert len(grids) == 1
+    g = grids[0]
+    assert (g["x0"], g["y0"], g["x1"], g["y1"]) == (50, 100, 350, 180)
+    assert g["columns"] == [50, 150, 250, 350]
+    assert g["rows"] == 4
+
+def test_framed_subtotal_inside_rules_only_table_is_not_a_table():
+    # Horizontal rules only, with one row boxed (and split by a vertical) as a subtotal
+    paths = [line(50, y, 450, y) for y in (100, 120, 140, 160, 180, 200, 220)]
+    paths += [box(50, 180, 450, 200), line(300, 180, 300, 200)]
+    
+    assert RulingGridDetector().detect(FakePage(paths)) == []
+
+def test_stacked_tables_are_both_found():
+    top = grid([50, 150, 250, 350], [100, 120, 140, 160])
+    # Second table starts less than a row gap below the first
+    bottom = grid([50, 200, 350], [175, 195, 215, 235])
+    
+    grids = RulingGridDetector().detect(FakePage(top + bottom))
+    
+    assert [(g["y0"], g["y1"]) for g in grids] == [(100, 160), (175, 235)]
+    assert grids[0]["columns"] == [50, 150, 250, 350]
+    assert grids[1]["columns"] == [50, 200, 350]
+
+def test_title_underline_and_double_total_rule_keep_the_table():
+    paths = grid([50, 150, 250, 350], [100, 120, 140, 160])
+    # Title underline above, double rule under the total below
+    paths += [line(50, 85, 350, 85), line(50, 175, 350, 175), line(50, 180, 350, 180)]
+    
+    grids = RulingGridDetector().detect(FakePage(paths))
+    
+    assert len(grids) == 1
+    assert (grids[0]["y0"], grids[0]["y1"]) == (100, 160)
+
+def test_open_sided_table_uses_rules_for_outer_columns():
+    page = FakePage(grid([40, 150, 250, 360], [100, 120, 140, 160], outer_verticals=False))
+    
+    grids = RulingGridDetector().detect(page)
+    
+    assert len(grids) == 1
+    assert grids[0]["columns"] == [40, 150, 250, 360]
+    assert grids[0]["rows"] == 3
+
+def test_invisible_and_short_lines_are_ignored():
+    paths = grid([50, 150, 250], [100, 120, 140])
+    for path in paths:
+        path["color"] = (1.0, 1.0, 1.0)
+    paths.append(line(10, 10, 12, 10))
+    
+    assert RulingGridDetector().detect(FakePage(paths)) == []
@@ -0,0 +1,36 @@
+# tests/test_segmenter.py
+from app.utils.segmenter import segment_text
+
+def words(text: str) -> int:
+    return len(text.split())
+
+def test_short_text_is_one_segment():
+    assert segment_text("صافي الربح للسنة", 10, words) == ["صافي الربح للسنة"]
+
+def test_splits_on_sentences_and_packs_neighbours():
+    text = "one two three. four five six. seven eight nine."
+    
+    assert segment_text(text, 6, words) == ["one two three. four five six.", "seven eight nine."]
+
+def test_arabic_sentence_and_clause_marks():
+    text = "الإيرادات ارتفعت بشكل كبير، والمصاريف انخفضت قليلا؛ الربح تحسن كثيرا؟ نعم"
+    
+    segments = segment_text(text, 4, words)
+    
+    assert all(words(s) <= 4 for s in segments)
+    assert " ".join(segments).split() == text.split()
+
+def test_numbers_are_not_split():
+    text = "total 1,234.56 for the year. net 7.5 percent of revenue after tax"
+    
+    segments = segment_text(text, 6, words)
+    
+    assert any("1,234.56" in s for s in segments)
+    assert any("7.5" in s for s in segments)
+
+def test_falls_back_to_word_runs():
+    text = " ".join(f"w{i}" for i in range(10))
+    
+    segments = segment_text(text, 4, words)
+    
+    assert segments == ["w0 w1 w2 w3", "w4 w5 w6 w7", "w8 w9"]
@@ -0,0 +1,81 @@
+# tests/test_storage_lifecycle.py
+import os
+import uuid
+
+import pytest
+
+from app.services.storage_service import StorageLifecycleService
+from app.services.work_queue_service import DONE, SQLiteWorkQueue
+
+NOW = 1_700_000_000.0
+DAY = 24 * 3600
+
+def write_job(directory, job_id, age_seconds, size=100, suffix=".pdf"):
+    """A sharded job file (<dir>/<id[:2]>/<id><suffix>) last modified age_seconds before NOW"""
+    path = directory / job_id[:2] / f"{job_id}{suffix}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    os.utime(path, (NOW - age_seconds, NOW - age_seconds))
+    return path
+
+@pytest.fixture
+def dirs(tmp_path):
+    uploads, extracted = tmp_path / "uploads", tmp_path / "extracted"
+    uploads.mkdir()
+    extracted.mkdir()
+    return uploads, extracted
+
+def test_ttl_evicts_a_job_across_directories(dirs):
+    uploads, extracted = dirs
+    old, new = str(uuid.uuid4()), str(uuid.uuid4())
+    old_files = [write_job(uploads, old, 3 * DAY), write_job(extracted, old, 3 * DAY, suffix="_table_1.csv")]
+    new_file = write_job(uploads, new, 3600)
+    
+    report = StorageLifecycleService(list(dirs), ttl_hours=48, min_age_seconds=0).sweep(now=NOW)
+    
+    assert (report["jobs_evicted"], report["files_deleted"], report["bytes_reclaimed"]) == (1, 2, 200)
+    assert not any(p.exists() for p in old_files)
+    assert new_file.exists()
+
+def test_quota_evicts_oldest_first(dirs):
+    uploads, _ = dirs
+    jobs = [str(uuid.uuid4()) for _ in range(3)]
+    paths = [write_job(uploads, job_id, age, size=1024 * 1024) for job_id, age in zip(jobs, (300, 200, 100))]
+    
+    report = StorageLifecycleService(list(dirs), quota_mb=2, min_age_seconds=0).sweep(now=NOW)
+    
+    assert report["jobs_evicted"] == 1
+    assert [p.exists() for p in paths] == [False, True, True]
+
+def test_recent_flat_and_foreign_files_are_kept(dirs):
+    uploads, _ = dirs
+    recent = write_job(uploads, str(uuid.uuid4()), 60)
+    flat = uploads / f"{uuid.uuid4()}.pdf"
+    flat.write_bytes(b"sample")
+    foreign = uploads / "ab" / "notes.txt"
+    foreign.parent.mkdir()
+    foreign.write_bytes(b"keep me")
+    for path in (flat, foreign):
+        os.utime(path, (NOW - 30 * DAY, NOW - 30 * DAY))
+    
+    report = StorageLifecycleService(list(dirs), ttl_hours=1, min_age_seconds=600).sweep(now=NOW)
+    
+    assert report["jobs_evicted"] == 0
+    assert recent.exists() and flat.exists() and foreign.exists()
+
+def test_running_queue_jobs_are_skipped_and_finished_ones_purged(dirs, tmp_path):
+    uploads, _ = dirs
+    work_queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    running, finished = str(uuid.uuid4()), str(uuid.uuid4())
+    for job_id in (running, finished):
+        write_job(uploads, job_id, 3 * DAY)
+        work_queue.create_job(job_id, "x.pdf", {"pages": [0]}, [])
+    work_queue.finish_job(finished, DONE)
+    
+    service = StorageLifecycleService(list(dirs), ttl_hours=24, min_age_seconds=0, work_queue=work_queue)
+    report = service.sweep(now=NOW)
+    
+    assert report["jobs_evicted"] == 1 and report["queue_jobs_purged"] == 1
+    assert (uploads / running[:2] / f"{running}.pdf").exists()
+    assert work_queue.get_job(finished) is None
+    assert work_queue.get_job(running) is not None
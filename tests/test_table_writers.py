@@ -0,0 +1,53 @@
+# tests/test_table_writers.py
+import pandas as pd
+import pytest
+
+from app.handlers.table_handler import TableHandler
+from app.models.table_models import TableData
+
+TABLES = [
+    TableData(table_id="table_1", page=0, rows=[["البند", "2023"], ["الإيرادات", "100"]], column_count=2),
+    TableData(table_id="table_2", page=2, rows=[["a", "b", "c"], ["1", "", "3"], ["x"]], column_count=3),
+]
+
+def test_csv_writes_one_file_per_table(tmp_path):
+    paths = TableHandler.save_stage_tables(TABLES, str(tmp_path), "doc", "csv", suffix="_translated")
+    
+    assert [p.rsplit("/", 1)[1] for p in paths] == ["doc_table_1_translated.csv", "doc_table_2_translated.csv"]
+
+@pytest.mark.parametrize("output_format", ["parquet", "arrow"])
+def test_columnar_file_holds_every_table_with_1_based_pages(tmp_path, output_format):
+    pa = pytest.importorskip("pyarrow")
+    
+    [path] = TableHandler.save_stage_tables(TABLES, str(tmp_path), "doc", output_format)
+    
+    if output_format == "parquet":
+        import pyarrow.parquet as pq
+        table = pq.read_table(path)
+    else:
+        table = pa.ipc.open_file(path).read_all()
+    rows = table.to_pylist()
+    assert table.column_names == ["document_id", "page", "table_id", "row_index", "col_0", "col_1", "col_2"]
+    assert [(r["page"], r["table_id"], r["row_index"]) for r in rows] == [
+        (1, "table_1", 0), (1, "table_1", 1), (3, "table_2", 0), (3, "table_2", 1), (3, "table_2", 2)
+    ]
+    assert [rows[1][f"col_{i}"] for i in range(3)] == ["الإيرادات", "100", None]
+    assert [rows[4][f"col_{i}"] for i in range(3)] == ["x", None, None]
+    assert {r["document_id"] for r in rows} == {"doc"}
+
+def test_xlsx_has_one_sheet_per_table_named_by_1_based_page(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    
+    [path] = TableHandler.save_stage_tables(TABLES, str(tmp_path), "doc", "xlsx")
+    
+    workbook = openpyxl.load_workbook(path)
+    assert workbook.sheetnames == ["p1_table_1", "p3_table_2"]
+    assert [list(r) for r in workbook["p1_table_1"].iter_rows(values_only=True)] == [["البند", "2023"], ["الإيرادات", "100"]]
+
+def test_no_tables_writes_nothing(tmp_path):
+    assert TableHandler.save_stage_tables([], str(tmp_path), "doc", "parquet") == []
+    assert list(tmp_path.iterdir()) == []
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        TableHandler.save_tables(TABLES, str(tmp_path / "doc.txt"), "txt", "doc")
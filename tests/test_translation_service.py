@@ -0,0 +1,101 @@
+# tests/test_translation_service.py
+import pytest
+
+# TranslationService imports the Marian model module
+pytest.importorskip("transformers")
+
+from app.ml_models.stub_translator import StubTranslatorModel
+from app.services.translation_service import TranslationService
+
+ROWS = [
+    "0,1,2",
+    "الإيرادات,100,",
+    "تكلفة الإيرادات,,35",
+    "إجمالي الربح,7,1.50",
+    "ربحية السهم,0012,NA",
+]
+
+def translate(tmp_path, name, **options):
+    csv_path = tmp_path / "table_1.csv"
+    csv_path.write_text("\n".join(ROWS) + "\n", encoding="utf-8-sig")
+    out_dir = tmp_path / name
+    out_dir.mkdir()
+    service = TranslationService(StubTranslatorModel(), **options)
+    [output] = service.translate_tables([str(csv_path)], str(out_dir))
+    with open(output, encoding="utf-8-sig") as f:
+        return f.read()
+
+@pytest.mark.parametrize("document_level", [True, False])
+def test_chunked_output_matches_unchunked(tmp_path, document_level):
+    whole = translate(tmp_path, "whole", document_level=document_level)
+    chunked = translate(tmp_path, "chunked", document_level=document_level, stream_threshold_bytes=0, chunk_rows=2)
+    
+    assert chunked == whole
+    # Cells are copied as text, not re-typed by pandas
+    numbers = [line.split(",")[1:] for line in whole.splitlines()[1:]]
+    assert numbers == [["100", ""], ["", "35"], ["7", "1.50"], ["0012", "NA"]]
+
+class FlakyTranslator(StubTranslatorModel):
+    """Fails the first `failures` batches"""
+    
+    def __init__(self, failures: int = 1):
+        super().__init__()
+        self.failures = failures
+        self.calls = []
+    
+    def translate_batch(self, texts, batch_size=32, cancel_token=None):
+        self.calls.append(list(texts))
+        if len(self.calls) <= self.failures:
+            raise RuntimeError("model crashed")
+        return super().translate_batch(texts, batch_size, cancel_token)
+
+def write_tables(tmp_path, *tables):
+    paths = []
+    for i, rows in enumerate(tables, 1):
+        path = tmp_path / f"table_{i}.csv"
+        path.write_text("\n".join(rows) + "\n", encoding="utf-8-sig")
+        paths.append(str(path))
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    return paths, str(out_dir)
+
+def test_document_pass_translates_repeated_strings_once(tmp_path):
+    from app.services.glossary_service import GlossaryService
+    
+    glossary_path = tmp_path / "glossary.csv"
+    glossary_path.write_text("arabic,english\nالإيرادات,Revenue\n", encoding="utf-8")
+    translator = FlakyTranslator(failures=0)
+    service = TranslationService(translator, GlossaryService(glossary_path))
+    csv_files, out_dir = write_tables(
+        tmp_path,
+        ["الإيرادات,100", "إجمالي الربح,7", "إيضاح,1"],
+        ["الإيرادات,200", "إجمالي الربح,8", "صافي الربح,9"],
+    )
+    
+    assert len(service.translate_tables(csv_files, out_dir)) == 2
+    # One model call for the union of both tables, glossary hits excluded
+    expected = sorted(service.normalizer.clean_text(s) for s in ["إجمالي الربح", "إيضاح", "صافي الربح"])
+    assert [sorted(call) for call in translator.calls] == [expected]
+    assert service.last_document_stats == {
+        "tables": 2,
+        "cells_total": 12,
+        "cells_translatable": 6,
+        "unique_strings": 4,
+        "glossary_resolved": 1,
+        "model_strings": 3,
+        "dedupe_ratio": 1.5,
+    }
+
+def test_document_pass_failure_falls_back_to_tables(tmp_path):
+    translator = FlakyTranslator(failures=1)
+    service = TranslationService(translator)
+    csv_files, out_dir = write_tables(tmp_path, ["الإيرادات,100"], ["صافي الربح,9"])
+    
+    translated = service.translate_tables(csv_files, out_dir)
+    
+    assert len(translated) == 2
+    # Failed document batch, then one call per table
+    assert len(translator.calls) == 3
+    with open(translated[1], encoding="utf-8-sig") as f:
+        assert f.read() == "[en] صافي الربح,9\n"
+    assert service.last_document_stats["tables"] == 0
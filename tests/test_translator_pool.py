@@ -0,0 +1,77 @@
+# tests/test_translator_pool.py
+import os
+import signal
+import threading
+import time
+from collections import OrderedDict
+
+import pytest
+
+from app.ml_models.stub_translator import StubTranslatorModel
+from app.ml_models.translator_pool import TranslatorPool
+
+def expected(texts):
+    return StubTranslatorModel().translate_batch(texts)
+
+@pytest.fixture
+def make_pool():
+    pools = []
+    
+    def make(**options):
+        pool = TranslatorPool(backend="stub", **options)
+        pools.append(pool)
+        return pool
+    yield make
+    for pool in pools:
+        pool.close()
+
+def test_results_keep_input_order_across_shards(make_pool):
+    pool = make_pool(replicas=2, shard_tokens=10)
+    texts = [f"نص {'طويل ' * (i % 7)}{i}" for i in range(60)] + ["", "  ", "نص 1"]
+    
+    assert pool.translate_batch(texts) == expected(texts)
+
+class YieldingCache(OrderedDict):
+    """Hands the GIL to other threads between a membership test and the read that follows"""
+    
+    def __contains__(self, key):
+        found = super().__contains__(key)
+        time.sleep(0.0005)
+        return found
+
+def test_concurrent_calls_share_a_bounded_cache(make_pool):
+    pool = make_pool(replicas=2, cache_size=8)
+    pool.cache = YieldingCache()
+    errors = []
+    
+    def worker(seed):
+        try:
+            for i in range(40):
+                texts = [f"نص {(seed + i + j) % 12}" for j in range(6)]
+                assert pool.translate_batch(texts) == expected(texts)
+        except Exception as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert errors == []
+    assert len(pool.cache) <= 8
+
+def test_killed_replica_is_restarted_and_its_shards_requeued(make_pool):
+    pool = make_pool(replicas=2, shard_tokens=20, replica_options={"latency_per_string_ms": 10})
+    texts = [f"نص رقم {i}" for i in range(200)]
+    victim = pool._replicas[0].process.pid
+    killer = threading.Timer(0.3, os.kill, args=(victim, signal.SIGKILL))
+    killer.start()
+    
+    start = time.monotonic()
+    assert pool.translate_batch(texts) == expected(texts)
+    killer.join()
+    
+    assert time.monotonic() - start > 0.3
+    assert pool.restarts == 1
+    assert pool.translate_batch(["نص جديد"]) == expected(["نص جديد"])
@@ -0,0 +1,66 @@
+# tests/test_work_queue.py
+import time
+
+import pytest
+
+from app.services.work_queue_service import DONE, FAILED, MERGING, PENDING, RUNNING, SQLiteWorkQueue
+
+@pytest.fixture
+def work_queue(tmp_path):
+    return SQLiteWorkQueue(str(tmp_path / "queue.db"), lease_seconds=60, max_attempts=2, retry_backoff_seconds=0)
+
+def add_job(work_queue, job_id="job-1", pages=(0,)):
+    tasks = [{"job_id": job_id, "kind": "detect", "page": p, "payload": {"pdf_path": "x.pdf"}} for p in pages]
+    work_queue.create_job(job_id, "x.pdf", {"pages": list(pages)}, tasks)
+
+def test_claim_complete_enqueues_follow_up(work_queue):
+    add_job(work_queue)
+    task = work_queue.claim("w1")
+    follow_up = {"job_id": "job-1", "kind": "extract", "page": 0, "payload": {}}
+    
+    assert work_queue.claim("w2") is None
+    assert work_queue.complete(task, {"configs": []}, [follow_up])
+    assert work_queue.claim("w2", kinds=["detect"]) is None
+    assert work_queue.claim("w2", kinds=["extract"])["kind"] == "extract"
+
+def test_expired_lease_is_reclaimed_and_old_holder_cannot_complete(tmp_path):
+    work_queue = SQLiteWorkQueue(str(tmp_path / "queue.db"), lease_seconds=0.05)
+    add_job(work_queue)
+    stale = work_queue.claim("w1")
+    assert work_queue.claim("w2") is None
+    time.sleep(0.1)
+    
+    fresh = work_queue.claim("w2")
+    
+    assert fresh["id"] == stale["id"] and fresh["attempts"] == 2
+    assert not work_queue.complete(stale, {})
+    assert work_queue.complete(fresh, {})
+    assert work_queue.list_tasks("job-1")[0]["worker"] == "w2"
+
+def test_failed_task_is_retried_until_max_attempts(work_queue):
+    add_job(work_queue)
+    
+    work_queue.fail(work_queue.claim("w1"), "boom")
+    assert work_queue.list_tasks("job-1")[0]["status"] == PENDING
+    
+    work_queue.fail(work_queue.claim("w1"), "boom again")
+    task = work_queue.list_tasks("job-1")[0]
+    assert (task["status"], task["attempts"], task["error"]) == (FAILED, 2, "boom again")
+    assert work_queue.claim("w1") is None
+
+def test_claim_merge_succeeds_once(work_queue):
+    add_job(work_queue)
+    
+    assert work_queue.claim_merge("job-1")
+    assert not work_queue.claim_merge("job-1")
+    assert work_queue.get_job("job-1")["status"] == MERGING
+    assert work_queue.active_jobs() == {"job-1"}
+
+def test_purge_only_removes_finished_jobs(work_queue):
+    add_job(work_queue, "running")
+    add_job(work_queue, "done")
+    work_queue.finish_job("done", DONE, {"ok": True})
+    
+    assert work_queue.purge_jobs(["running", "done", "missing"]) == 1
+    assert work_queue.get_job("done") is None and work_queue.list_tasks("done") == []
+    assert work_queue.get_job("running")["status"] == RUNNING